@@ -0,0 +1,273 @@
+import io
+import os
+import time
+import itertools
+import queue
+import asyncio
+import logging
+import threading
+import pygame
+from Backend.MP3Frames import MP3Segmenter
+
+MIXER_FREQUENCY = 24000        # edge_tts' own rate: segments are decoded without resampling, which would trim each one
+MAX_SEGMENT_SECONDS = 2.0      # Later segments grow up to this, so there are few decode boundaries
+END_RECHECK_SECONDS = 0.02     # Re-check delay when a channel is still busy at its expected end
+STOP_CHECK_SECONDS = 0.1       # How often a stop callback is consulted during playback
+
+# Debug mode: decoded segments go through files here (and are kept) instead of memory
+_debug_dir = None
+_debug_counter = itertools.count(1)
+
+
+class PlaybackHandle:
+    """Completion of one playback: blocking ``wait()``, ``await handle``, and done callbacks.
+
+    pygame only posts end-of-track events to a display event queue (the GUI
+    is Qt), so completion is scheduled from the sound length on a timer
+    and confirmed against the channel instead of polling it.
+    """
+
+    def __init__(self, channel=None):
+        self.channel = channel
+        self.stopped = False
+        self._condition = threading.Condition()
+        self._done = False
+        self._callbacks = []
+        self._timer = None
+
+    @property
+    def done(self):
+        return self._done
+
+    def add_done_callback(self, callback):
+        """Call ``callback(handle)`` when playback ends (immediately if it already has)."""
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def wait(self, timeout=None) -> bool:
+        """Block until playback ends; False if ``timeout`` passed first."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._done, timeout)
+
+    async def wait_async(self):
+        if self._done:
+            return self
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(_):
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        self.add_done_callback(resolve)
+        await future
+        return self
+
+    def __await__(self):
+        return self.wait_async().__await__()
+
+    def stop(self):
+        if self.channel is not None:
+            self.channel.stop()
+        self._complete(stopped=True)
+
+    def finish_at(self, ends_at, sound=None):
+        """Complete when the channel finishes, expected at ``ends_at`` (monotonic seconds)."""
+        def check():
+            busy = self.channel is not None and self.channel.get_busy()
+            if busy and (sound is None or self.channel.get_sound() is sound) and not self._done:
+                self.finish_at(time.monotonic() + END_RECHECK_SECONDS, sound)  # Mixer ran a little late
+            else:
+                self._complete()
+        with self._condition:
+            if self._done:
+                return
+            self._timer = threading.Timer(max(0.0, ends_at - time.monotonic()), check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _complete(self, stopped=False):
+        with self._condition:
+            if self._done:
+                return
+            self._done = True
+            self.stopped = stopped
+            if self._timer is not None:
+                self._timer.cancel()
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notify_all()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logging.error(f"Playback callback failed: {e}")
+
+
+def EnableDebugFiles(directory):
+    """Write every segment to ``directory`` and decode it from there (None turns this off)."""
+    global _debug_dir
+    _debug_dir = directory
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        logging.info(f"Audio debug files enabled: {directory}")
+
+def DecodeSound(audio: bytes, skip_seconds=0.0):
+    """Decode MP3 bytes into a pygame Sound straight from memory, dropping ``skip_seconds`` from the start."""
+    if _debug_dir:
+        path = os.path.join(_debug_dir, f"segment-{next(_debug_counter):06d}.mp3")
+        with open(path, "wb") as f:
+            f.write(audio)
+        sound = pygame.mixer.Sound(path)
+    else:
+        sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+    if skip_seconds <= 0:
+        return sound
+    frequency, size, channels = pygame.mixer.get_init()
+    frame_bytes = abs(size) // 8 * channels
+    return pygame.mixer.Sound(buffer=sound.get_raw()[round(skip_seconds * frequency) * frame_bytes:])
+
+
+def PlaySound(sound, channel=None) -> PlaybackHandle:
+    """Start a pygame Sound and return a handle that completes when it ends."""
+    channel = channel or pygame.mixer.find_channel(True)
+    handle = PlaybackHandle(channel)
+    channel.play(sound)
+    handle.finish_at(time.monotonic() + sound.get_length(), sound)
+    return handle
+
+
+async def WaitWithStop(handle, stop_callback=None):
+    """Await a playback handle, stopping it once ``stop_callback()`` returns True."""
+    waiter = asyncio.ensure_future(handle.wait_async())
+    while stop_callback is not None and not waiter.done():
+        if stop_callback():
+            handle.stop()
+            break
+        await asyncio.wait({waiter}, timeout=STOP_CHECK_SECONDS)
+    await waiter
+
+
+class StreamPlayer:
+    """Plays decoded segments back to back on one reserved mixer channel.
+
+    Segments are queued on the channel one ahead of the one playing, so
+    there is no gap between them; the feeder thread sleeps until the
+    channel's queue slot frees instead of polling. ``done`` is the
+    PlaybackHandle of the whole stream.
+    """
+
+    def __init__(self, channel=None):
+        if channel is None:
+            pygame.mixer.set_reserved(1)
+            channel = pygame.mixer.Channel(0)
+        self.channel = channel
+        self.done = PlaybackHandle(channel)
+        self._sounds = queue.Queue()
+        self._stopped = threading.Event()
+        self.segments = 0
+        self.started_at = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def feed(self, audio: bytes, skip_seconds=0.0):
+        """Decode a run of whole MP3 frames in memory and schedule it.
+
+        ``skip_seconds`` of decoded audio (the frames carried over from the
+        previous run, see MP3Segmenter) are dropped.
+        """
+        if audio and not self._stopped.is_set():
+            self._sounds.put(DecodeSound(audio, skip_seconds))
+
+    def finish(self):
+        """No more segments will be fed."""
+        self._sounds.put(None)
+
+    def stop(self):
+        self._stopped.set()
+        self._sounds.put(None)
+        self.done.stop()
+
+    def wait(self, timeout=None) -> bool:
+        """Block until everything fed has played (or playback was stopped)."""
+        return self.done.wait(timeout)
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def _run(self):
+        slot_free_at = playing_until = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                sound = self._sounds.get()
+                if sound is None:
+                    break
+                length = sound.get_length()
+                now = time.monotonic()
+                if now >= playing_until or not self.channel.get_busy():
+                    # Nothing playing (first segment, or the stream fell behind)
+                    self.channel.play(sound)
+                    slot_free_at, playing_until = now, now + length
+                else:
+                    # The queue slot frees when the segment ahead of it starts
+                    if self._stopped.wait(max(0.0, slot_free_at - now)):
+                        break
+                    self.channel.queue(sound)
+                    slot_free_at, playing_until = playing_until, playing_until + length
+                if self.started_at is None:
+                    self.started_at = now
+                self.segments += 1
+        except Exception as e:
+            logging.error(f"Stream playback error: {e}")
+            self.done.stop()
+        # Completes when the last segment ends
+        self.done.finish_at(playing_until)
+
+
+async def PlayStream(chunks, stop_callback=None, channel=None):
+    """Play MP3 audio from an async iterator of byte chunks as it arrives.
+
+    The first complete frames start playing right away; later segments grow
+    (up to MAX_SEGMENT_SECONDS) so there are few decode boundaries. Returns
+    (all audio bytes, or None if stopped before the stream ended; seconds
+    until playback started) once playback ends.
+    """
+    started = time.perf_counter()
+    segmenter = MP3Segmenter()
+    player = StreamPlayer(channel)
+    audio = bytearray()
+    first_audio = None
+    complete = False
+    target = 0.0   # Play the first frames immediately
+    try:
+        async for data in chunks:
+            if stop_callback and stop_callback():
+                player.stop()
+                break
+            audio.extend(data)
+            segmenter.write(data)
+            if segmenter.seconds_ready > target:
+                target = min(max(segmenter.seconds_ready * 2, 0.25), MAX_SEGMENT_SECONDS)
+                player.feed(*segmenter.take())
+                if first_audio is None:
+                    first_audio = time.perf_counter() - started
+        else:
+            complete = True
+            player.feed(*segmenter.take())
+    finally:
+        player.finish()
+        if not complete and hasattr(chunks, "aclose"):
+            await chunks.aclose()
+
+    # Wait for playback without blocking the event loop, honouring the stop callback
+    await WaitWithStop(player.done, stop_callback)
+    return (bytes(audio) if complete else None), first_audio
+
+
+async def PlayBytes(audio: bytes, stop_callback=None, channel=None):
+    """Play a complete MP3 held in memory."""
+    async def single():
+        yield audio
+    played, _ = await PlayStream(single(), stop_callback, channel)
+    return played is not None
@@ -1,4 +1,3 @@
-import requests  # Added to fix NameError
 from AppOpener import close, open as appopen
 from pywhatkit import search as pywhatkit_search, playonyt
 from dotenv import dotenv_values
@@ -17,6 +16,8 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import pyautogui
+from Backend.Retry import CallWithRetry
+from Backend.HttpClient import GetSession, Get
 
 
 # Configure logging
@@ -67,12 +68,9 @@ if GROQ_API_KEY:
 else:
     logging.warning("GROQ_API_KEY not found or invalid in .env file. AI features disabled.")
 
-# Configure HTTP session
+# Configure HTTP session (shared keep-alive pool)
 try:
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    })
+    session = GetSession()
     logging.info("HTTP session initialized successfully")
 except Exception as e:
     logging.error(f"Failed to initialize HTTP session: {str(e)}")
@@ -95,6 +93,21 @@ def GoogleSearch(query: str) -> bool:
         logging.error(f"Google search failed: {str(e)}")
         return False
 
+# Slides of a generated presentation, also used for the offline outline
+PRESENTATION_SLIDES = ["Title", "Purpose", "Key Features", "How It Works", "Example Usage", "Conclusion"]
+
+def OfflineDraft(topic: str) -> str:
+    """Outline saved instead of generated content while Groq is unreachable."""
+    sections = ["Introduction", "Main Points", "Details and Examples", "Conclusion"]
+    body = "\n\n".join(f"{section}\n- " for section in sections)
+    return f"(Offline draft: the writing model was unavailable, fill in or regenerate later.)\n\n{body}"
+
+def OfflinePresentation(topic: str) -> str:
+    """Slide outline in the generated format, used while Groq is unreachable."""
+    slides = [f"Slide 1: {topic.title()}\n- Offline outline: the writing model was unavailable"]
+    slides += [f"Slide {number}: {title}\n- " for number, title in enumerate(PRESENTATION_SLIDES[1:], start=2)]
+    return "\n\n".join(slides)
+
 def Content(topic: str) -> bool:
     """Generate and save AI content using Groq"""
     if not client:
@@ -105,13 +118,20 @@ def Content(topic: str) -> bool:
         """Generate content using Groq"""
         try:
             messages.append({"role": "user", "content": prompt})
-            response = client.chat.completions.create(
+            response = CallWithRetry(
+                "groq",
+                client.chat.completions.create,
+                fallback=lambda: None,
                 model="llama3-70b-8192",
                 messages=messages[-6:],
                 temperature=0.7,
                 max_tokens=2000,
                 top_p=1.0
             )
+            if response is None:
+                messages.pop()
+                logging.warning(f"Groq unavailable; saving an offline draft for: {prompt[:50]}")
+                return OfflineDraft(prompt)
             content = response.choices[0].message.content.strip()
             messages.append({"role": "assistant", "content": content})
             logging.info(f"Generated content for prompt: {prompt[:50]}...")
@@ -156,13 +176,20 @@ def CreateGammaPresentation(topic: str) -> bool:
         """Generate presentation content using Groq"""
         try:
             messages.append({"role": "user", "content": f"Create a presentation outline about {prompt} with 6 slides: Title, Purpose, Key Features, How It Works, Example Usage, and Conclusion. For each slide, provide a title and 3-5 concise bullet points. Format as plain text with slide titles prefixed by 'Slide X: ' and bullet points prefixed by '- '. Separate slides with a blank line."})
-            response = client.chat.completions.create(
+            response = CallWithRetry(
+                "groq",
+                client.chat.completions.create,
+                fallback=lambda: None,
                 model="llama3-70b-8192",
                 messages=messages[-6:],
                 temperature=0.7,
                 max_tokens=2000,
                 top_p=1.0
             )
+            if response is None:
+                messages.pop()
+                logging.warning(f"Groq unavailable; saving an offline outline for: {prompt[:50]}")
+                return OfflinePresentation(prompt)
             content = response.choices[0].message.content.strip()
             messages.append({"role": "assistant", "content": content})
             logging.info(f"Generated presentation content for: {prompt[:50]}...")
@@ -264,8 +291,7 @@ def OpenApp(app_name: str) -> bool:
             logging.error(f"Cannot open website for {app_name}: HTTP session not initialized")
             return False
         try:
-            url = f"https://www.google.com/search?q={app_name}+official+site"
-            response = session.get(url)
+            response = Get("https://www.google.com/search", params={"q": f"{app_name} official site"})
             soup = BeautifulSoup(response.text, "html.parser")
             link = soup.find("a", {"jsname": "UWckNb"})
             if link and (href := link.get("href")):
@@ -0,0 +1,472 @@
+import os
+import re
+import json
+import hashlib
+import math
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict, Counter
+from concurrent.futures import Future
+
+# Words that carry no meaning for cache lookups
+FILLER_WORDS = {"jarvis", "please", "hey", "ok", "okay", "so", "um", "uh", "could", "would", "tell", "me"}
+CONTRACTIONS = {
+    "what's": "what is", "who's": "who is", "where's": "where is", "how's": "how is",
+    "it's": "it is", "that's": "that is", "i'm": "i am", "you're": "you are",
+    "don't": "do not", "can't": "can not", "won't": "will not", "let's": "let us",
+}
+
+SAVE_DELAY = 2.0  # Seconds to batch writes before the cache file is rewritten
+
+
+def NormalizeQuery(query: str, drop_fillers: bool = False) -> str:
+    """Normalize a query for use as a cache key (case, punctuation, contractions, spacing)."""
+    if not query:
+        return ""
+    text = query.lower().replace("’", "'")
+    words = []
+    for word in text.split():
+        word = word.strip(".,!?;:\"()[]{}")
+        word = CONTRACTIONS.get(word, word)
+        if word:
+            words.append(word)
+    text = re.sub(r"[^\w\s']", " ", " ".join(words))
+    words = text.split()
+    if drop_fillers:
+        kept = [w for w in words if w not in FILLER_WORDS]
+        words = kept or words
+    return " ".join(words)
+
+
+class PersistentLRUCache:
+    """Size-bounded LRU cache with per-entry TTL, persisted to a JSON file."""
+
+    def __init__(self, path, max_entries=500, ttl=None, save_delay=SAVE_DELAY):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.save_delay = save_delay
+
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._save_timer = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._load()
+        atexit.register(self.save)
+
+    def _load(self):
+        """Warm-load entries from disk, dropping anything already expired."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logging.error(f"Ignoring unreadable cache file {self.path}: {e}")
+            return
+        now = time.time()
+        for key, entry in entries:
+            if not self._expired(entry, now):
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _expired(self, entry, now=None):
+        ttl = entry.get("ttl", self.ttl)
+        return ttl is not None and (now or time.time()) - entry["time"] > ttl
+
+    def get(self, key, default=None):
+        """Return a cached value and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                del self._entries[key]
+                self.expirations += 1
+                self._schedule_save()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["value"]
+
+    def get_entry(self, key):
+        """Return the raw entry (value, time, extras) without TTL checks or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl=None, **extra):
+        """Store a value, evicting the least recently used entries over the size cap."""
+        with self._lock:
+            entry = {"value": value, "time": time.time(), **extra}
+            if ttl is not None:
+                entry["ttl"] = ttl
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._schedule_save()
+
+    def entries(self):
+        """Snapshot of (key, entry) pairs, oldest first."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def delete(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._schedule_save()
+
+    def _schedule_save(self):
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Write the cache to disk atomically if it changed."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(list(self._entries.items()), f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                logging.error(f"Failed to save cache {self.path}: {e}")
+
+    def stats(self):
+        """Hit/miss counters for tuning."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# ===================== Chat response cache =====================
+RESPONSE_CACHE_PATH = os.path.join("Data", "ResponseCache.json")
+
+# Queries whose answer changes with time, like the RealtimeInformation block
+VOLATILE_PATTERN = re.compile(
+    r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|current|currently|latest|recent|"
+    r"news|headline|weather|temperature|score|price|stock|this (week|month|year)|remind|reminder)\b"
+)
+# Follow-ups that only make sense with the conversation before them
+CONTEXTUAL_PATTERN = re.compile(r"\b(he|she|him|her|his|they|them|their|it|that|this|those|these|more|again|above)\b")
+DEGRADED_SIMILARITY = 0.6     # Looser match accepted when the model is unreachable
+
+
+def TrigramVector(text: str):
+    """Cheap local embedding: character trigram counts of the normalized text."""
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def CosineSimilarity(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b.get(gram, 0) for gram, count in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """Cache of chatbot answers keyed by normalized query, with optional similarity lookup."""
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_entries=500, ttl=7 * 24 * 3600,
+                 similarity_threshold=None, embed=TrigramVector):
+        self.store = PersistentLRUCache(path, max_entries=max_entries, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        self._vectors = {}  # Embeddings of cached keys, computed once
+        self.similar_hits = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def is_cacheable(query: str) -> bool:
+        """Time-sensitive and context-dependent queries always go to the model."""
+        normalized = NormalizeQuery(query)
+        return bool(normalized) and not VOLATILE_PATTERN.search(normalized) \
+            and not CONTEXTUAL_PATTERN.search(normalized)
+
+    def get(self, query: str):
+        """Return a cached answer for the query, or None."""
+        if not self.is_cacheable(query):
+            self.bypassed += 1
+            return None
+        key = NormalizeQuery(query, drop_fillers=True)
+        answer = self.store.get(key)
+        if answer is not None or not self.similarity_threshold:
+            return answer
+
+        best_key, best_score = self._nearest(key)
+        if best_key is not None and best_score >= self.similarity_threshold:
+            answer = self.store.get(best_key)
+            if answer is not None:
+                # Count this lookup as a hit rather than the exact-key miss above
+                self.store.misses -= 1
+                self.similar_hits += 1
+                logging.debug(f"Response cache similar hit ({best_score:.2f}): {key!r} ~ {best_key!r}")
+        return answer
+
+    def _nearest(self, key):
+        """(cached key, similarity) of the cached query closest to ``key``."""
+        vector = self.embed(key)
+        best_key, best_score = None, 0.0
+        vectors = {}
+        for cached_key, _ in self.store.entries():
+            cached_vector = self._vectors.get(cached_key) or self.embed(cached_key)
+            vectors[cached_key] = cached_vector
+            score = CosineSimilarity(vector, cached_vector)
+            if score > best_score:
+                best_key, best_score = cached_key, score
+        self._vectors = vectors     # Keys the LRU evicted or expired drop out here
+        return best_key, best_score
+
+    def closest(self, query: str, threshold=DEGRADED_SIMILARITY):
+        """Best cached answer for a similar query, even a loose match, or None.
+
+        Used when the model is unreachable: an answer to a related question
+        beats no answer. Does not count toward the hit statistics.
+        """
+        key = NormalizeQuery(query, drop_fillers=True)
+        entry = self.store.get_entry(key)
+        if entry is None:
+            best_key, best_score = self._nearest(key)
+            if best_key is None or best_score < threshold:
+                return None
+            entry = self.store.get_entry(best_key)
+        return entry["value"] if entry is not None else None
+
+    def put(self, query: str, answer: str):
+        if answer and self.is_cacheable(query):
+            self.store.set(NormalizeQuery(query, drop_fillers=True), answer)
+
+    def stats(self):
+        stats = self.store.stats()
+        stats["similar_hits"] = self.similar_hits
+        stats["bypassed"] = self.bypassed
+        return stats
+
+
+# ===================== Decision cache =====================
+DECISION_CACHE_PATH = os.path.join("Data", "DecisionCache.json")
+
+
+class DecisionCache:
+    """Normalized prompt -> task list cache for the decision model.
+
+    Keys are prefixed with a fingerprint of the prompt configuration
+    (preamble, funcs, model name), so changing any of them invalidates
+    every entry made under the old configuration.
+    """
+
+    def __init__(self, preamble, funcs, model, path=DECISION_CACHE_PATH, max_entries=1000, ttl=None):
+        self.fingerprint = hashlib.sha256(
+            json.dumps([preamble, list(funcs), model], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        self.store = PersistentLRUCache(path, max_entries=max_entries, ttl=ttl)
+        self._drop_stale()
+
+    def _drop_stale(self):
+        """Forget entries warm-loaded from an older configuration."""
+        stale = [key for key, _ in self.store.entries() if not key.startswith(self.fingerprint + ":")]
+        for key in stale:
+            self.store.delete(key)
+        if stale:
+            logging.info(f"Dropped {len(stale)} decision cache entries from an old prompt configuration")
+
+    def key(self, prompt: str) -> str:
+        return f"{self.fingerprint}:{NormalizeQuery(prompt, drop_fillers=True)}"
+
+    def get(self, prompt: str):
+        tasks = self.store.get(self.key(prompt))
+        return list(tasks) if tasks is not None else None
+
+    def put(self, prompt: str, tasks):
+        if tasks and NormalizeQuery(prompt):
+            self.store.set(self.key(prompt), list(tasks))
+
+    def stats(self):
+        return self.store.stats()
+
+
+# ===================== Search result cache =====================
+SEARCH_CACHE_PATH = os.path.join("Data", "SearchCache.json")
+
+# Freshness per kind of query, in seconds
+SEARCH_TTLS = {
+    "news": 10 * 60,            # Headlines, scores, prices, weather
+    "biography": 7 * 24 * 3600, # Who is / who was
+    "default": 6 * 3600,
+}
+# How long past its TTL a result may still be served while it is refreshed
+SEARCH_STALE_WINDOWS = {
+    "news": 5 * 60,             # Never answer with headlines more than 15 minutes old
+    "biography": 7 * 24 * 3600,
+    "default": 24 * 3600,
+}
+
+NEWS_PATTERN = re.compile(
+    r"\b(news|headlines?|today|tonight|latest|live|score|scores|price|prices|stock|stocks|weather|"
+    r"temperature|election|match|breaking|now|current|this (week|month))\b"
+)
+BIOGRAPHY_PATTERN = re.compile(r"^(who (is|was|are|were)\b|biography\b|tell me about\b)|\bbiography\b|\bborn\b")
+
+
+def SearchCategory(query: str) -> str:
+    """Pick the freshness category of a search query."""
+    normalized = NormalizeQuery(query)
+    if NEWS_PATTERN.search(normalized):
+        return "news"
+    if BIOGRAPHY_PATTERN.search(normalized):
+        return "biography"
+    return "default"
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one in-flight call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+
+class SearchCache:
+    """Memory + disk cache of search results with per-category TTLs.
+
+    Concurrent lookups for the same query share one request, and results
+    past their TTL (but inside their category's stale window) are served
+    immediately while a background refresh runs. Each entry is kept on
+    disk for its own TTL plus stale window.
+    """
+
+    def __init__(self, path=SEARCH_CACHE_PATH, max_entries=300, ttls=None, stale_windows=None):
+        self.ttls = ttls or SEARCH_TTLS
+        self.stale_windows = stale_windows or SEARCH_STALE_WINDOWS
+        # Entries stored without their own TTL fall back to the longest-lived category
+        self.store = PersistentLRUCache(path, max_entries=max_entries,
+                                        ttl=max(self._lifetime(category) for category in self.ttls))
+        self.flight = SingleFlight()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _stale_window(self, category):
+        return self.stale_windows.get(category, self.stale_windows["default"])
+
+    def _lifetime(self, category):
+        return self.ttls[category] + self._stale_window(category)
+
+    def _fetch_and_store(self, key, query, fetch):
+        results = fetch(query)
+        if results:
+            category = SearchCategory(query)
+            self.store.set(key, results, ttl=self._lifetime(category),
+                           fresh_for=self.ttls[category], category=category)
+        return results
+
+    def _revalidate(self, key, query, fetch):
+        def refresh():
+            try:
+                self.flight.do(key, lambda: self._fetch_and_store(key, query, fetch))
+                self.refreshes += 1
+            except Exception as e:
+                logging.warning(f"Background search refresh failed for {query!r}: {e}")
+        if not self.flight.in_flight(key):
+            threading.Thread(target=refresh, daemon=True).start()
+
+    def get(self, query: str, fetch):
+        """Return results for ``query``, calling ``fetch(query)`` only when needed."""
+        key = NormalizeQuery(query, drop_fillers=True)
+        entry = self.store.get_entry(key)
+        if entry is not None:
+            age = time.time() - entry["time"]
+            fresh_for = entry.get("fresh_for", self.ttls["default"])
+            if age <= fresh_for:
+                self.fresh_hits += 1
+                return entry["value"]
+            if age <= fresh_for + self._stale_window(entry.get("category", "default")):
+                self.stale_hits += 1
+                self._revalidate(key, query, fetch)
+                return entry["value"]
+        self.misses += 1
+        return self.flight.do(key, lambda: self._fetch_and_store(key, query, fetch))
+
+    def peek(self, query: str):
+        """Cached results regardless of age (for degraded mode), or None."""
+        entry = self.store.get_entry(NormalizeQuery(query, drop_fillers=True))
+        return entry["value"] if entry is not None else None
+
+    def stats(self):
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            "size": len(self.store),
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.fresh_hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "coalesced": self.flight.coalesced,
+        }
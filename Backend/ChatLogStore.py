@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+
+# Chat log file paths
+CHAT_LOG_PATH = os.path.join("Data", "ChatLog.json")
+JOURNAL_SUFFIX = ".journal"
+
+# Journal tuning
+COMPACT_EVERY = 500       # Fold the journal into the snapshot after this many records
+FSYNC_EVERY = 8           # Force records to disk after this many unsynced appends
+FSYNC_INTERVAL = 2.0      # ...or after this many seconds, whichever comes first
+
+
+class ChatLogStore:
+    """Chat history kept as a JSON snapshot plus an append-only JSON Lines journal.
+
+    A turn only writes its new records to the journal. The snapshot (the
+    classic ``Data/ChatLog.json`` list) is rewritten atomically during
+    compaction, so other readers still see a valid JSON file.
+    """
+
+    def __init__(self, path=CHAT_LOG_PATH, compact_every=COMPACT_EVERY,
+                 fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_every = compact_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._messages = []
+        self._journal = None
+        self._journal_records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer = None
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._load()
+        if self._journal_records >= self.compact_every:
+            self.compact()
+        self._open_journal()
+
+    # ---------- Loading ----------
+    def _load(self):
+        """Load the snapshot, then replay journal records not yet compacted."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._messages = snapshot if isinstance(snapshot, list) else []
+        except FileNotFoundError:
+            self._messages = []
+            self._write_snapshot()
+        except json.JSONDecodeError as e:
+            logging.error(f"Chat log snapshot is corrupt, starting from journal only: {e}")
+            self._messages = []
+
+        self._journal_records = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write; everything before it is intact
+                        logging.warning("Skipping incomplete chat journal record")
+                        continue
+                    self._journal_records += 1
+                    seq = record.pop("seq", None)
+                    # Records already folded into the snapshot (crash between replace and truncate)
+                    if seq is not None and seq < len(self._messages):
+                        continue
+                    self._messages.append(record)
+        except FileNotFoundError:
+            pass
+
+    def _open_journal(self):
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    # ---------- Writing ----------
+    def append(self, *records):
+        """Append chat records (``{"role": ..., "content": ...}``) to the log."""
+        if not records:
+            return
+        with self._lock:
+            lines = []
+            for record in records:
+                entry = {"role": record["role"], "content": record["content"]}
+                self._messages.append(entry)
+                lines.append(json.dumps(
+                    {"seq": len(self._messages) - 1, **entry},
+                    ensure_ascii=False, separators=(",", ":")
+                ))
+            self._journal.write("\n".join(lines) + "\n")
+            self._journal.flush()
+            self._journal_records += len(records)
+            self._unsynced += len(records)
+
+            if self._journal_records >= self.compact_every:
+                self.compact()
+            elif (self._unsynced >= self.fsync_every
+                  or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            else:
+                self._schedule_sync()
+
+    def _sync(self):
+        """fsync the journal so batched records survive a power loss."""
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._journal is None or self._unsynced == 0:
+                return
+            try:
+                os.fsync(self._journal.fileno())
+            except OSError as e:
+                logging.error(f"Chat journal fsync failed: {e}")
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _schedule_sync(self):
+        """Make sure a lone append is still synced within ``fsync_interval``."""
+        if self._sync_timer is None:
+            self._sync_timer = threading.Timer(self.fsync_interval, self._sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _write_snapshot(self):
+        """Atomically replace the snapshot with the current history."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._messages, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def compact(self):
+        """Fold the journal into the snapshot and truncate it."""
+        with self._lock:
+            try:
+                self._write_snapshot()
+            except OSError as e:
+                logging.error(f"Chat log compaction failed: {e}")
+                return
+            if self._journal is not None:
+                self._journal.close()
+            # Truncate only after the snapshot is durable; leftovers are skipped by seq on load
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+            self._journal_records = 0
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+            if self._journal is not None:
+                self._open_journal()
+
+    def close(self):
+        """Flush pending records to disk and close the journal."""
+        with self._lock:
+            if self._journal is None:
+                return
+            self._sync()
+            self._journal.close()
+            self._journal = None
+
+    # ---------- Reading ----------
+    def messages(self):
+        """Return a copy of the full chat history."""
+        with self._lock:
+            return list(self._messages)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._messages)
+
+
+# Shared store used by the chatbot, realtime search and the GUI integration
+_chat_store = None
+_chat_store_lock = threading.Lock()
+
+def get_chat_store():
+    """Get the process-wide chat log store."""
+    global _chat_store
+    with _chat_store_lock:
+        if _chat_store is None:
+            _chat_store = ChatLogStore()
+            atexit.register(_chat_store.close)
+        return _chat_store
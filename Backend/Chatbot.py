@@ -1,19 +1,23 @@
-import os
 from groq import Groq
-from json import load, dump
 import datetime
 from dotenv import dotenv_values
+from Backend.ChatLogStore import get_chat_store
+from Backend.ContextWindow import ContextWindow, CountMessageTokens
+from Backend.Cache import ResponseCache
+from Backend.Retry import CallWithRetry
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
+ResponseCacheTTL = float(env_vars.get("ResponseCacheTTL", 7 * 24 * 3600))
+ResponseCacheSize = int(env_vars.get("ResponseCacheSize", 500))
+ResponseCacheSimilarity = env_vars.get("ResponseCacheSimilarity")  # e.g. 0.9 to enable fuzzy hits
 # Initialize Groq Client
 client = Groq(api_key=GroqAPIKey)
 
-# Initialize messages and system prompt
-messages = []
+# Initialize system prompt
 System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
 *** Do not tell time until I ask, do not talk too much, just answer the question.***
 *** Reply in only English, even if the question is in Hindi, reply in English.***
@@ -21,16 +25,18 @@ System = f"""Hello, I am {Username}, You are a very accurate and advanced AI cha
 """
 SystemChatBot = [{"role": "system", "content": System}]
 
-# Load chat log or create if not found
-chat_log_path = "Data/ChatLog.json"
-os.makedirs(os.path.dirname(chat_log_path), exist_ok=True)
+# Shared chat log (snapshot + append-only journal)
+chat_store = get_chat_store()
 
-try:
-    with open(chat_log_path, "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(chat_log_path, "w") as f:
-        dump([], f)
+# Recent turns plus a rolling summary of older ones
+context_window = ContextWindow(name="chatbot")
+
+# Answers to repeated general questions
+response_cache = ResponseCache(
+    max_entries=ResponseCacheSize,
+    ttl=ResponseCacheTTL,
+    similarity_threshold=float(ResponseCacheSimilarity) if ResponseCacheSimilarity else None
+)
 
 # Functions
 def RealtimeInformation():
@@ -51,35 +57,61 @@ def AnswerModifier(answer):
     non_empty_lines = [line.strip() for line in lines if line.strip()]
     return '\n'.join(non_empty_lines)
 
+OFFLINE_ANSWER = "I can't reach my language model right now. Please try again in a minute."
+
+def DegradedAnswer(query):
+    """Answer while Groq is unreachable: a cached answer to a similar question, or an offline notice."""
+    answer = response_cache.closest(query)
+    if answer is None:
+        return OFFLINE_ANSWER
+    return f"I can't reach my language model right now, so here is what I said about a similar question earlier: {answer}"
+
 def ChatBot(query):
     """Send user query to the chatbot and return the AI's response."""
-    global messages
     try:
-        # Add user query to messages
-        messages.append({"role": "user", "content": query})
-
-        # Call Groq API
-        completion = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages,
-            max_tokens=1024,
-            temperature=0.7,
-            top_p=1,
-            stream=True
+        # Add user query to the history sent to the model
+        user_message = {"role": "user", "content": query}
+
+        # Serve repeated general questions without calling the model
+        cached_answer = response_cache.get(query)
+        if cached_answer is not None:
+            chat_store.append(user_message, {"role": "assistant", "content": cached_answer})
+            return AnswerModifier(cached_answer)
+
+        system_messages = SystemChatBot + [{"role": "system", "content": RealtimeInformation()}]
+        messages = context_window.build(
+            chat_store.messages() + [user_message],
+            reserved_tokens=CountMessageTokens(system_messages),
+            max_completion_tokens=1024
         )
 
-        # Process response
-        answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                answer += chunk.choices[0].delta.content
-        answer = answer.replace("</s>", "").strip()
-
-        # Append assistant response and save log
-        messages.append({"role": "assistant", "content": answer})
-        with open(chat_log_path, "w") as f:
-            dump(messages, f, indent=4)
-        
+        def complete():
+            # Call Groq API
+            completion = client.chat.completions.create(
+                model="llama3-70b-8192",
+                messages=system_messages + messages,
+                max_tokens=1024,
+                temperature=0.7,
+                top_p=1,
+                stream=True
+            )
+
+            # Process response
+            answer = ""
+            for chunk in completion:
+                if chunk.choices[0].delta.content:
+                    answer += chunk.choices[0].delta.content
+            return answer.replace("</s>", "").strip()
+
+        answer = CallWithRetry("groq", complete, fallback=lambda: None)
+        if answer is None:
+            # Groq is degraded (circuit open or out of retries); the turn is not journaled or cached
+            return AnswerModifier(DegradedAnswer(query))
+
+        # Journal only the new turn
+        chat_store.append(user_message, {"role": "assistant", "content": answer})
+        response_cache.put(query, answer)
+
         return AnswerModifier(answer)
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,147 @@
+import re
+import logging
+from functools import lru_cache
+
+# Context budget (the llama3-70b-8192 context is shared by prompt and completion)
+MODEL_CONTEXT_TOKENS = 8192
+HISTORY_TOKENS = 3000       # Recent turns kept verbatim
+SUMMARY_TOKENS = 400        # Rolling summary of everything older
+WINDOW_SLACK = 0.25         # Drop this extra fraction when sliding, so the summary is rebuilt rarely
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role markers and separators per chat message
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+@lru_cache(maxsize=8192)
+def CountTokens(text: str) -> int:
+    """Estimate the token count of a string (words, punctuation and long-word pieces)."""
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        # Sub-word tokenizers keep common words whole and split long ones into ~6 character pieces
+        tokens += 1 + (len(piece) - 1) // 6 if len(piece) > 6 else 1
+    return tokens
+
+def CountMessageTokens(messages) -> int:
+    """Estimate the token count of a list of chat messages."""
+    return sum(CountTokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def ExtractiveSummary(previous_summary: str, messages, max_tokens: int = SUMMARY_TOKENS) -> str:
+    """Fold messages into a rolling summary using their first sentence, without an LLM call."""
+    lines = previous_summary.split("\n") if previous_summary else []
+    for message in messages:
+        content = " ".join(message["content"].split())
+        if not content:
+            continue
+        first_sentence = re.split(r"(?<=[.!?])\s", content, maxsplit=1)[0]
+        words = first_sentence.split()
+        if len(words) > 30:
+            first_sentence = " ".join(words[:30]) + "..."
+        speaker = "User" if message["role"] == "user" else "Assistant"
+        lines.append(f"- {speaker}: {first_sentence}")
+
+    # Oldest points fall out first once the summary exceeds its budget
+    while len(lines) > 1 and CountTokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ContextWindow:
+    """Sliding window of recent chat turns plus a cached rolling summary of older ones."""
+
+    def __init__(self, history_tokens=HISTORY_TOKENS, summary_tokens=SUMMARY_TOKENS,
+                 summarizer=ExtractiveSummary, name="chat"):
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.name = name
+
+        self._window_start = 0   # Index of the first message kept verbatim
+        self._summary = ""       # Summary of history[:_window_start]
+        self.last_stats = {}
+
+    def _fit_start(self, history, budget):
+        """Find the earliest message index whose suffix fits in ``budget`` tokens."""
+        used = 0
+        start = len(history)
+        while start > 0:
+            cost = CountTokens(history[start - 1]["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        # Always keep the newest message, and never open the window on an assistant reply
+        start = min(start, len(history) - 1)
+        while 0 < start < len(history) - 1 and history[start]["role"] != "user":
+            start += 1
+        return max(start, 0)
+
+    def build(self, history, reserved_tokens=0, max_completion_tokens=1024):
+        """Return the messages to send: [summary] + recent turns, within the token budget.
+
+        ``history`` is the full chat log ending with the current user message.
+        ``reserved_tokens`` covers system prompts sent alongside it.
+        """
+        if not history:
+            self.last_stats = {}
+            return []
+
+        budget = min(
+            self.history_tokens,
+            MODEL_CONTEXT_TOKENS - max_completion_tokens - reserved_tokens - self.summary_tokens
+        )
+        budget = max(budget, 0)
+
+        # The log was cleared or replaced; start over
+        if self._window_start > len(history) - 1:
+            self._window_start, self._summary = 0, ""
+
+        start = self._window_start
+        window_tokens = CountMessageTokens(history[start:])
+        if window_tokens > budget:
+            # Slide past the budget by some slack so the next few turns reuse this summary
+            start = max(start, self._fit_start(history, int(budget * (1 - WINDOW_SLACK))))
+
+        if start != self._window_start:
+            try:
+                self._summary = self.summarizer(
+                    self._summary, history[self._window_start:start], self.summary_tokens
+                )
+            except Exception as e:
+                logging.error(f"Context summarization failed: {e}")
+                self._summary = ExtractiveSummary(
+                    self._summary, history[self._window_start:start], self.summary_tokens
+                )
+            self._window_start = start
+            window_tokens = CountMessageTokens(history[start:])
+
+        messages = []
+        summary_tokens = 0
+        if self._summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self._summary}"
+            })
+            summary_tokens = CountMessageTokens(messages)
+        messages.extend(history[start:])
+
+        history_tokens = CountMessageTokens(history)
+        sent_tokens = window_tokens + summary_tokens
+        self.last_stats = {
+            "history_messages": len(history),
+            "window_messages": len(history) - start,
+            "summarized_messages": start,
+            "history_tokens": history_tokens,
+            "window_tokens": window_tokens,
+            "summary_tokens": summary_tokens,
+            "system_tokens": reserved_tokens,
+            "prompt_tokens": sent_tokens + reserved_tokens,
+            "saved_tokens": max(history_tokens - sent_tokens, 0),
+        }
+        logging.info(
+            f"[{self.name}] prompt tokens: {self.last_stats['prompt_tokens']} "
+            f"(saved {self.last_stats['saved_tokens']} of {history_tokens} history tokens)"
+        )
+        return messages
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+import threading
+
+# One asyncio loop, running on a daemon thread, shared by every sync entry point
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop():
+    """Return the shared background event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            threading.Thread(target=run, daemon=True, name="backend-loop").start()
+            ready.wait()
+            _loop = loop
+            logging.info("Background event loop started")
+        return _loop
+
+def in_background_loop() -> bool:
+    try:
+        return asyncio.get_running_loop() is _loop
+    except RuntimeError:
+        return False
+
+def submit(coroutine):
+    """Schedule a coroutine on the shared loop; returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_background_loop())
+
+def run_sync(coroutine, timeout=None):
+    """Run a coroutine on the shared loop and block for its result.
+
+    Replaces ``asyncio.run`` in sync code: no loop is created or torn down
+    per call. Must not be called from the loop thread itself.
+    """
+    if in_background_loop():
+        coroutine.close()
+        raise RuntimeError("run_sync() called from the background event loop; await the coroutine instead")
+    return submit(coroutine).result(timeout)
+
+def run_all(coroutines, timeout=None):
+    """Run coroutines concurrently on the shared loop; results (or exceptions) in order."""
+    async def gather():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+    return run_sync(gather(), timeout)
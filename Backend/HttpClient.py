@@ -0,0 +1,73 @@
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import dotenv_values
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+ConnectTimeout = float(env_vars.get("HttpConnectTimeout", 3.05))
+ReadTimeout = float(env_vars.get("HttpReadTimeout", 10))
+PoolHosts = int(env_vars.get("HttpPoolHosts", 10))          # Hosts kept in the pool
+PoolPerHost = int(env_vars.get("HttpPoolPerHost", 4))       # Keep-alive connections per host
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+DEFAULT_TIMEOUT = (ConnectTimeout, ReadTimeout)
+
+_session = None
+_session_lock = threading.Lock()
+_requests_per_host = defaultdict(int)
+
+
+def GetSession():
+    """Shared keep-alive session used for all outbound HTTP in the backend."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=PoolHosts, pool_maxsize=PoolPerHost, pool_block=False)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT})
+            _session = session
+            logging.info("Shared HTTP session initialized")
+        return _session
+
+def Request(method, url, params=None, timeout=None, **kwargs):
+    """Send a request through the shared pool. ``params`` are URL-encoded by requests."""
+    with _session_lock:
+        _requests_per_host[urlsplit(url).netloc] += 1
+    return GetSession().request(method, url, params=params, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+def Get(url, params=None, **kwargs):
+    return Request("GET", url, params=params, **kwargs)
+
+def Post(url, **kwargs):
+    return Request("POST", url, **kwargs)
+
+def ConnectionStats():
+    """Per-host request and connection counts; ``reused`` requests skipped a new TCP/TLS handshake."""
+    stats = {}
+    session = GetSession()
+    pools = {}
+    for adapter in set(session.adapters.values()):
+        manager = getattr(adapter, "poolmanager", None)
+        if manager is None:
+            continue
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is not None:
+                pools[pool.host] = pool
+    with _session_lock:
+        hosts = dict(_requests_per_host)
+    for host, count in hosts.items():
+        pool = pools.get(host.split(":")[0])
+        connections = pool.num_connections if pool is not None else None
+        stats[host] = {
+            "requests": count,
+            "connections": connections,
+            "reused": count - connections if connections is not None else None,
+        }
+    return stats
@@ -6,6 +6,14 @@ from dotenv import get_key
 import os
 import logging
 from time import sleep
+try:
+    from Backend.HttpClient import Post, ConnectTimeout
+except ImportError:  # Run as a script: python Backend\ImageGeneration.py
+    from HttpClient import Post, ConnectTimeout
+try:
+    from Backend.EventLoop import run_sync
+except ImportError:
+    from EventLoop import run_sync
 
 # Setup logging
 # Remove or comment out logging.basicConfig if it writes to a file
@@ -32,11 +40,12 @@ HF_API_KEY = get_key('.env', 'HuggingFaceAPIKey')
 if not HF_API_KEY:
     logging.error("HuggingFaceAPIKey not found in .env")
 headers = {"Authorization": f"Bearer {HF_API_KEY}"}
+IMAGE_TIMEOUT = (ConnectTimeout, 120)  # Generation can take a while
 
 async def query(payload):
     """Query the Hugging Face API for image generation."""
     try:
-        response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
+        response = await asyncio.to_thread(Post, API_URL, headers=headers, json=payload, timeout=IMAGE_TIMEOUT)
         response.raise_for_status()
         return response.content
     except requests.RequestException as e:
@@ -68,7 +77,7 @@ async def generate_images(prompt: str):
 def GenerateImages(prompt: str):
     """Generate and open images for the given prompt."""
     try:
-        asyncio.run(generate_images(prompt))
+        run_sync(generate_images(prompt))
         open_images(prompt)
         return True
     except Exception as e:
@@ -0,0 +1,461 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import logging
+import threading
+from collections import Counter, defaultdict
+from Backend.Cache import NormalizeQuery
+
+# Data files
+DECISION_LOG_PATH = os.path.join("Data", "DecisionLog.jsonl")
+INTENT_MODEL_PATH = os.path.join("Data", "IntentModel.json")
+
+# Only answer locally when the model is at least this sure
+CONFIDENCE_THRESHOLD = 0.85
+MIN_EXAMPLES_PER_LABEL = 5
+
+# Labels the learned model may answer on its own (their argument is the whole query)
+MODEL_LABELS = {"general", "realtime", "exit"}
+
+# Words stripped from the start of an utterance before rule matching
+LEADING_FILLERS = {"jarvis", "please", "hey", "ok", "okay", "now", "just", "can", "could", "you", "would"}
+TRAILING_FILLERS = {"please", "jarvis", "now"}
+QUESTION_WORDS = {"what", "who", "how", "why", "when", "where", "which", "is", "are", "do", "does", "tell"}
+
+# Phrase -> (task, takes_argument). The longest matching phrase wins.
+RULE_PHRASES = {
+    # Open / close take the rest of the utterance as the target
+    "open": ("open", True),
+    "launch": ("open", True),
+    "close": ("close", True),
+    "exit": ("close", True),
+    "quit": ("close", True),
+    # System controls
+    "mute": ("system mute", False),
+    "unmute": ("system unmute", False),
+    "volume up": ("system volume up", False),
+    "volume down": ("system volume down", False),
+    "increase volume": ("system volume up", False),
+    "decrease volume": ("system volume down", False),
+    # Scroll / swipe accept "by <amount>"
+    "scroll up": ("scroll up", False),
+    "scroll down": ("scroll down", False),
+    "swipe left": ("swipe left", False),
+    "swipe right": ("swipe right", False),
+    "swipe up": ("swipe up", False),
+    "swipe down": ("swipe down", False),
+    # Universal navigation
+    "zoom in": ("zoom in", False),
+    "zoom out": ("zoom out", False),
+    "page up": ("page up", False),
+    "page down": ("page down", False),
+    "next page": ("page down", False),
+    "previous page": ("page up", False),
+    "go home": ("home", False),
+    "home": ("home", False),
+    "go to end": ("end", False),
+    "go end": ("end", False),
+    "next item": ("next", False),
+    "previous item": ("previous", False),
+    "go up": ("up", False),
+    "go down": ("down", False),
+    "press enter": ("enter", False),
+    "hit enter": ("enter", False),
+    "enter": ("enter", False),
+    "press escape": ("escape", False),
+    "hit escape": ("escape", False),
+    "escape": ("escape", False),
+    "press tab": ("tab", False),
+    "press backspace": ("backspace", False),
+    "press delete": ("delete", False),
+    "select all": ("select all", False),
+    "select everything": ("select all", False),
+    "copy this": ("copy", False),
+    "copy": ("copy", False),
+    "paste": ("paste", False),
+    "paste that": ("paste", False),
+    "cut this": ("cut", False),
+    "undo": ("undo", False),
+    "undo that": ("undo", False),
+    "redo": ("redo", False),
+    "redo that": ("redo", False),
+    "save": ("save", False),
+    "save file": ("save", False),
+    "save this": ("save", False),
+    "refresh": ("refresh", False),
+    "refresh page": ("refresh", False),
+    "reload": ("refresh", False),
+    "reload page": ("refresh", False),
+    "fullscreen": ("fullscreen", False),
+    "full screen": ("fullscreen", False),
+    "maximize": ("fullscreen", False),
+    # YouTube
+    "play video": ("youtube play", False),
+    "pause video": ("youtube pause", False),
+    "pause": ("youtube pause", False),
+    "skip forward": ("youtube skip forward", False),
+    "skip backward": ("youtube skip backward", False),
+    "next video": ("youtube next video", False),
+    "previous video": ("youtube previous video", False),
+    "fullscreen video": ("youtube fullscreen", False),
+    # Browser history
+    "go back": ("web go back", False),
+    "go forward": ("web go forward", False),
+}
+
+_AMOUNT_PATTERN = re.compile(r"^(by )?(\d+)( (times|units|pixels|lines))?$")
+_SPLIT_PATTERN = re.compile(r"\s*(?:,|\band then\b|\bthen\b|\band\b)\s*")
+
+
+class PhraseTrie:
+    """Word-level trie for longest-prefix phrase matching."""
+
+    def __init__(self, phrases=None):
+        self.root = {}
+        for phrase, value in (phrases or {}).items():
+            self.insert(phrase, value)
+
+    def insert(self, phrase, value):
+        node = self.root
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node[None] = value
+
+    def longest_prefix(self, words):
+        """Return (value, words consumed) for the longest phrase that prefixes ``words``."""
+        node, best, consumed = self.root, None, 0
+        for i, word in enumerate(words):
+            node = node.get(word)
+            if node is None:
+                break
+            if None in node:
+                best, consumed = node[None], i + 1
+        return best, consumed
+
+
+class RuleMatcher:
+    """Deterministic matcher for short navigation, system and open/close commands."""
+
+    def __init__(self, phrases=RULE_PHRASES, funcs=None):
+        self.trie = PhraseTrie(phrases)
+        self.funcs = funcs
+
+    @staticmethod
+    def _strip_fillers(words):
+        while words and words[0] in LEADING_FILLERS:
+            words = words[1:]
+        while words and words[-1] in TRAILING_FILLERS:
+            words = words[:-1]
+        return words
+
+    def match_one(self, text):
+        """Map one command clause to a task string, or None if it is not a known command."""
+        words = self._strip_fillers(text.split())
+        if not words:
+            return None
+        value, consumed = self.trie.longest_prefix(words)
+        if value is None:
+            return None
+        task, takes_argument = value
+        rest = " ".join(words[consumed:])
+        if takes_argument:
+            if not rest or len(words) - consumed > 4:
+                return None
+            task = f"{task} {rest}"
+        elif rest:
+            amount = _AMOUNT_PATTERN.match(rest)
+            if not amount or not task.startswith(("scroll", "swipe")):
+                return None
+            task = f"{task} by {amount.group(2)}"
+        if self.funcs and not any(task.startswith(func) for func in self.funcs):
+            return None
+        return task
+
+    def match(self, query):
+        """Match every clause of an utterance; None unless all clauses are known commands."""
+        text = NormalizeQuery(query)
+        clauses = [c for c in _SPLIT_PATTERN.split(text) if c]
+        if not clauses or len(clauses) > 4:
+            return None
+        tasks = []
+        last_verb = None
+        for clause in clauses:
+            task = self.match_one(clause)
+            # "open chrome and firefox" -> the second clause inherits "open"
+            if task is None and last_verb and len(clause.split()) <= 2 \
+                    and clause.split()[0] not in QUESTION_WORDS:
+                task = self.match_one(f"{last_verb} {clause}")
+            if task is None:
+                return None
+            last_verb = task.split()[0] if task.split()[0] in ("open", "close") else None
+            tasks.append(task)
+        return tasks
+
+
+# ===================== Learned model =====================
+def Features(text):
+    """Unigram and bigram features of a normalized query."""
+    words = NormalizeQuery(text).split()
+    features = Counter(words)
+    features.update(f"{a}_{b}" for a, b in zip(words, words[1:]))
+    if words:
+        features[f"^{words[0]}"] += 1
+    return features
+
+def LabelOf(tasks, funcs):
+    """Intent label of a decision: the longest func prefix of its only task."""
+    if not tasks or len(tasks) != 1:
+        return None
+    matches = [func for func in funcs if tasks[0].startswith(func)]
+    return max(matches, key=len) if matches else None
+
+
+class TfidfLinearModel:
+    """Multinomial logistic regression over TF-IDF features, trained with plain SGD."""
+
+    def __init__(self, idf=None, weights=None, labels=None):
+        self.idf = idf or {}
+        self.weights = weights or {}
+        self.labels = labels or []
+
+    def vectorize(self, text):
+        counts = Features(text)
+        vector = {f: (1 + math.log(c)) * self.idf[f] for f, c in counts.items() if f in self.idf}
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {f: v / norm for f, v in vector.items()} if norm else {}
+
+    def fit(self, texts, labels, epochs=25, learning_rate=0.5, l2=1e-4, seed=13):
+        documents = [Features(t) for t in texts]
+        df = Counter(f for d in documents for f in d)
+        n = len(documents)
+        self.idf = {f: math.log((1 + n) / (1 + c)) + 1 for f, c in df.items()}
+        self.labels = sorted(set(labels))
+        self.weights = {label: defaultdict(float) for label in self.labels}
+        vectors = [self.vectorize(t) for t in texts]
+
+        order = list(range(n))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1 + epoch * 0.2)
+            for i in order:
+                probabilities = self._probabilities(vectors[i])
+                for label in self.labels:
+                    gradient = probabilities[label] - (1.0 if label == labels[i] else 0.0)
+                    weights = self.weights[label]
+                    for f, v in vectors[i].items():
+                        weights[f] -= rate * (gradient * v + l2 * weights[f])
+        self.weights = {label: dict(w) for label, w in self.weights.items()}
+        return self
+
+    def _probabilities(self, vector):
+        scores = {
+            label: sum(self.weights[label].get(f, 0.0) * v for f, v in vector.items())
+            for label in self.labels
+        }
+        top = max(scores.values())
+        exps = {label: math.exp(s - top) for label, s in scores.items()}
+        total = sum(exps.values())
+        return {label: e / total for label, e in exps.items()}
+
+    def predict(self, text):
+        """Return (label, confidence)."""
+        vector = self.vectorize(text)
+        if not vector or not self.labels:
+            return None, 0.0
+        probabilities = self._probabilities(vector)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+    def to_dict(self):
+        return {"idf": self.idf, "weights": self.weights, "labels": self.labels}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["idf"], data["weights"], data["labels"])
+
+
+# ===================== Decision log =====================
+_log_lock = threading.Lock()
+
+def LogDecision(prompt, tasks, source="cohere", path=DECISION_LOG_PATH):
+    """Record a decision so the local model can be trained and evaluated on it."""
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(
+                    {"time": time.time(), "prompt": prompt, "tasks": tasks, "source": source},
+                    ensure_ascii=False
+                ) + "\n")
+    except OSError as e:
+        logging.error(f"Failed to log decision: {e}")
+
+def LoadDecisions(path=DECISION_LOG_PATH, source="cohere"):
+    """Load recorded decisions (only those made by the remote model by default)."""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if source is None or record.get("source") == source:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+# ===================== Classifier =====================
+class IntentClassifier:
+    """On-box fast path ahead of the remote decision model.
+
+    Rules answer known commands outright; the learned model answers
+    single-intent general/realtime queries when it is confident.
+    ``classify`` returns None when the remote model should decide.
+    """
+
+    def __init__(self, funcs, model_path=INTENT_MODEL_PATH, threshold=CONFIDENCE_THRESHOLD):
+        self.funcs = funcs
+        self.model_path = model_path
+        self.threshold = threshold
+        self.rules = RuleMatcher(funcs=funcs)
+        self.model = None
+        self.rule_hits = 0
+        self.model_hits = 0
+        self.fallbacks = 0
+        self.load()
+
+    def load(self):
+        if not self.model_path:
+            return
+        try:
+            with open(self.model_path, "r", encoding="utf-8") as f:
+                self.model = TfidfLinearModel.from_dict(json.load(f))
+        except FileNotFoundError:
+            self.model = None
+        except (json.JSONDecodeError, KeyError, OSError) as e:
+            logging.error(f"Ignoring unreadable intent model: {e}")
+            self.model = None
+
+    def train(self, records=None, save=True):
+        """Train the learned model from recorded decisions. Returns the number of examples used."""
+        records = LoadDecisions() if records is None else records
+        texts, labels = [], []
+        for record in records:
+            label = LabelOf(record["tasks"], self.funcs)
+            if label is not None:
+                texts.append(record["prompt"])
+                labels.append(label)
+        counts = Counter(labels)
+        keep = {label for label, count in counts.items() if count >= MIN_EXAMPLES_PER_LABEL}
+        examples = [(t, l) for t, l in zip(texts, labels) if l in keep]
+        if len(keep) < 2:
+            logging.info("Not enough recorded decisions to train the intent model")
+            return 0
+        self.model = TfidfLinearModel().fit([t for t, _ in examples], [l for _, l in examples])
+        if save and self.model_path:
+            os.makedirs(os.path.dirname(self.model_path) or ".", exist_ok=True)
+            with open(self.model_path, "w", encoding="utf-8") as f:
+                json.dump(self.model.to_dict(), f)
+        return len(examples)
+
+    def classify(self, query):
+        """Return a task list, or None to defer to the remote model."""
+        tasks = self.rules.match(query)
+        if tasks:
+            self.rule_hits += 1
+            return tasks
+        if self.model is not None:
+            label, confidence = self.model.predict(query)
+            if label in MODEL_LABELS and confidence >= self.threshold:
+                self.model_hits += 1
+                query = " ".join(query.split())
+                return ["exit"] if label == "exit" else [f"{label} {query.lower()}"]
+        self.fallbacks += 1
+        return None
+
+    def fallback(self, query):
+        """Best local guess when the remote model is unavailable, whatever the confidence."""
+        tasks = self.rules.match(query)
+        if tasks:
+            return tasks
+        query = " ".join(query.split()).lower()
+        if self.model is not None:
+            label, _ = self.model.predict(query)
+            if label == "realtime":
+                return [f"realtime {query}"]
+        return [f"general {query}"]
+
+    def stats(self):
+        return {"rule_hits": self.rule_hits, "model_hits": self.model_hits, "fallbacks": self.fallbacks}
+
+
+# ===================== Offline evaluation =====================
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def EvaluateClassifier(funcs, records=None, holdout=0.2, seed=7):
+    """Replay recorded remote decisions through the local classifier.
+
+    Trains on a random split of the log and reports coverage (share answered
+    locally), accuracy on the answered share (label and exact task list) and
+    per-query latency on the held-out part.
+    """
+    records = LoadDecisions() if records is None else records
+    records = [r for r in records if r.get("tasks")]
+    rng = random.Random(seed)
+    shuffled = records[:]
+    rng.shuffle(shuffled)
+    split = int(len(shuffled) * (1 - holdout))
+    train, test = shuffled[:split], shuffled[split:]
+
+    classifier = IntentClassifier(funcs, model_path=None)
+    classifier.train(train, save=False)
+
+    answered = label_correct = exact_correct = 0
+    latencies = []
+    for record in test:
+        started = time.perf_counter()
+        tasks = classifier.classify(record["prompt"])
+        latencies.append((time.perf_counter() - started) * 1e6)
+        if tasks is None:
+            continue
+        answered += 1
+        expected = [t.lower().strip() for t in record["tasks"]]
+        got = [t.lower().strip() for t in tasks]
+        exact_correct += got == expected
+        label_correct += [LabelOf([t], funcs) for t in got] == [LabelOf([t], funcs) for t in expected]
+
+    return {
+        "train_examples": len(train),
+        "test_examples": len(test),
+        "coverage": answered / len(test) if test else 0.0,
+        "label_accuracy": label_correct / answered if answered else 0.0,
+        "exact_accuracy": exact_correct / answered if answered else 0.0,
+        "latency_us_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_us_p50": _percentile(latencies, 0.5),
+        "latency_us_p95": _percentile(latencies, 0.95),
+        **classifier.stats(),
+    }
+
+
+if __name__ == "__main__":
+    # python -m Backend.IntentClassifier [train|eval]
+    from Backend.IntentTable import funcs
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "eval"
+    if command == "train":
+        print(f"Trained on {IntentClassifier(funcs).train()} recorded decisions")
+    else:
+        for name, value in EvaluateClassifier(funcs).items():
+            print(f"{name:>18}: {value:.3f}" if isinstance(value, float) else f"{name:>18}: {value}")
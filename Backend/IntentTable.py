@@ -0,0 +1,113 @@
+# Structured definition of every task the decision model can emit.
+# `funcs` and the compact decision preamble are both generated from this table,
+# so adding an intent here is enough to make it valid and to teach it to the model.
+#
+# Each entry: func prefix, output format(s), when to use it, and one example.
+
+INTENTS = [
+    {"func": "exit", "formats": ["exit"],
+     "when": "user says goodbye or wants to end the conversation",
+     "example": ("bye jarvis.", "exit")},
+    {"func": "general", "formats": ["general (query)"],
+     "when": "an LLM can answer without up-to-date data; also incomplete or pronoun-only queries "
+             "(even if they need fresh data) and questions about time/day/date/month/year",
+     "example": ("who was akbar?", "general who was akbar?")},
+    {"func": "realtime", "formats": ["realtime (query)"],
+     "when": "needs up-to-date information, news, or is about a specific person or thing",
+     "example": ("who is indian prime minister", "realtime who is indian prime minister")},
+    {"func": "open", "formats": ["open (app or website)"],
+     "when": "open an application or website",
+     "example": ("open facebook and telegram", "open facebook, open telegram")},
+    {"func": "close", "formats": ["close (app name)"],
+     "when": "close an application or website",
+     "example": ("close notepad", "close notepad")},
+    {"func": "play", "formats": ["play (song name)"],
+     "when": "play a song",
+     "example": ("play let her go", "play let her go")},
+    {"func": "generate image", "formats": ["generate image (image prompt)"],
+     "when": "generate an image",
+     "example": ("generate image of a lion", "generate image of a lion")},
+    {"func": "system", "formats": ["system (task)"],
+     "when": "mute, unmute, volume up, volume down",
+     "example": ("mute the volume", "system mute")},
+    {"func": "content", "formats": ["content (topic)"],
+     "when": "write content such as applications, code or emails",
+     "example": ("write an email to my boss about leave", "content email to my boss about leave")},
+    {"func": "google search", "formats": ["google search (topic)"],
+     "when": "search a topic on google",
+     "example": ("search python on google", "google search python")},
+    {"func": "youtube search", "formats": ["youtube search (topic)"],
+     "when": "search a topic on youtube",
+     "example": ("search lofi music on youtube", "youtube search lofi music")},
+    {"func": "reminder", "formats": ["reminder (datetime with message)"],
+     "when": "set a reminder",
+     "example": ("set a reminder at 9:00pm on 25th june for my business meeting.",
+                 "reminder 9:00pm 25th june business meeting")},
+    {"func": "scroll", "formats": ["scroll up (amount)", "scroll down (amount)"],
+     "when": "scroll the page", "example": ("scroll down by 10", "scroll down by 10")},
+    {"func": "swipe", "formats": ["swipe left|right|up|down (amount)"],
+     "when": "swipe in a direction", "example": ("swipe left by 100", "swipe left by 100")},
+    {"func": "pdf", "formats": ["pdf next page", "pdf previous page", "pdf zoom in", "pdf zoom out",
+                                "pdf scroll up (amount)", "pdf scroll down (amount)"],
+     "when": "navigate a PDF", "example": ("next page in PDF", "pdf next page")},
+    {"func": "youtube", "formats": ["youtube play", "youtube pause", "youtube skip forward", "youtube skip backward",
+                                    "youtube fullscreen", "youtube volume up", "youtube volume down",
+                                    "youtube next video", "youtube previous video",
+                                    "youtube scroll feed up (amount)", "youtube scroll feed down (amount)"],
+     "when": "control a YouTube video or feed", "example": ("next video", "youtube next video")},
+    {"func": "web", "formats": ["web scroll up (amount)", "web scroll down (amount)", "web refresh",
+                                "web go back", "web go forward"],
+     "when": "scroll or navigate a web page", "example": ("go back", "web go back")},
+    {"func": "zoom", "formats": ["zoom in", "zoom out"], "when": "zoom", "example": None},
+    {"func": "page", "formats": ["page up", "page down"], "when": "previous/next page", "example": None},
+    {"func": "home", "formats": ["home"], "when": "go to the beginning", "example": None},
+    {"func": "end", "formats": ["end"], "when": "go to the end", "example": None},
+    {"func": "next", "formats": ["next"], "when": "next item", "example": None},
+    {"func": "previous", "formats": ["previous"], "when": "previous item", "example": None},
+    {"func": "up", "formats": ["up"], "when": "go up", "example": None},
+    {"func": "down", "formats": ["down"], "when": "go down", "example": None},
+    {"func": "enter", "formats": ["enter"], "when": "press enter", "example": None},
+    {"func": "escape", "formats": ["escape"], "when": "press escape", "example": None},
+    {"func": "tab", "formats": ["tab"], "when": "press tab", "example": None},
+    {"func": "backspace", "formats": ["backspace"], "when": "press backspace", "example": None},
+    {"func": "delete", "formats": ["delete"], "when": "press delete", "example": None},
+    {"func": "select", "formats": ["select all"], "when": "select everything", "example": None},
+    {"func": "copy", "formats": ["copy"], "when": "copy", "example": None},
+    {"func": "paste", "formats": ["paste"], "when": "paste", "example": None},
+    {"func": "cut", "formats": ["cut"], "when": "cut", "example": None},
+    {"func": "undo", "formats": ["undo"], "when": "undo", "example": None},
+    {"func": "redo", "formats": ["redo"], "when": "redo", "example": None},
+    {"func": "save", "formats": ["save"], "when": "save", "example": None},
+    {"func": "find", "formats": ["find"], "when": "find text", "example": None},
+    {"func": "replace", "formats": ["replace"], "when": "find and replace", "example": None},
+    {"func": "refresh", "formats": ["refresh"], "when": "refresh or reload", "example": None},
+    {"func": "fullscreen", "formats": ["fullscreen"], "when": "go fullscreen or maximize", "example": None},
+]
+
+# List of valid functions
+funcs = [intent["func"] for intent in INTENTS]
+
+
+def CompilePreamble(intents=INTENTS):
+    """Build the compact decision preamble from the intent table."""
+    lines = [
+        "You are a decision model. Do not answer the query; classify it into tasks.",
+        "Reply only with comma-separated tasks using these formats:",
+    ]
+    # Simple key-press style intents share one line to keep the prompt short
+    simple = [i for i in intents if i["example"] is None and i["formats"] == [i["func"]]]
+    for intent in intents:
+        if intent in simple:
+            continue
+        line = f"{' | '.join(intent['formats'])}: {intent['when']}"
+        if intent["example"]:
+            query, answer = intent["example"]
+            line += f" (\"{query}\" -> {answer})"
+        lines.append(line)
+    keys = ", ".join(i["formats"][0] for i in simple)
+    lines.append(f"Single key/navigation commands (no argument): {keys}")
+    lines += [
+        "Multiple requests -> one task each, e.g. \"open facebook, telegram and close whatsapp\" -> open facebook, open telegram, close whatsapp",
+        "If unsure or the task is not listed -> general (query)",
+    ]
+    return "\n".join(lines)
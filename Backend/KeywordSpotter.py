@@ -0,0 +1,289 @@
+import os
+import sys
+import glob
+import time
+import wave
+import logging
+import numpy as np
+from dotenv import dotenv_values
+from Backend.VoiceActivity import ReadWav
+
+env_vars = dotenv_values(".env")
+# Without enrolled templates, send sleep-mode utterances to the (online) recognizers only when asked to
+WakeWordRecognizer = env_vars.get("WakeWordRecognizer", "false").lower() == "true"
+
+KEYWORD_DIR = os.path.join("Data", "Keywords")     # One folder of recorded WAV templates per keyword
+FIXTURE_DIR = os.path.join("Data", "KeywordFixtures")
+WAKE_KEYWORDS = ["wake up", "get up"]
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+MEL_FILTERS = 26
+CEPSTRA = 13                # Coefficients kept, c0 replaced by the frame's log energy
+PRE_EMPHASIS = 0.97
+TRIM_DB = 30.0              # Leading/trailing frames this far below the loudest frame are cut off
+DTW_THRESHOLD = 14.0        # Default per-frame distance below which a template matches
+THRESHOLD_MARGIN = 1.5      # Enrolled keywords: margin over the largest distance between their own templates
+ENROLL_SAMPLES = 3
+BENCH_TEMPLATES = 3         # Fixture files per keyword used as templates; the rest are test clips
+
+
+def MelFilterbank(sample_rate, fft_size, filters=MEL_FILTERS):
+    """Triangular mel filters as a (filters, fft_size // 2 + 1) matrix."""
+    mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+    hz = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+    edges = hz(np.linspace(mel(60.0), mel(sample_rate / 2), filters + 2))
+    bins = np.fft.rfftfreq(fft_size, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling))
+
+def DctMatrix(size, keep):
+    n = np.arange(size)
+    return np.cos(np.pi / size * (n[None, :] + 0.5) * np.arange(keep)[:, None])
+
+_filterbanks = {}
+
+def Features(samples, sample_rate=16000):
+    """MFCC-like features, one row per 10 ms frame, mean-normalized over the utterance.
+
+    Silence before and after the word (VAD pre-roll and hangover) is trimmed
+    so it does not dilute the alignment.
+    """
+    frame = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    signal = np.asarray(samples, dtype=np.float32) / 32768.0
+    if len(signal) < frame:
+        return np.zeros((0, CEPSTRA), dtype=np.float32)
+    count = 1 + (len(signal) - frame) // hop
+    raw = np.lib.stride_tricks.sliding_window_view(signal, frame)[::hop][:count]
+    level = np.log((raw * raw).sum(axis=1) + 1e-10)
+    loud = np.flatnonzero(level > level.max() - TRIM_DB / 10 * np.log(10))
+    signal = np.append(signal[0], signal[1:] - PRE_EMPHASIS * signal[:-1])
+    frames = np.lib.stride_tricks.sliding_window_view(signal, frame)[::hop][loud[0]:loud[-1] + 1] * np.hamming(frame)
+
+    fft_size = 1 << (frame - 1).bit_length()
+    key = (sample_rate, fft_size)
+    if key not in _filterbanks:
+        _filterbanks[key] = (MelFilterbank(sample_rate, fft_size), DctMatrix(MEL_FILTERS, CEPSTRA))
+    filterbank, dct = _filterbanks[key]
+
+    power = np.abs(np.fft.rfft(frames, fft_size)) ** 2 / fft_size
+    cepstra = np.log(power @ filterbank.T + 1e-10) @ dct.T
+    cepstra[:, 0] = np.log(power.sum(axis=1) + 1e-10)
+    return (cepstra - cepstra.mean(axis=0)).astype(np.float32)
+
+def DTWDistance(query, template):
+    """Average frame distance along the best alignment of two feature sequences.
+
+    Each query frame advances the template by 0, 1 or 2 frames, so rows can
+    be computed as whole vectors; speaking rates within 2x of the template
+    align.
+    """
+    n, m = len(query), len(template)
+    if not n or not m or n > 2 * m or m > 2 * n:
+        return np.inf
+    cost = np.sqrt(((query[:, None, :] - template[None, :, :]) ** 2).sum(axis=2))
+    previous = np.full(m, np.inf)
+    previous[0] = cost[0, 0]
+    for i in range(1, n):
+        shifted1 = np.concatenate([[np.inf], previous[:-1]])
+        shifted2 = np.concatenate([[np.inf, np.inf], previous[:-2]])
+        previous = cost[i] + np.minimum(previous, np.minimum(shifted1, shifted2))
+    return float(previous[-1] / n)
+
+
+class KeywordSpotter:
+    """Template matching of short utterances against recorded keywords.
+
+    Each keyword has a few recorded examples; an utterance matches the
+    keyword whose closest template is within that keyword's threshold.
+    Nothing leaves the machine.
+    """
+
+    def __init__(self, threshold=DTW_THRESHOLD):
+        self.default_threshold = threshold
+        self.templates = {}     # keyword -> [feature arrays]
+        self.thresholds = {}
+        self.matches = 0
+        self.rejects = 0
+
+    def add_template(self, keyword, samples, sample_rate=16000):
+        features = Features(samples, sample_rate)
+        if len(features):
+            self.templates.setdefault(keyword, []).append(features)
+            self._calibrate(keyword)
+
+    def _calibrate(self, keyword):
+        """Threshold from how far apart the keyword's own templates are."""
+        templates = self.templates[keyword]
+        distances = [DTWDistance(a, b) for i, a in enumerate(templates) for b in templates[i + 1:]]
+        distances = [d for d in distances if np.isfinite(d)]
+        self.thresholds[keyword] = max(distances) * THRESHOLD_MARGIN if distances else self.default_threshold
+
+    def load(self, directory=KEYWORD_DIR):
+        """Load ``directory/<keyword>/*.wav`` (underscores in folder names stand for spaces)."""
+        for folder in sorted(glob.glob(os.path.join(directory, "*"))):
+            if not os.path.isdir(folder):
+                continue
+            keyword = os.path.basename(folder).replace("_", " ")
+            for path in sorted(glob.glob(os.path.join(folder, "*.wav"))):
+                try:
+                    samples, rate = ReadWav(path)
+                    self.add_template(keyword, samples, rate)
+                except (OSError, ValueError, wave.Error) as e:
+                    logging.warning(f"Skipping keyword template {path}: {e}")
+        return self
+
+    def __bool__(self):
+        return bool(self.templates)
+
+    def score(self, samples, sample_rate=16000):
+        """(keyword, distance / threshold) of the closest keyword."""
+        features = Features(samples, sample_rate)
+        best = (None, np.inf)
+        for keyword, templates in self.templates.items():
+            distance = min(DTWDistance(features, template) for template in templates)
+            ratio = distance / self.thresholds[keyword]
+            if ratio < best[1]:
+                best = (keyword, ratio)
+        return best
+
+    def match(self, samples, sample_rate=16000):
+        """The keyword spoken in ``samples``, or None."""
+        keyword, ratio = self.score(samples, sample_rate)
+        if ratio <= 1.0:
+            self.matches += 1
+            return keyword
+        self.rejects += 1
+        return None
+
+    def stats(self):
+        return {
+            "keywords": {keyword: len(templates) for keyword, templates in self.templates.items()},
+            "matches": self.matches,
+            "rejects": self.rejects,
+        }
+
+
+def TranscriptMatcher(keywords=WAKE_KEYWORDS):
+    """Keyword matcher that sends the (short) utterance to the speech recognizers instead.
+
+    Used while no keyword templates are enrolled, if WakeWordRecognizer=true.
+    """
+    import speech_recognition as sr
+    from Backend.Recognizers import get_recognizer_race
+
+    def match(samples, sample_rate=16000):
+        text = get_recognizer_race().recognize(sr.AudioData(samples.tobytes(), sample_rate, 2)).lower()
+        return next((keyword for keyword in keywords if keyword in text), None)
+    return match
+
+def EnrolledKeywords(directory=KEYWORD_DIR):
+    """Keywords with at least one recorded template in ``directory``."""
+    return sorted(os.path.basename(folder).replace("_", " ")
+                  for folder in glob.glob(os.path.join(directory, "*"))
+                  if glob.glob(os.path.join(folder, "*.wav")))
+
+def get_wake_matcher(directory=KEYWORD_DIR, recognizer=None):
+    """Local spotter for the enrolled wake words, or None if none are enrolled.
+
+    With ``recognizer`` (default: the WakeWordRecognizer setting) the
+    recognizer-based matcher stands in for missing templates instead.
+    """
+    spotter = KeywordSpotter().load(directory)
+    if spotter:
+        logging.info(f"Sleep mode: spotting {sorted(spotter.templates)} locally")
+        return spotter.match
+    if WakeWordRecognizer if recognizer is None else recognizer:
+        logging.warning("No wake word templates in Data/Keywords/; sleep mode sends utterances to speech recognition")
+        return TranscriptMatcher(WAKE_KEYWORDS)
+    logging.warning("No wake word templates in Data/Keywords/; only a double clap wakes the assistant "
+                    "(run: python -m Backend.KeywordSpotter enroll \"wake up\")")
+    return None
+
+def SaveWav(path, samples, sample_rate=16000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+def Enroll(keyword, samples=ENROLL_SAMPLES, directory=KEYWORD_DIR):
+    """Record ``samples`` examples of ``keyword`` from the microphone as templates."""
+    from Backend.MicrophoneService import get_microphone_service
+    microphone = get_microphone_service()
+    folder = os.path.join(directory, keyword.replace(" ", "_"))
+    recorded = 0
+    while recorded < samples:
+        print(f"Say '{keyword}' ({recorded + 1}/{samples})...")
+        audio = microphone.listen(timeout=10)
+        if audio is None:
+            print("Nothing heard, try again.")
+            continue
+        recorded += 1
+        SaveWav(os.path.join(folder, f"{int(time.time() * 1000)}.wav"),
+                np.frombuffer(audio.get_raw_data(), dtype=np.int16), audio.sample_rate)
+    print(f"Saved {recorded} templates to {folder}")
+
+
+# ---------- Benchmark ----------
+def BenchmarkSpotter(directory=FIXTURE_DIR, templates=BENCH_TEMPLATES):
+    """Miss and false-wake rates on ``directory/<keyword>/*.wav`` and ``directory/none/*.wav``.
+
+    The first ``templates`` clips of each keyword are enrolled; the remaining
+    ones must match that keyword, and clips in ``none`` must match nothing.
+    """
+    spotter = KeywordSpotter()
+    positives, negatives = [], []
+    for folder in sorted(glob.glob(os.path.join(directory, "*"))):
+        if not os.path.isdir(folder):
+            continue
+        clips = [ReadWav(path) for path in sorted(glob.glob(os.path.join(folder, "*.wav")))]
+        name = os.path.basename(folder)
+        if name == "none":
+            negatives.extend(clips)
+            continue
+        keyword = name.replace("_", " ")
+        for samples, rate in clips[:templates]:
+            spotter.add_template(keyword, samples, rate)
+        positives.extend((keyword, samples, rate) for samples, rate in clips[templates:])
+
+    misses = wrong = false_wakes = 0
+    negative_seconds = elapsed = 0.0
+    for keyword, samples, rate in positives:
+        started = time.perf_counter()
+        found = spotter.match(samples, rate)
+        elapsed += time.perf_counter() - started
+        misses += found is None
+        wrong += found is not None and found != keyword
+    for samples, rate in negatives:
+        started = time.perf_counter()
+        false_wakes += spotter.match(samples, rate) is not None
+        elapsed += time.perf_counter() - started
+        negative_seconds += len(samples) / rate
+    checked = len(positives) + len(negatives)
+    return {
+        "keywords": spotter.stats()["keywords"],
+        "positives": len(positives),
+        "negatives": len(negatives),
+        "miss_rate": round((misses + wrong) / len(positives), 3) if positives else None,
+        "wrong_keyword": wrong,
+        "false_wake_rate": round(false_wakes / len(negatives), 3) if negatives else None,
+        "false_wakes_per_hour": round(false_wakes / negative_seconds * 3600, 1) if negative_seconds else None,
+        "avg_match_ms": round(elapsed / checked * 1000, 2) if checked else None,
+    }
+
+
+if __name__ == "__main__":
+    # python -m Backend.KeywordSpotter enroll "wake up"   records templates to Data/Keywords/
+    # python -m Backend.KeywordSpotter bench [directory]  miss/false-wake rates on Data/KeywordFixtures/
+    if len(sys.argv) > 2 and sys.argv[1] == "enroll":
+        Enroll(" ".join(sys.argv[2:]).lower())
+    elif len(sys.argv) > 1 and sys.argv[1] == "bench":
+        for key, value in BenchmarkSpotter(sys.argv[2] if len(sys.argv) > 2 else FIXTURE_DIR).items():
+            print(f"{key:20s} {value}")
+    else:
+        print(KeywordSpotter().load().stats())
@@ -0,0 +1,171 @@
+from collections import deque
+
+# MPEG audio layer III tables (edge_tts sends 24 kHz, 48 kbit/s mono MPEG-2 frames)
+_BITRATES = {
+    "mpeg1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "mpeg2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+RING_CAPACITY = 64 * 1024      # Initial ring buffer size; grows if the producer gets far ahead
+MIN_SEGMENT_FRAMES = 2         # The decoder rejects single-frame streams
+DECODER_WARMUP_FRAMES = 2      # Frames whose output feeds the next one's (IMDCT overlap, synthesis filterbank)
+MAX_CARRY_FRAMES = 8           # Recent frames kept to prefix the next segment with
+
+
+def ParseFrameHeader(header: bytes):
+    """Return (frame length in bytes, duration in seconds) of an MP3 frame header, or None."""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03        # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+    layer = (header[1] >> 1) & 0x03          # 1 = Layer III
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _BITRATES["mpeg1" if version == 3 else "mpeg2"][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    samples = 1152 if version == 3 else 576
+    length = samples // 8 * bitrate // sample_rate + padding
+    return length, samples / sample_rate
+
+def ParseSideInfo(frame: bytes):
+    """Return (main_data_begin, main data bytes the frame carries) of a Layer III frame.
+
+    ``main_data_begin`` is how many bytes of this frame's audio data sit in
+    earlier frames (the bit reservoir); 0 means the frame is self-contained.
+    """
+    mpeg1 = (frame[1] >> 3) & 0x03 == 3
+    offset = 4 if frame[1] & 0x01 else 6      # Protection bit clear: a 2-byte CRC follows the header
+    mono = frame[3] >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    main_data_begin = (frame[offset] << 1 | frame[offset + 1] >> 7) if mpeg1 else frame[offset]
+    return main_data_begin, len(frame) - offset - side_info
+
+
+class RingBuffer:
+    """Byte FIFO over a circular bytearray; grows instead of overwriting unread data."""
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data: bytes):
+        if self._size + len(data) > len(self._buffer):
+            self._grow(self._size + len(data))
+        capacity = len(self._buffer)
+        end = (self._start + self._size) % capacity
+        first = min(len(data), capacity - end)
+        self._buffer[end:end + first] = data[:first]
+        self._buffer[:len(data) - first] = data[first:]
+        self._size += len(data)
+
+    def peek(self, count, offset=0) -> bytes:
+        count = max(0, min(count, self._size - offset))
+        capacity = len(self._buffer)
+        start = (self._start + offset) % capacity
+        first = min(count, capacity - start)
+        return bytes(self._buffer[start:start + first]) + bytes(self._buffer[:count - first])
+
+    def skip(self, count):
+        count = min(count, self._size)
+        self._start = (self._start + count) % len(self._buffer)
+        self._size -= count
+
+    def read(self, count) -> bytes:
+        data = self.peek(count)
+        self.skip(len(data))
+        return data
+
+    def _grow(self, needed):
+        capacity = len(self._buffer)
+        while capacity < needed:
+            capacity *= 2
+        data = self.peek(self._size)
+        self._buffer = bytearray(capacity)
+        self._buffer[:len(data)] = data
+        self._start = 0
+
+
+class MP3Segmenter:
+    """Cuts a growing MP3 byte stream into independently decodable runs of whole frames.
+
+    A frame's audio depends on earlier frames: its data may start in their
+    bytes (the bit reservoir) and its first samples overlap theirs. So each
+    run after the first is prefixed with the frames it depends on; ``take``
+    returns how many seconds of decoded audio that prefix makes up, to be
+    dropped after decoding.
+    """
+
+    def __init__(self):
+        self.ring = RingBuffer()
+        self._scanned = 0          # Bytes from the ring start that form complete frames
+        self._scanned_seconds = 0.0
+        self._frames = []          # (length, seconds) of the complete frames
+        self._history = deque(maxlen=MAX_CARRY_FRAMES)  # (bytes, seconds) of frames already taken
+
+    def write(self, data: bytes):
+        self.ring.write(data)
+        self._scan()
+
+    def _scan(self):
+        while self.ring and len(self.ring) - self._scanned >= 4:
+            parsed = ParseFrameHeader(self.ring.peek(4, self._scanned))
+            if parsed is None:
+                if self._scanned == 0:
+                    self.ring.skip(1)  # Resync (ID3 tag or stray bytes before the first frame)
+                    continue
+                # Corrupt data mid-stream: keep the good frames, drop the byte after them
+                good = self.ring.read(self._scanned)
+                self.ring.skip(1)
+                rest = self.ring.read(len(self.ring))
+                self.ring.write(good)
+                self.ring.write(rest)
+                continue
+            length, seconds = parsed
+            if len(self.ring) - self._scanned < length:
+                break
+            self._scanned += length
+            self._scanned_seconds += seconds
+            self._frames.append((length, seconds))
+
+    @property
+    def seconds_ready(self):
+        """Seconds of complete frames buffered, once there are enough to decode."""
+        return self._scanned_seconds if len(self._frames) >= MIN_SEGMENT_FRAMES else 0.0
+
+    def _prefix(self):
+        """Frames from the history that the next frame depends on."""
+        history = list(self._history)
+        if not history:
+            return []
+        start = max(0, len(history) - DECODER_WARMUP_FRAMES)
+        # The earliest warm-up frame must decode correctly too, so include its reservoir
+        needed = ParseSideInfo(history[start][0])[0]
+        while needed > 0 and start > 0:
+            start -= 1
+            needed -= ParseSideInfo(history[start][0])[1]
+        return history[start:]
+
+    def take(self):
+        """Remove every complete frame buffered so far.
+
+        Returns (data to decode, seconds of decoded audio to drop from its start).
+        """
+        data = self.ring.read(self._scanned)
+        frames, self._frames = self._frames, []
+        self._scanned, self._scanned_seconds = 0, 0.0
+        self._scan()
+        if not data:
+            return b"", 0.0
+        prefix = self._prefix()
+        offset = 0
+        for length, seconds in frames:
+            self._history.append((data[offset:offset + length], seconds))
+            offset += length
+        return b"".join(frame for frame, _ in prefix) + data, sum(seconds for _, seconds in prefix)
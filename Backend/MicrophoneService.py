@@ -0,0 +1,196 @@
+import time
+import queue
+import logging
+import threading
+import numpy as np
+import speech_recognition as sr
+from Backend.VoiceActivity import UtteranceSegmenter, AudioRing
+
+SAMPLE_RATE = 16000
+CHUNK = 1024                # Frames per read (64 ms)
+CALIBRATION_SECONDS = 1.0   # Ambient noise measured once, when the stream opens
+MAX_UTTERANCE_AGE = 1.0     # Utterances that ended longer than this before listen() are stale
+RING_SECONDS = 10.0         # Recent audio kept for listeners (wake triggers)
+MAX_QUEUED = 8              # Unclaimed utterances kept (e.g. while asleep); the oldest are dropped
+
+
+class MicrophoneService:
+    """Owns the microphone input stream for the life of the process.
+
+    The stream is opened and calibrated once; a capture thread then reads it
+    continuously and runs it through voice-activity detection, which keeps
+    the noise floor up to date and cuts utterances as soon as speech ends.
+    Finished utterances (``sr.AudioData``) go on a queue for ``listen()``;
+    silence never reaches a recognizer.
+
+    Every chunk is also written to ``ring`` and handed to the listeners
+    registered with ``add_listener`` (``listener(samples, ring)``), so other
+    consumers share the one stream instead of opening the device themselves.
+    """
+
+    def __init__(self, device_index=None, sample_rate=SAMPLE_RATE, chunk=CHUNK):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.sample_width = 2
+        self.segmenter = UtteranceSegmenter(sample_rate)
+        self.ring = AudioRing(RING_SECONDS, sample_rate)
+        self._listeners = []
+        self.calibrations = 0
+        self.utterances = 0
+        self.stale = 0
+        self.last_latency = None    # Seconds from the end of speech to listen() returning it
+
+        self._utterances = queue.Queue()
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._thread = None
+        self._microphone = None
+        self._source = None
+
+    @property
+    def noise_floor(self):
+        return self.segmenter.detector.noise_floor
+
+    @property
+    def threshold(self):
+        return self.segmenter.detector.threshold
+
+    @property
+    def speech_ratio(self):
+        return self.segmenter.detector.ratio
+
+    @speech_ratio.setter
+    def speech_ratio(self, ratio):
+        self.segmenter.detector.ratio = ratio
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    def add_listener(self, listener):
+        """Call ``listener(samples, ring)`` with every chunk captured from now on."""
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self._listeners = [l for l in self._listeners if l is not listener]
+
+    def start(self) -> bool:
+        """Open and calibrate the stream, then start capturing. Safe to call repeatedly."""
+        with self._lock:
+            if self.running:
+                return True
+            try:
+                self._microphone = sr.Microphone(device_index=self.device_index,
+                                                 sample_rate=self.sample_rate, chunk_size=self.chunk)
+                self._source = self._microphone.__enter__()
+                self.sample_width = self._source.SAMPLE_WIDTH
+                self._calibrate()
+            except Exception as e:
+                logging.error(f"Error opening microphone: {e}")
+                self._close()
+                return False
+            self._running.set()
+            self._thread = threading.Thread(target=self._capture, daemon=True, name="microphone")
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._microphone is not None and self._source is not None:
+            try:
+                self._microphone.__exit__(None, None, None)
+            except Exception:
+                pass
+        self._microphone = self._source = None
+
+    def _read(self) -> bytes:
+        return self._source.stream.read(self.chunk)
+
+    def _calibrate(self):
+        chunks = max(1, int(CALIBRATION_SECONDS * self.sample_rate / self.chunk))
+        samples = np.frombuffer(b"".join(self._read() for _ in range(chunks)), dtype=np.int16)
+        self.segmenter.detector.calibrate(samples)
+        self.calibrations += 1
+        logging.info(f"Microphone calibrated: noise floor {self.noise_floor:.0f}, threshold {self.threshold:.0f}")
+
+    def _capture(self):
+        while self.running:
+            try:
+                data = self._read()
+            except Exception as e:
+                logging.error(f"Microphone read failed: {e}")
+                self._running.clear()
+                break
+            samples = np.frombuffer(data, dtype=np.int16)
+            self.ring.write(samples)
+            for listener in self._listeners:
+                try:
+                    listener(samples, self.ring)
+                except Exception as e:
+                    logging.error(f"Microphone listener failed: {e}")
+            for frames, _, _ in self.segmenter.push(samples):
+                audio = sr.AudioData(frames, self.sample_rate, self.sample_width)
+                if self._utterances.qsize() >= MAX_QUEUED:
+                    try:
+                        self._utterances.get_nowait()
+                        self.stale += 1
+                    except queue.Empty:
+                        pass
+                self._utterances.put((time.monotonic(), audio))
+                self.utterances += 1
+
+    def listen(self, timeout=None):
+        """Next utterance as ``sr.AudioData``, or None if nobody spoke within ``timeout``.
+
+        Utterances that ended well before the call (while nobody was
+        listening) are dropped rather than answered late.
+        """
+        if not self.start():
+            return None
+        called = time.monotonic()
+        deadline = None if timeout is None else called + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                ended, audio = self._utterances.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if ended < called - MAX_UTTERANCE_AGE:
+                self.stale += 1
+                continue
+            self.last_latency = max(0.0, time.monotonic() - ended)
+            return audio
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "calibrations": self.calibrations,
+            "noise_floor": round(self.noise_floor or 0.0, 1),
+            "threshold": round(self.threshold, 1),
+            "utterances": self.utterances,
+            "stale": self.stale,
+            "queued": self._utterances.qsize(),
+            "last_latency_s": self.last_latency,
+        }
+
+
+_microphone_service = None
+_microphone_service_lock = threading.Lock()
+
+def get_microphone_service() -> MicrophoneService:
+    global _microphone_service
+    with _microphone_service_lock:
+        if _microphone_service is None:
+            _microphone_service = MicrophoneService()
+        return _microphone_service
@@ -1,25 +1,27 @@
+import sys
+import time
 import cohere
 from rich import print
 from dotenv import dotenv_values
+from Backend.IntentClassifier import IntentClassifier, LogDecision
+from Backend.Cache import DecisionCache
+from Backend.Retry import RetryState, RetryPolicy, RetryableResult
+from Backend.IntentTable import funcs, CompilePreamble
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 CohereAPIKey = env_vars.get("CohereAPIKey")
+LocalIntentThreshold = float(env_vars.get("LocalIntentThreshold", 0.85))
+DecisionCacheSize = int(env_vars.get("DecisionCacheSize", 1000))
+DecisionPrompt = env_vars.get("DecisionPrompt", "compact").lower()  # "compact" or "full"
 
 # Initialize Cohere Client
 co = cohere.Client(api_key=CohereAPIKey)
+DecisionModel = "command-r-plus"
+DecisionRetryPolicy = RetryPolicy(max_attempts=int(env_vars.get("DecisionMaxAttempts", 3)))
 
-# List of valid functions
-funcs = [
-    "exit", "general", "realtime", "open", "close", "play", "generate image", "system", "content", "google search", "youtube search", "reminder",
-    "scroll", "swipe", "pdf", "youtube", "web", "zoom", "page", "home", "end", "next", "previous", "up", "down", 
-    "enter", "escape", "tab", "backspace", "delete", "select", "copy", "paste", "cut", "undo", "redo", "save", 
-    "find", "replace", "refresh", "fullscreen"
-]
-
-# Initialize messages and preamble prompt
-messages = []
-preamble = """
+# Original hand-written preamble, kept for comparison (DecisionPrompt=full)
+FullPreamble = """
 You are a very accurate Decision-Making Model, which decides what kind of a query is given to you.
 You will decide whether a query is a 'general' query, a 'realtime' query, or is asking to perform any task or automation like 'open facebook, instagram', 'can you write a application and open it in notepad'
 *** Do not answer any query, just decide what kind of query is given to you. ***
@@ -70,6 +72,10 @@ You will decide whether a query is a 'general' query, a 'realtime' query, or is
 *** Respond with 'general (query)' if you can't decide the kind of query or if a query is asking to perform a task which is not mentioned above. ***
 """
 
+# Compact preamble generated from the same intent table that defines funcs
+CompactPreamble = CompilePreamble()
+preamble = FullPreamble if DecisionPrompt == "full" else CompactPreamble
+
 # Chat history
 ChatHistory = [
     {"role": "User", "message": "how are you?"},
@@ -86,53 +92,189 @@ ChatHistory = [
     {"role": "Chatbot", "message": "general chat with me."}
 ]
 
+# On-box fast path for commands that don't need the remote model
+intent_classifier = IntentClassifier(funcs, threshold=LocalIntentThreshold)
+
+# Remote decisions for repeated prompts, warm-loaded from disk
+decision_cache = DecisionCache(preamble, funcs, DecisionModel, max_entries=DecisionCacheSize)
+
+class DecisionStreamParser:
+    """Incrementally split streamed decision text into complete tasks.
+
+    A task is complete once the comma after it (or the end of the stream)
+    arrives. Tasks that don't start with a known func are dropped, and the
+    literal "(query)" placeholder is tracked so the caller can retry.
+    """
+
+    def __init__(self, funcs):
+        self.funcs = funcs
+        self.buffer = ""
+        self.saw_placeholder = False
+
+    def _accept(self, task):
+        task = task.strip()
+        if "(query)" in task:
+            self.saw_placeholder = True
+            return None
+        if task and any(task.startswith(func) for func in self.funcs):
+            return task
+        return None
+
+    def feed(self, text):
+        """Add streamed text and return the tasks it completed."""
+        self.buffer += text.replace("\n", "")
+        *complete, self.buffer = self.buffer.split(",")
+        return [task for task in map(self._accept, complete) if task]
+
+    def close(self):
+        """Flush the final task at the end of the stream."""
+        task = self._accept(self.buffer)
+        self.buffer = ""
+        return [task] if task else []
+
+
+def StreamDecisions(prompt: str = "test"):
+    """Yield each decided task as soon as it is complete, while Cohere is still streaming."""
+    # Answer navigation, system and open/close commands locally when possible
+    local_decision = intent_classifier.classify(prompt)
+    if local_decision is not None:
+        yield from local_decision
+        return
+
+    # Repeated commands skip the network entirely
+    cached_decision = decision_cache.get(prompt)
+    if cached_decision is not None:
+        yield from cached_decision
+        return
+
+    tasks = []
+    retry = RetryState("cohere", DecisionRetryPolicy)
+    while retry.next_attempt():
+        stream = None
+        try:
+            # Initialize the generator
+            stream = co.chat_stream(
+                model=DecisionModel,
+                message=prompt,
+                temperature=0.7,
+                chat_history=ChatHistory,
+                prompt_truncation="OFF",
+                connectors=[],
+                preamble=preamble
+            )
+
+            # Hand each task on as soon as its comma arrives
+            parser = DecisionStreamParser(funcs)
+            for event in stream:
+                if event.event_type == "text-generation":
+                    for task in parser.feed(event.text):
+                        tasks.append(task)
+                        yield task
+            for task in parser.close():
+                tasks.append(task)
+                yield task
+
+            # The model echoed the "(query)" placeholder instead of deciding; try again
+            # (a bad answer, not an outage, so it does not count toward opening the circuit)
+            if parser.saw_placeholder and not tasks:
+                raise RetryableResult("decision model echoed '(query)'")
+
+            retry.success()
+            LogDecision(prompt, tasks)
+            decision_cache.put(prompt, tasks)
+        except Exception as e:
+            print(f"Error: {e}")
+            retry.failure(e)
+            # Tasks already handed on can't be taken back, so don't retry after them
+            if tasks:
+                break
+        finally:
+            # Ensure the generator is properly closed
+            if stream is not None:
+                stream.close()
+
+    # Provider degraded or out of attempts: decide locally
+    if not tasks:
+        retry.fallback()
+        yield from intent_classifier.fallback(prompt)
+
 def FirstLayerDMM(prompt: str = "test"):
-    messages.append({"role": "user", "content": f"{prompt}"})
-    stream = None
+    """Decide the task list for a prompt."""
+    return list(StreamDecisions(prompt))
+
+
+def RemoteDecision(prompt: str, preamble_text: str):
+    """One uncached Cohere decision. Returns (tasks, seconds to first token, total seconds)."""
+    started = time.perf_counter()
+    first_token = None
+    parser = DecisionStreamParser(funcs)
+    tasks = []
+    stream = co.chat_stream(
+        model=DecisionModel,
+        message=prompt,
+        temperature=0.7,
+        chat_history=ChatHistory,
+        prompt_truncation="OFF",
+        connectors=[],
+        preamble=preamble_text
+    )
     try:
-        # Initialize the generator
-        stream = co.chat_stream(
-            model='command-r-plus',
-            message=prompt,
-            temperature=0.7,
-            chat_history=ChatHistory,
-            prompt_truncation="OFF",
-            connectors=[],
-            preamble=preamble
-        )
-
-        response = ""
-
-        # Collect the response from the generator
         for event in stream:
             if event.event_type == "text-generation":
-                response += event.text
-
-        # Process the response after collecting all text
-        response = response.replace("\n", "").split(",")
-        response = [i.strip() for i in response]
-
-        # Filter valid tasks
-        filtered_response = [
-            task for task in response
-            if any(task.startswith(func) for func in funcs)
-        ]
-
-        # Handle recursive case for "(query)"
-        if "(query)" in filtered_response:
-            return FirstLayerDMM(prompt=prompt)
-        else:
-            return filtered_response
-
-    except Exception as e:
-        print(f"Error: {e}")
-        return ["general (query)"]  # Fallback response
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                tasks.extend(parser.feed(event.text))
+        tasks.extend(parser.close())
     finally:
-        # Ensure the generator is properly closed
-        if stream is not None:
-            stream.close()
+        stream.close()
+    return tasks, first_token or 0.0, time.perf_counter() - started
+
+def BenchmarkPreambles(records, limit=50):
+    """Compare the compact and full preambles on recorded queries.
+
+    Accuracy is measured against the recorded decisions (label of each task
+    and exact task list); latency is time to first token and total.
+    """
+    from Backend.IntentClassifier import LabelOf
+    from Backend.ContextWindow import CountTokens
+
+    records = [r for r in records if r.get("tasks")][-limit:]
+    results = {}
+    for name, preamble_text in (("compact", CompactPreamble), ("full", FullPreamble)):
+        label_correct = exact_correct = errors = 0
+        first_tokens, totals = [], []
+        for record in records:
+            try:
+                tasks, first_token, total = RemoteDecision(record["prompt"], preamble_text)
+            except Exception as e:
+                print(f"Error: {e}")
+                errors += 1
+                continue
+            first_tokens.append(first_token)
+            totals.append(total)
+            expected = [t.lower() for t in record["tasks"]]
+            got = [t.lower() for t in tasks]
+            exact_correct += got == expected
+            label_correct += [LabelOf([t], funcs) for t in got] == [LabelOf([t], funcs) for t in expected]
+        answered = len(records) - errors
+        results[name] = {
+            "preamble_tokens": CountTokens(preamble_text),
+            "queries": answered,
+            "errors": errors,
+            "label_accuracy": label_correct / answered if answered else 0.0,
+            "exact_accuracy": exact_correct / answered if answered else 0.0,
+            "first_token_s": sum(first_tokens) / len(first_tokens) if first_tokens else 0.0,
+            "total_s": sum(totals) / len(totals) if totals else 0.0,
+        }
+    return results
 
 
 if __name__ == "__main__":
-    while True:
-        print(FirstLayerDMM(input("--->")))
+    # python -m Backend.Model bench [N]  compares compact vs full preamble on recorded decisions
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        from Backend.IntentClassifier import LoadDecisions
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+        print(BenchmarkPreambles(LoadDecisions(), limit))
+    else:
+        while True:
+            print(FirstLayerDMM(input("--->")))
@@ -1,9 +1,19 @@
-import os
 import requests
+import time
+import asyncio
+import logging
 import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import dotenv_values
 from groq import Groq
+from Backend.ChatLogStore import get_chat_store
+from Backend.ContextWindow import ContextWindow, CountMessageTokens
+from Backend.Retry import RetryState, CircuitOpenError
+from Backend.Cache import SearchCache, SearchCategory, NormalizeQuery, SEARCH_TTLS
+from Backend.HttpClient import Get
+from Backend.SearchContext import BuildSearchContext, CONTEXT_TOKENS
+from Backend.SearchIndex import SearchIndex
+from Backend.EventLoop import run_sync
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -12,6 +22,7 @@ Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
 Google_API_KEY = env_vars.get("Google_API_KEY")
 CSE_ID = env_vars.get("CSE_ID")  # Default CSE ID
+SearchReformulations = int(env_vars.get("SearchReformulations", 0))  # Extra query variants searched in parallel
 
 # Validate API keys
 if not GroqAPIKey or not Google_API_KEY:
@@ -20,16 +31,11 @@ if not GroqAPIKey or not Google_API_KEY:
 # Initialize Groq Client
 client = Groq(api_key=GroqAPIKey)
 
-# Chat log file path
-CHAT_LOG_PATH = "Data/ChatLog.json"
-os.makedirs(os.path.dirname(CHAT_LOG_PATH), exist_ok=True)
+# Shared chat log (snapshot + append-only journal)
+chat_store = get_chat_store()
 
-# Load chat history
-try:
-    with open(CHAT_LOG_PATH, "r") as f:
-        messages = json.load(f)
-except (FileNotFoundError, json.JSONDecodeError):
-    messages = []
+# Recent turns plus a rolling summary of older ones
+context_window = ContextWindow(name="realtime")
 
 # System instructions
 System = f"""Hello, I am {Username}, You are a very accurate AI chatbot named {Assistantname} with real-time web search.
@@ -37,33 +43,55 @@ System = f"""Hello, I am {Username}, You are a very accurate AI chatbot named {A
 *** Provide professional and well-structured answers using correct grammar. ***
 *** Never say "I don't know"—always attempt to find relevant information. ***"""
 
+# Cached search results (per-category TTLs, coalesced lookups, stale-while-revalidate)
+search_cache = SearchCache()
+
+# Every result ever fetched, for rephrased questions and offline answers
+search_index = SearchIndex()
+if not len(search_index):
+    for key, entry in search_cache.store.entries():
+        search_index.add(key, entry["value"], fetched=entry["time"])
+
 # Function to fetch real-time search results using Google Custom Search API
+def FetchSearchResults(query):
+    """Call the Custom Search API and return the top results as title/snippet/link dicts."""
+    print("🔎 Searching Google for:", query)  # Debugging
+    params = {"q": query, "key": Google_API_KEY, "cx": CSE_ID}  # Encoded by requests
+    response = Get("https://www.googleapis.com/customsearch/v1", params=params)
+    response.raise_for_status()
+    data = response.json()
+
+    # Extract relevant search results
+    results = [
+        {
+            "title": result.get("title", "No Title"),
+            "snippet": result.get("snippet", "No Description Available."),
+            "link": result.get("link", "#"),
+        }
+        for result in data.get("items", [])[:5]  # Limit to top 5 results
+    ]
+    search_index.add(query, results)
+    return results
+
+def FormatSearchResults(query, results):
+    """Return (markdown summary, plain snippet text) for a list of results."""
+    if not results:
+        return "⚠️ No relevant search results found.", ""
+
+    # Format search results
+    search_summary = f"🔎 **Search results for:** `{query}`\n\n"
+    extracted_texts = []
+    for result in results:
+        title, snippet, link = result["title"], result["snippet"], result["link"]
+        extracted_texts.append(f"{title}: {snippet}")
+        search_summary += f"🔹 **{title}**\n📄 {snippet}\n🔗 [Read more]({link})\n\n"
+
+    # Return formatted response + extracted text (for AI processing)
+    return search_summary.strip(), "\n".join(extracted_texts)
+
 def GoogleSearch(query):
     try:
-        print("🔎 Searching Google for:", query)  # Debugging
-        url = f"https://www.googleapis.com/customsearch/v1?q={query}&key={Google_API_KEY}&cx={CSE_ID}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        # Extract relevant search results
-        results = data.get("items", [])
-        if not results:
-            return "⚠️ No relevant search results found."
-
-        # Format search results
-        search_summary = f"🔎 **Search results for:** `{query}`\n\n"
-        extracted_texts = []
-        for result in results[:5]:  # Limit to top 5 results
-            title = result.get("title", "No Title")
-            snippet = result.get("snippet", "No Description Available.")
-            link = result.get("link", "#")
-            extracted_texts.append(f"{title}: {snippet}")
-            search_summary += f"🔹 **{title}**\n📄 {snippet}\n🔗 [Read more]({link})\n\n"
-
-        # Return formatted response + extracted text (for AI processing)
-        return search_summary.strip(), "\n".join(extracted_texts)
-
+        return FormatSearchResults(query, search_cache.get(query, FetchSearchResults))
     except requests.exceptions.RequestException as e:
         return f"⚠️ Error fetching search results: {e}", ""
 
@@ -80,52 +108,194 @@ def SystemInformation():
 def AnswerModifier(answer):
     return "\n".join(line.strip() for line in answer.split('\n') if line.strip())
 
+# Words dropped when turning a spoken question into a keyword query
+QUESTION_WORDS = {"what", "who", "whom", "which", "when", "where", "why", "how", "is", "are", "was", "were",
+                  "do", "does", "did", "the", "a", "an", "of", "about", "can", "you", "tell", "me", "please"}
+MAX_COMPLETION_TOKENS = 2048
+LOCAL_MIN_RESULTS = 3         # Fresh local-index matches needed to skip the web search
+
+# Searches, history building and the Groq stream run here so the event loop never blocks
+_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="realtime")
+
+# Stage timings of the last answer, in seconds since the request started
+last_timings = {}
+
+def QueryReformulations(prompt, extra=None):
+    """The prompt plus up to ``extra`` alternative phrasings, deduplicated by cache key."""
+    extra = SearchReformulations if extra is None else extra
+    candidates = [prompt]
+    keywords = [w for w in NormalizeQuery(prompt, drop_fillers=True).split() if w not in QUESTION_WORDS]
+    if keywords:
+        candidates.append(" ".join(keywords))
+    if SearchCategory(prompt) == "news":
+        candidates.append(f"{prompt} {datetime.date.today().year}")
+
+    variants, seen = [], set()
+    for query in candidates:
+        key = NormalizeQuery(query, drop_fillers=True)
+        if key and key not in seen:
+            seen.add(key)
+            variants.append(query)
+    return variants[:1 + max(extra, 0)] or [prompt]
+
+async def FirstUsableResults(queries):
+    """Search every query concurrently and return (query, results) for the first with results.
+
+    Slower variants keep running in the background and only warm the search cache.
+    """
+    loop = asyncio.get_running_loop()
+    tasks = {loop.run_in_executor(_pool, search_cache.get, query, FetchSearchResults): query for query in queries}
+    pending, error = set(tasks), None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            try:
+                results = task.result()
+            except Exception as e:
+                error = e
+                continue
+            if results:
+                return tasks[task], results
+    if error is not None:
+        raise error
+    return queries[0], []
+
+def StreamCompletion(messages):
+    """Yield answer tokens from Groq; a failed attempt is retried only if nothing was yielded yet."""
+    retry = RetryState("groq")
+    while retry.next_attempt():
+        emitted = False
+        try:
+            completion = client.chat.completions.create(
+                model="llama3-70b-8192",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=MAX_COMPLETION_TOKENS,
+                top_p=1,
+                stream=True,
+                stop=None
+            )
+            for chunk in completion:
+                token = chunk.choices[0].delta.content
+                if token:
+                    emitted = True
+                    yield token
+            retry.success()
+            return
+        except Exception as e:
+            retry.failure(e)
+            if emitted:
+                raise
+    raise retry.last_error or CircuitOpenError("groq call was not attempted")
+
 # Main chatbot function
-def RealtimeSearchEngine(prompt):
-    global messages
+async def RealtimeSearchEngineAsync(prompt, on_token=None):
+    """Answer ``prompt`` from live search results.
 
-    # Append user message
-    messages.append({"role": "user", "content": prompt})
+    The searches and the chat history window are prepared concurrently, the
+    LLM starts as soon as the first query variant returns results, and each
+    token is passed to ``on_token`` as it arrives.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    timings = {}
 
-    # Get real-time search results
-    search_summary, extracted_search_text = GoogleSearch(prompt)
+    def mark(stage):
+        timings[stage] = round(time.perf_counter() - started, 3)
 
-    # Construct system context (search results go into AI model)
-    system_context = [
+    user_message = {"role": "user", "content": prompt}
+    base_context = [
         {"role": "system", "content": System},
         {"role": "system", "content": SystemInformation()},
-        {"role": "system", "content": search_summary},
-        {"role": "system", "content": f"Relevant search data:\n{extracted_search_text}"}
     ]
 
-    # Call Groq's AI Model
-    try:
-        print("🧠 Processing AI response...")  # Debugging
-        completion = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=system_context + messages,
-            temperature=0.7,
-            max_tokens=2048,
-            top_p=1,
-            stream=True,
-            stop=None
-        )
-
-        # Extract response text
-        answer = "".join(chunk.choices[0].delta.content for chunk in completion if chunk.choices[0].delta.content).strip()
-
-    except Exception as e:
-        answer = f"⚠️ AI system error: {e}"
-
-    # Save assistant response and chat history
-    messages.append({"role": "assistant", "content": answer})
-    with open(CHAT_LOG_PATH, "w") as f:
-        json.dump(messages, f, indent=4)
+    async def search():
+        # Fresh local results containing every query term make the web search unnecessary
+        local = search_index.search(prompt, max_age=SEARCH_TTLS[SearchCategory(prompt)], min_coverage=1.0)
+        if len(local) >= LOCAL_MIN_RESULTS:
+            timings["source"] = "index"
+            mark("search")
+            return BuildSearchContext(prompt, local)
+
+        try:
+            query, results = await FirstUsableResults(QueryReformulations(prompt))
+            error = None
+        except Exception as e:
+            query, results, error = prompt, [], e
+        if results:
+            timings["source"] = "web"
+            search_context = BuildSearchContext(query, results)
+        elif offline := search_index.search(prompt):
+            # Degraded mode: answer from whatever was fetched before, however old
+            timings["source"] = "offline"
+            search_context = "Offline search results (may be outdated).\n" + BuildSearchContext(prompt, offline)
+        elif error is not None:
+            search_context = f"⚠️ Error fetching search results: {error}"
+        else:
+            search_context = BuildSearchContext(query, results)
+        mark("search")
+        return search_context
+
+    async def history():
+        messages = await loop.run_in_executor(_pool, lambda: context_window.build(
+            chat_store.messages() + [user_message],
+            reserved_tokens=CountMessageTokens(base_context) + CONTEXT_TOKENS,
+            max_completion_tokens=MAX_COMPLETION_TOKENS
+        ))
+        mark("history")
+        return messages
+
+    search_context, messages = await asyncio.gather(search(), history())
 
+    # Construct system context (one ranked, deduplicated block of search data)
+    system_context = base_context + [{"role": "system", "content": search_context}]
+
+    # Stream Groq's tokens from a worker thread into this loop
+    queue = asyncio.Queue()
+
+    def produce():
+        try:
+            for token in StreamCompletion(system_context + messages):
+                loop.call_soon_threadsafe(queue.put_nowait, token)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    print("🧠 Processing AI response...")  # Debugging
+    producer = loop.run_in_executor(_pool, produce)
+    parts, error = [], None
+    while (item := await queue.get()) is not None:
+        if isinstance(item, Exception):
+            error = item
+            continue
+        if not parts:
+            mark("first_token")
+        parts.append(item)
+        if on_token:
+            on_token(item)
+    await producer
+    mark("total")
+
+    answer = "".join(parts).strip()
+    if error is not None:
+        logging.error(f"Realtime answer failed: {error}")
+        answer = answer or f"⚠️ AI system error: {error}"
+
+    # Journal only the new turn
+    chat_store.append(user_message, {"role": "assistant", "content": answer})
+
+    last_timings.clear()
+    last_timings.update(timings)
+    logging.info(f"Realtime timings: {timings}")
     return AnswerModifier(answer)
 
+def RealtimeSearchEngine(prompt, on_token=None):
+    return run_sync(RealtimeSearchEngineAsync(prompt, on_token))
+
 # Run chatbot in terminal loop
 if __name__ == "__main__":
     while True:
         prompt = input("Enter your query: ")
-        print(RealtimeSearchEngine(prompt))
\ No newline at end of file
+        print(RealtimeSearchEngine(prompt))
+        print(f"⏱️ {last_timings}")
\ No newline at end of file
@@ -0,0 +1,150 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import dotenv_values
+import speech_recognition as sr
+
+env_vars = dotenv_values(".env")
+InputLanguage = env_vars.get("InputLanguage", "en-US")
+RecognizerBackends = [name.strip() for name in env_vars.get("SpeechRecognizers", "google,sphinx").split(",") if name.strip()]
+RecognizerDeadline = float(env_vars.get("RecognizerDeadline", 5))
+RecognizerGrace = float(env_vars.get("RecognizerGrace", 1.5))
+
+CONFIDENT = 0.7             # A result at least this confident wins without waiting for the others
+GOOGLE_CONFIDENCE = 0.8     # Google omits confidence for some results
+SPHINX_CONFIDENCE = 0.4     # Offline and much less accurate: only wins when nothing better arrives
+
+recognizer = sr.Recognizer()
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="recognizer")
+
+
+def RecognizeGoogle(audio, language):
+    result = recognizer.recognize_google(audio, language=language, show_all=True)
+    if not result or not result.get("alternative"):
+        return None
+    best = result["alternative"][0]
+    return best["transcript"], best.get("confidence", GOOGLE_CONFIDENCE)
+
+def RecognizeSphinx(audio, language):
+    return recognizer.recognize_sphinx(audio), SPHINX_CONFIDENCE
+
+# name -> function(audio, language) returning (text, confidence) or None
+BACKENDS = {
+    "google": RecognizeGoogle,
+    "sphinx": RecognizeSphinx,
+}
+
+
+class RecognizerRace:
+    """Runs the configured recognizers on the same audio, the first one right away.
+
+    The others are hedges: they start once ``grace`` seconds pass without a
+    confident result, or as soon as every running backend has finished
+    without one (error, nothing understood, low confidence). A started
+    backend cannot be stopped, so this keeps Sphinx off the CPU on the
+    utterances Google answers quickly.
+
+    The first result at or above ``confident`` wins immediately; otherwise
+    the most confident result available at the deadline (or once every
+    backend finished) is used. Backends still running are abandoned and
+    their results discarded.
+    """
+
+    def __init__(self, backends=None, deadline=RecognizerDeadline, confident=CONFIDENT, language=InputLanguage,
+                 grace=RecognizerGrace):
+        self.backends = backends or [name for name in RecognizerBackends if name in BACKENDS]
+        self.deadline = deadline
+        self.confident = confident
+        self.language = language
+        self.grace = grace
+        self._lock = threading.Lock()
+        self.started = {name: 0 for name in self.backends}
+        self.wins = {name: 0 for name in self.backends}
+        self.successes = {name: 0 for name in self.backends}
+        self.failures = {name: 0 for name in self.backends}
+        self.latency = {name: 0.0 for name in self.backends}   # Running mean of successful calls
+        self.races = 0
+        self.empty = 0
+
+    def _start(self, name, audio):
+        with self._lock:
+            self.started[name] += 1
+        return _pool.submit(self._run, name, audio)
+
+    def _run(self, name, audio):
+        started = time.perf_counter()
+        try:
+            result = BACKENDS[name](audio, self.language)
+        except sr.UnknownValueError:
+            result = None
+        except sr.RequestError as e:
+            logging.warning(f"{name} speech recognition error: {e}")
+            result = None
+        except Exception as e:
+            logging.error(f"{name} speech recognition failed: {e}")
+            result = None
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if result and result[0]:
+                self.successes[name] += 1
+                self.latency[name] += (elapsed - self.latency[name]) / self.successes[name]
+            else:
+                self.failures[name] += 1
+        return name, result
+
+    def recognize(self, audio):
+        """Transcript of ``audio`` (``sr.AudioData``), or "" if no backend understood it."""
+        started = time.perf_counter()
+        pending = {self._start(name, audio) for name in self.backends[:1]}
+        hedges = self.backends[1:]
+        best = None     # (confidence, text, name)
+        while pending or hedges:
+            elapsed = time.perf_counter() - started
+            remaining = self.deadline - elapsed
+            if remaining <= 0:
+                break
+            if hedges and (not pending or elapsed >= self.grace):
+                pending |= {self._start(name, audio) for name in hedges}
+                hedges = []
+            timeout = min(remaining, self.grace - elapsed) if hedges else remaining
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, result = future.result()
+                if result and result[0] and (best is None or result[1] > best[0]):
+                    best = (result[1], result[0], name)
+            if best is not None and best[0] >= self.confident:
+                break
+        for future in pending:
+            future.cancel()
+
+        with self._lock:
+            self.races += 1
+            if best is None:
+                self.empty += 1
+                return ""
+            self.wins[best[2]] += 1
+        logging.debug(f"Recognized by {best[2]} ({best[0]:.2f}) in {time.perf_counter() - started:.2f}s")
+        return best[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "races": self.races,
+                "empty": self.empty,
+                "started": dict(self.started),
+                "wins": dict(self.wins),
+                "failures": dict(self.failures),
+                "avg_latency_s": {name: round(value, 3) for name, value in self.latency.items()},
+            }
+
+
+_race = None
+_race_lock = threading.Lock()
+
+def get_recognizer_race() -> RecognizerRace:
+    global _race
+    with _race_lock:
+        if _race is None:
+            _race = RecognizerRace()
+        return _race
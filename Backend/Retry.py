@@ -0,0 +1,242 @@
+import time
+import random
+import logging
+import threading
+from collections import defaultdict
+
+# Defaults for LLM provider calls
+MAX_ATTEMPTS = 3
+BASE_DELAY = 0.5          # Seconds before the first retry
+MAX_DELAY = 4.0           # Cap on a single backoff sleep
+TURN_BUDGET = 30.0        # Seconds one user turn may spend on provider calls
+FAILURE_THRESHOLD = 3     # Consecutive failures that open a provider's circuit
+RESET_TIMEOUT = 30.0      # Seconds an open circuit waits before letting a probe through
+
+
+class RetryableResult(Exception):
+    """Raised inside an attempt when the provider answered, but unusably (e.g. echoed a placeholder)."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider is skipped because its circuit breaker is open."""
+
+
+class RetryPolicy:
+    """Attempt count and jittered exponential backoff for one kind of call."""
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                 retry_on=(Exception,)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+# ===================== Turn deadline =====================
+_turn_lock = threading.Lock()
+_turn_deadline = None
+
+def BeginTurn(budget=TURN_BUDGET):
+    """Start the deadline shared by every provider call made for the current user turn.
+
+    The first attempt of a call always runs; the deadline only stops retries.
+    """
+    global _turn_deadline
+    with _turn_lock:
+        _turn_deadline = time.monotonic() + budget
+
+def TurnTimeLeft():
+    """Seconds left in the current turn, or None when no turn is active."""
+    with _turn_lock:
+        if _turn_deadline is None:
+            return None
+        return _turn_deadline - time.monotonic()
+
+
+# ===================== Circuit breaker =====================
+class CircuitBreaker:
+    """Skips a degraded provider until ``reset_timeout`` passes, then lets one probe through."""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None  # Set while the single half-open probe is in flight
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """True if a call may go ahead; once half-open, only for one caller at a time.
+
+        A probe that never reports back (its caller gave up) is replaced
+        after another ``reset_timeout``.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    logging.warning(f"Circuit opened for {self.name} after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def GetBreaker(provider):
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+# ===================== Metrics =====================
+_metrics_lock = threading.Lock()
+_metrics = defaultdict(lambda: {
+    "calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+    "short_circuits": 0, "fallbacks": 0, "deadline_exceeded": 0, "seconds": 0.0,
+})
+
+def _count(provider, **increments):
+    with _metrics_lock:
+        for key, value in increments.items():
+            _metrics[provider][key] += value
+
+def RetryMetrics():
+    """Per-provider retry counters and time spent, plus breaker state."""
+    with _metrics_lock:
+        snapshot = {provider: dict(values) for provider, values in _metrics.items()}
+    for provider in snapshot:
+        snapshot[provider]["circuit"] = GetBreaker(provider).state
+    return snapshot
+
+
+# ===================== Attempt loop =====================
+class RetryState:
+    """Drives the attempts of one logical call.
+
+    Use directly when the call streams results and can't be wrapped in a
+    function (retrying is only safe before anything was handed on)::
+
+        retry = RetryState("cohere", policy)
+        while retry.next_attempt():
+            try:
+                ...
+                retry.success()
+                break
+            except Exception as e:
+                retry.failure(e)
+    """
+
+    def __init__(self, provider, policy=None):
+        self.provider = provider
+        self.policy = policy or RetryPolicy()
+        self.breaker = GetBreaker(provider)
+        self.attempt = 0
+        self.last_error = None
+        self.succeeded = False
+        self._started = time.monotonic()
+        _count(provider, calls=1)
+
+    def next_attempt(self):
+        """Wait out the backoff and return True if another attempt may run."""
+        if self.succeeded:
+            return False
+        if not self.breaker.allow():
+            _count(self.provider, short_circuits=1)
+            self.last_error = self.last_error or CircuitOpenError(f"{self.provider} circuit is open")
+            return self._finish(False)
+        if self.attempt >= self.policy.max_attempts:
+            return self._finish(False)
+
+        if self.attempt > 0:
+            delay = self.policy.backoff(self.attempt)
+            time_left = TurnTimeLeft()
+            if time_left is not None and time_left <= delay:
+                _count(self.provider, deadline_exceeded=1)
+                return self._finish(False)
+            _count(self.provider, retries=1)
+            logging.info(f"Retrying {self.provider} in {delay:.2f}s (attempt {self.attempt + 1}): {self.last_error}")
+            time.sleep(delay)
+
+        self.attempt += 1
+        _count(self.provider, attempts=1)
+        return True
+
+    def success(self):
+        self.succeeded = True
+        self.breaker.record_success()
+        self._finish(True)
+
+    def failure(self, error):
+        self.last_error = error
+        _count(self.provider, failures=1)
+        if isinstance(error, RetryableResult):
+            self.breaker.record_success()   # The provider answered; only its output was unusable
+        else:
+            self.breaker.record_failure()
+        if not isinstance(error, self.policy.retry_on):
+            self.attempt = self.policy.max_attempts  # Not retryable; stop here
+
+    def _finish(self, result):
+        _count(self.provider, seconds=time.monotonic() - self._started)
+        self._started = time.monotonic()
+        return result
+
+    def fallback(self):
+        """Record that the caller is answering from its local fallback."""
+        _count(self.provider, fallbacks=1)
+
+
+def CallWithRetry(provider, func, *args, policy=None, fallback=None, **kwargs):
+    """Call ``func`` under the provider's retry policy, deadline and circuit breaker.
+
+    When every attempt fails (or the circuit is open) ``fallback()`` is
+    returned if given; otherwise the last error is raised.
+    """
+    retry = RetryState(provider, policy)
+    while retry.next_attempt():
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            retry.failure(e)
+            continue
+        retry.success()
+        return result
+
+    if fallback is not None:
+        retry.fallback()
+        return fallback()
+    raise retry.last_error or CircuitOpenError(f"{provider} call was not attempted")
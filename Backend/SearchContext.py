@@ -0,0 +1,179 @@
+import re
+import sys
+import json
+import math
+import time
+from collections import Counter
+from Backend.ContextWindow import CountTokens
+
+# Budget and tuning for the search block sent to the LLM
+CONTEXT_TOKENS = 600        # Maximum tokens of search data per realtime answer
+DUPLICATE_JACCARD = 0.6     # Snippets whose word shingles overlap this much are near-duplicates
+DUPLICATE_CONTAINMENT = 0.8 # ...or when this much of the shorter snippet appears in the longer one
+SHINGLE_SIZE = 3
+MIN_PARTIAL_TOKENS = 20     # Only cut a snippet to fit if this much room is left
+BM25_K1 = 1.5
+BM25_B = 0.75
+RANK_PRIOR = 0.3            # Small boost for the search engine's own ordering
+
+STOPWORDS = {"a", "an", "the", "of", "in", "on", "at", "to", "for", "and", "or", "is", "are", "was", "were",
+             "be", "by", "with", "as", "it", "its", "this", "that", "from", "what", "who", "which", "how"}
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+_DATE_PREFIX = re.compile(r"^(\d+ (second|minute|hour|day|week|month|year)s? ago|\w{3} \d{1,2}, \d{4})\s*(\.\.\.|·|-)\s*",
+                          re.IGNORECASE)
+
+
+def Terms(text: str):
+    return [w for w in _WORD_PATTERN.findall(text.lower()) if w not in STOPWORDS]
+
+def Shingles(text: str, size: int = SHINGLE_SIZE):
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def Jaccard(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def Containment(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+def CleanSnippet(text: str) -> str:
+    """Collapse whitespace and drop date prefixes and ellipses the model doesn't need."""
+    text = " ".join((text or "").split())
+    text = _DATE_PREFIX.sub("", text)
+    return re.sub(r"\s*(\.\.\.|…)\s*", " … ", text).strip(" …")
+
+
+def DedupeSnippets(results, threshold=DUPLICATE_JACCARD, containment=DUPLICATE_CONTAINMENT):
+    """Drop near-identical snippets, keeping the more informative one in the earlier slot."""
+    kept = []  # (result, shingles)
+    for result in results:
+        shingles = Shingles(result.get("snippet") or result.get("title") or "")
+        for i, (other, other_shingles) in enumerate(kept):
+            if (Jaccard(shingles, other_shingles) >= threshold
+                    or Containment(shingles, other_shingles) >= containment):
+                if len(result.get("snippet", "")) > len(other.get("snippet", "")):
+                    kept[i] = (result, shingles)
+                break
+        else:
+            kept.append((result, shingles))
+    return [result for result, _ in kept]
+
+def BM25Scores(query: str, documents, k1=BM25_K1, b=BM25_B):
+    """BM25 score of each document against the query, using the documents themselves as the corpus."""
+    query_terms = set(Terms(query))
+    doc_terms = [Terms(doc) for doc in documents]
+    if not doc_terms:
+        return []
+    average_length = sum(len(terms) for terms in doc_terms) / len(doc_terms) or 1.0
+    document_frequency = Counter(term for terms in doc_terms for term in set(terms))
+    n = len(doc_terms)
+
+    scores = []
+    for terms in doc_terms:
+        counts = Counter(terms)
+        score = 0.0
+        for term in query_terms:
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(terms) / average_length))
+        scores.append(score)
+    return scores
+
+def RankSnippets(query: str, results):
+    """Order results by BM25 relevance to the query, ties broken by the original ranking."""
+    scores = BM25Scores(query, [f"{r.get('title', '')} {r.get('snippet', '')}" for r in results])
+    ranked = sorted(
+        range(len(results)),
+        key=lambda i: scores[i] + RANK_PRIOR / (1 + i),
+        reverse=True
+    )
+    return [results[i] for i in ranked]
+
+
+def BuildSearchContext(query: str, results, max_tokens=CONTEXT_TOKENS) -> str:
+    """One compact block of the most relevant, deduplicated snippets within ``max_tokens``.
+
+    Links are left out; the model only needs the text.
+    """
+    if not results:
+        return "No relevant search results found."
+
+    lines = [f"Search results for: {query}"]
+    used = CountTokens(lines[0])
+    for result in RankSnippets(query, DedupeSnippets(results)):
+        title = " ".join((result.get("title") or "").split())
+        snippet = CleanSnippet(result.get("snippet"))
+        line = f"- {title}: {snippet}" if title else f"- {snippet}"
+        cost = CountTokens(line)
+        if used + cost > max_tokens:
+            room = max_tokens - used
+            if room < MIN_PARTIAL_TOKENS:
+                break
+            words = line.split()
+            while words and CountTokens(" ".join(words)) > room - 1:
+                words.pop()
+            line, cost = " ".join(words) + "…", room
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
+
+
+# ===================== Benchmark =====================
+def LegacyContext(query: str, results) -> str:
+    """The two system messages RealtimeSearchEngine used to send (markdown summary + plain text)."""
+    summary = f"🔎 **Search results for:** `{query}`\n\n"
+    extracted = []
+    for result in results:
+        title, snippet, link = result["title"], result["snippet"], result["link"]
+        extracted.append(f"{title}: {snippet}")
+        summary += f"🔹 **{title}**\n📄 {snippet}\n🔗 [Read more]({link})\n\n"
+    return summary.strip() + "\nRelevant search data:\n" + "\n".join(extracted)
+
+def BenchmarkSearchContext(payloads, max_tokens=CONTEXT_TOKENS):
+    """Compare prompt tokens of the old and new search context on recorded (query, results) payloads."""
+    legacy_tokens = compact_tokens = duplicates = 0
+    build_seconds = 0.0
+    count = 0
+    for query, results in payloads:
+        if not results:
+            continue
+        count += 1
+        legacy_tokens += CountTokens(LegacyContext(query, results))
+        started = time.perf_counter()
+        block = BuildSearchContext(query, results, max_tokens)
+        build_seconds += time.perf_counter() - started
+        compact_tokens += CountTokens(block)
+        duplicates += len(results) - len(DedupeSnippets(results))
+    if not count:
+        return {"payloads": 0}
+    return {
+        "payloads": count,
+        "legacy_tokens": legacy_tokens / count,
+        "compact_tokens": compact_tokens / count,
+        "saved": 1 - compact_tokens / legacy_tokens if legacy_tokens else 0.0,
+        "duplicates_dropped": duplicates,
+        "build_ms": build_seconds / count * 1000,
+    }
+
+def LoadSearchPayloads(path):
+    """(query, results) pairs from a SearchCache file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [(key, entry["value"]) for key, entry in json.load(f)]
+
+
+if __name__ == "__main__":
+    # python -m Backend.SearchContext bench [path]  token savings on recorded search payloads
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        from Backend.Cache import SEARCH_CACHE_PATH
+        path = sys.argv[2] if len(sys.argv) > 2 else SEARCH_CACHE_PATH
+        print(BenchmarkSearchContext(LoadSearchPayloads(path)))
+    else:
+        print("Usage: python -m Backend.SearchContext bench [path]")
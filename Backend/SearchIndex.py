@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict
+from Backend.SearchContext import Terms, BM25_K1, BM25_B
+
+INDEX_DIR = os.path.join("Data", "SearchIndex")
+MANIFEST_NAME = "manifest.json"
+FLUSH_EVERY = 20        # Buffered documents written out as one new segment
+FLUSH_DELAY = 5.0       # Seconds before a partial buffer is written anyway
+MAX_SEGMENTS = 8        # Merge everything into one segment beyond this
+MIN_COVERAGE = 0.6      # Fraction of the query's terms a document must contain to match
+
+
+def DocumentId(result) -> str:
+    """Stable id of a search result: its link, or its text when there is no usable link."""
+    link = result.get("link")
+    key = link if link and link != "#" else f"{result.get('title', '')}\n{result.get('snippet', '')}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def DocumentTerms(doc):
+    return Terms(f"{doc.get('title', '')} {doc.get('snippet', '')}")
+
+
+class SearchIndex:
+    """Inverted index over every search result ever fetched, kept as immutable on-disk segments.
+
+    New results are buffered and written as a new segment file; once there
+    are more than ``max_segments`` they are merged into one. A result that is
+    fetched again (same link) replaces its older copy.
+    """
+
+    def __init__(self, directory=INDEX_DIR, flush_every=FLUSH_EVERY, max_segments=MAX_SEGMENTS,
+                 flush_delay=FLUSH_DELAY):
+        self.directory = directory
+        self.flush_every = flush_every
+        self.max_segments = max_segments
+        self.flush_delay = flush_delay
+
+        self._lock = threading.RLock()
+        self._docs = {}                      # id -> document
+        self._lengths = {}                   # id -> term count
+        self._postings = defaultdict(dict)   # term -> {id: term frequency}
+        self._segments = []                  # Segment file names, oldest first
+        self._next_segment = 1
+        self._pending = {}                   # Documents not yet written to a segment
+        self._flush_timer = None
+
+        self._load()
+        atexit.register(self.flush)
+
+    # ---------- In-memory index ----------
+    def _index(self, doc_id, doc, counts=None):
+        if doc_id in self._docs:
+            self._unindex(doc_id)
+        counts = counts if counts is not None else Counter(DocumentTerms(doc))
+        self._docs[doc_id] = doc
+        self._lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            self._postings[term][doc_id] = tf
+
+    def _unindex(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        self._lengths.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in set(DocumentTerms(doc)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    # ---------- Segments ----------
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write_json(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self._path(name) + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self._path(name))
+
+    def _load(self):
+        try:
+            with open(self._path(MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logging.error(f"Ignoring unreadable search index manifest: {e}")
+            return
+
+        for name in manifest.get("segments", []):
+            try:
+                with open(self._path(name), "r", encoding="utf-8") as f:
+                    segment = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                logging.error(f"Skipping unreadable search index segment {name}: {e}")
+                continue
+            # Later segments hold newer copies of re-fetched results
+            for doc_id in segment["docs"]:
+                self._unindex(doc_id)
+            counts = defaultdict(dict)
+            for term, postings in segment["postings"].items():
+                for doc_id, tf in postings.items():
+                    counts[doc_id][term] = tf
+            for doc_id, doc in segment["docs"].items():
+                self._index(doc_id, doc, Counter(counts[doc_id]))
+            self._segments.append(name)
+        self._next_segment = manifest.get("next", len(self._segments) + 1)
+
+    def _write_segment(self, docs):
+        postings = defaultdict(dict)
+        for doc_id, doc in docs.items():
+            for term, tf in Counter(DocumentTerms(doc)).items():
+                postings[term][doc_id] = tf
+        name = f"segment-{self._next_segment:06d}.json"
+        self._next_segment += 1
+        self._write_json(name, {"docs": docs, "postings": postings})
+        return name
+
+    def _write_manifest(self):
+        self._write_json(MANIFEST_NAME, {"segments": self._segments, "next": self._next_segment})
+
+    def flush(self):
+        """Write buffered documents as a new segment, merging segments when there are too many."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            try:
+                self._segments.append(self._write_segment(self._pending))
+                self._pending = {}
+                if len(self._segments) > self.max_segments:
+                    self._merge()
+                self._write_manifest()
+            except OSError as e:
+                logging.error(f"Failed to write search index segment: {e}")
+
+    def _merge(self):
+        """Replace every segment with a single one holding the live documents."""
+        old = self._segments
+        self._segments = [self._write_segment(dict(self._docs))]
+        self._write_manifest()
+        for name in old:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def _schedule_flush(self):
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    # ---------- Public API ----------
+    def add(self, query, results, fetched=None):
+        """Index search results (title/snippet/link dicts) returned for ``query``."""
+        fetched = fetched or time.time()
+        with self._lock:
+            for result in results:
+                doc = {
+                    "title": result.get("title", ""),
+                    "snippet": result.get("snippet", ""),
+                    "link": result.get("link", "#"),
+                    "query": query,
+                    "fetched": fetched,
+                }
+                doc_id = DocumentId(doc)
+                self._index(doc_id, doc)
+                self._pending[doc_id] = doc
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+            elif self._pending:
+                self._schedule_flush()
+
+    def search(self, query, limit=5, max_age=None, min_coverage=MIN_COVERAGE):
+        """BM25-ranked results for ``query``, newest copies only.
+
+        ``max_age`` (seconds) skips results fetched longer ago; ``min_coverage``
+        is the share of the query's terms a result must contain.
+        """
+        terms = set(Terms(query))
+        if not terms:
+            return []
+        now = time.time()
+        with self._lock:
+            n = len(self._docs)
+            if not n:
+                return []
+            average_length = sum(self._lengths.values()) / n or 1.0
+            scores, matched = defaultdict(float), Counter()
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if max_age is not None and now - self._docs[doc_id]["fetched"] > max_age:
+                        continue
+                    length = self._lengths[doc_id]
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / (
+                        tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+                    matched[doc_id] += 1
+
+            hits = [(score, doc_id) for doc_id, score in scores.items()
+                    if matched[doc_id] / len(terms) >= min_coverage]
+            hits.sort(reverse=True)
+            return [dict(self._docs[doc_id], score=round(score, 3)) for score, doc_id in hits[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "segments": len(self._segments),
+                "pending": len(self._pending),
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._docs)
+
+
+if __name__ == "__main__":
+    # python -m Backend.SearchIndex "query"  searches the local index without the network
+    index = SearchIndex()
+    if len(sys.argv) > 1:
+        for hit in index.search(" ".join(sys.argv[1:])):
+            fetched = time.strftime("%Y-%m-%d %H:%M", time.localtime(hit["fetched"]))
+            print(f"{hit['score']:.2f}  {hit['title']} ({fetched})\n      {hit['snippet']}\n      {hit['link']}")
+    print(index.stats())
@@ -0,0 +1,44 @@
+import re
+import random
+
+MIN_SENTENCE_CHARS = 20     # Shorter pieces ("Dr.", "1.") are joined to the next one
+
+# Responses for long text
+LONG_TEXT_RESPONSES = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information."
+]
+
+
+def SplitSentences(text):
+    """Split text into speakable sentences."""
+    sentences, current = [], ""
+    for piece in re.split(r"(?<=[.!?])\s+|\n+", text):
+        piece = piece.strip()
+        if not piece:
+            continue
+        current = f"{current} {piece}" if current else piece
+        if len(current) >= MIN_SENTENCE_CHARS:
+            sentences.append(current)
+            current = ""
+    if current:
+        sentences.append(current)
+    return sentences
+
+def PrepareSentences(text, full=False):
+    """Sentences to speak; long answers are cut to two sentences and a pointer to the chat screen unless ``full``."""
+    # Smart text truncation for better UX
+    sentences = SplitSentences(text)
+    if not full and len(sentences) > 4 and len(text) >= 250:
+        # Speak first two sentences + response
+        sentences = sentences[:2] + [random.choice(LONG_TEXT_RESPONSES)]
+        print(f"🗣️ Speaking truncated text: '{sentences[0][:50]}...'")
+    return sentences
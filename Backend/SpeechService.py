@@ -0,0 +1,202 @@
+import re
+import time
+import queue
+import asyncio
+import logging
+import itertools
+import threading
+from collections import deque
+from Backend.EventLoop import get_background_loop
+
+# Lower numbers are spoken first
+PRIORITY_URGENT = 0     # Errors and prompts the user must hear now
+PRIORITY_HIGH = 1       # Answers
+PRIORITY_NORMAL = 2     # Confirmations ("Command completed!")
+PRIORITY_LOW = 3        # Progress chatter ("Searching for your query")
+
+DEDUPE_WINDOW = 2.0     # Seconds after an utterance during which the same text is not repeated
+ECHO_WINDOW = 5.0       # Seconds after an utterance during which the microphone may still hand it back
+ECHO_OVERLAP = 0.6      # Share of a transcript's words found in recent speech that makes it an echo
+ECHO_WORD_CHARS = 4     # Shorter words ("is", "the") are shared by any two sentences and not compared
+
+
+class SpeechRequest:
+    """One queued utterance; ``wait()`` blocks until it was spoken, skipped or interrupted."""
+
+    def __init__(self, text, priority=PRIORITY_NORMAL, func=None, full=None):
+        self.text = text
+        self.priority = priority
+        self.func = func
+        self.full = full
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = False
+        self.result = None
+        self._done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def should_stop(self):
+        """Stop-callback handed to the speech engine."""
+        return self.cancelled or (self.func is not None and self.func() is False)
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.result
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def _finish(self, result):
+        self.result = result
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+
+class SpeechService:
+    """Serializes all speech through one priority queue and one playback worker.
+
+    ``speak`` is a coroutine function ``speak(text, stop_callback, full)``;
+    it runs on the shared background event loop (or ``loop``), so no loop
+    is created per utterance.
+    """
+
+    def __init__(self, speak, dedupe_window=DEDUPE_WINDOW, loop=None):
+        self._speak = speak
+        self.dedupe_window = dedupe_window
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._current = None
+        self._last = None
+        self._recent = deque(maxlen=8)      # (finished at, text) of what was played
+
+        self.spoken = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.interrupted = 0
+        self.echoes = 0
+        self.max_depth = 0
+        self._waits = deque(maxlen=200)
+
+        self.loop = loop or get_background_loop()
+        threading.Thread(target=self._run, daemon=True, name="speech-worker").start()
+
+    def say(self, text, priority=PRIORITY_NORMAL, interrupt=False, func=None, full=None) -> SpeechRequest:
+        """Queue text for speaking and return its request.
+
+        ``interrupt`` barges in: the current utterance stops and everything
+        queued that is not more urgent is dropped.
+        """
+        text = " ".join(str(text).split())
+        with self._lock:
+            last = self._last
+            if (last is not None and last.text == text and not last.cancelled
+                    and (not last.done or time.monotonic() - last.finished_at < self.dedupe_window)):
+                self.duplicates += 1
+                return last
+            request = SpeechRequest(text, priority, func, full)
+            if interrupt:
+                self._interrupt_locked(priority)
+            self._last = request
+            self._queue.put((priority, next(self._order), request))
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return request
+
+    def interrupt(self, priority=PRIORITY_URGENT):
+        """Stop the current utterance and drop queued ones not more urgent than ``priority``."""
+        with self._lock:
+            self._interrupt_locked(priority)
+
+    def is_echo(self, transcript, window=ECHO_WINDOW) -> bool:
+        """Whether a transcript is the assistant's own speech picked up by the microphone.
+
+        Compares its words with what is being said or was said within
+        ``window`` seconds; real barge-ins ("stop", a new question) share
+        few words with the answer being played.
+        """
+        words = re.findall(r"[a-z0-9']+", transcript.lower())
+        words = [word for word in words if len(word) >= ECHO_WORD_CHARS] or words
+        if not words:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            texts = [text for finished, text in self._recent if now - finished < window]
+            if self._current is not None:
+                texts.append(self._current.text)
+            spoken = set(re.findall(r"[a-z0-9']+", " ".join(texts).lower()))
+            echo = sum(word in spoken for word in words) >= ECHO_OVERLAP * len(words)
+            if echo:
+                self.echoes += 1
+        return echo
+
+    def _interrupt_locked(self, priority):
+        if self._current is not None and not self._current.done:
+            self._current.cancel()
+            self.interrupted += 1
+        kept = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] is not None and item[0] >= priority:
+                item[2].cancel()
+                item[2]._finish(False)
+                self.interrupted += 1
+            else:
+                kept.append(item)
+        for item in kept:
+            self._queue.put(item)
+
+    def _run(self):
+        while True:
+            _, _, request = self._queue.get()
+            if request is None:
+                break
+            if request.cancelled:
+                request._finish(False)
+                continue
+            request.started_at = time.monotonic()
+            self._waits.append(request.started_at - request.enqueued_at)
+            with self._lock:
+                self._current = request
+            try:
+                future = asyncio.run_coroutine_threadsafe(
+                    self._speak(request.text, request.should_stop, request.full), self.loop
+                )
+                result = bool(future.result())
+            except Exception as e:
+                logging.error(f"Speech failed: {e}")
+                result = False
+            with self._lock:
+                self._current = None
+                self._recent.append((time.monotonic(), request.text))
+                if result:
+                    self.spoken += 1
+                elif not request.cancelled:
+                    self.failed += 1
+            request._finish(result and not request.cancelled)
+
+    def shutdown(self):
+        self.interrupt()
+        self._queue.put((-1, next(self._order), None))
+
+    def stats(self):
+        with self._lock:
+            waits = list(self._waits)
+            return {
+                "depth": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "speaking": self._current.text[:50] if self._current else None,
+                "spoken": self.spoken,
+                "failed": self.failed,
+                "duplicates": self.duplicates,
+                "interrupted": self.interrupted,
+                "echoes": self.echoes,
+                "avg_wait_s": sum(waits) / len(waits) if waits else 0.0,
+                "max_wait_s": max(waits) if waits else 0.0,
+            }
@@ -1,24 +1,18 @@
-import speech_recognition as sr
 from dotenv import dotenv_values
 import os
 import mtranslate as mt
 import logging
-from threading import Lock
+from Backend.MicrophoneService import get_microphone_service
+from Backend.Recognizers import get_recognizer_race
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 InputLanguage = env_vars.get("InputLanguage", "en-US")
 
-# Initialize recognizer with optimized settings
-recognizer = sr.Recognizer()
-recognizer.energy_threshold = 300  # Lower threshold for better sensitivity
-recognizer.dynamic_energy_threshold = True
-recognizer.pause_threshold = 0.8  # Shorter pause for faster response
-recognizer.phrase_threshold = 0.3
-recognizer.non_speaking_duration = 0.5
-
-# Thread lock for microphone access
-mic_lock = Lock()
+# Utterances come from the microphone service, which opens and calibrates the input stream
+# once and segments speech in the background; the recognizers race on each utterance
+LISTEN_TIMEOUT = 5        # Seconds to wait for speech before returning ""
+FALLBACK_SPEECH_RATIO = 2.0   # More sensitive speech threshold for the second attempt
 
 def SetAssistantStatus(Status):
     """Set assistant status with error handling."""
@@ -62,65 +56,24 @@ def UniversalTranslator(Text):
         logging.error(f"Translation error: {e}")
         return Text
 
-def get_microphone():
-    """Get the best available microphone."""
-    try:
-        # Try to get the default microphone
-        mic = sr.Microphone()
-        
-        # Adjust for ambient noise
-        with mic_lock:
-            with mic as source:
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
-        
-        return mic
-    except Exception as e:
-        logging.error(f"Error getting microphone: {e}")
-        return None
-
-def SpeechRecognition():
-    """Enhanced speech recognition with better performance."""
-    mic = get_microphone()
-    if not mic:
+def ListenForUtterance():
+    """Next utterance from the already-open microphone stream, or None."""
+    microphone = get_microphone_service()
+    if not microphone.start():
         logging.error("No microphone available")
-        return ""
+        return None
     
+    SetAssistantStatus("Listening... 👂")
+    audio = microphone.listen(timeout=LISTEN_TIMEOUT)
+    if audio is None:
+        logging.debug("No speech detected within timeout")
+    return audio
+
+def TranscribeUtterance(audio):
+    """Recognize captured audio; every configured recognizer runs on it at once."""
     try:
-        with mic_lock:
-            with mic as source:
-                SetAssistantStatus("Listening... 👂")
-                
-                # Listen for audio with timeout
-                audio = recognizer.listen(
-                    source, 
-                    timeout=5, 
-                    phrase_time_limit=10
-                )
-        
         SetAssistantStatus("Processing... 🤔")
-        
-        # Try multiple recognition services for better accuracy
-        text = ""
-        
-        # First try Google Speech Recognition
-        try:
-            text = recognizer.recognize_google(
-                audio, 
-                language=InputLanguage
-            )
-        except sr.UnknownValueError:
-            logging.debug("Google Speech Recognition could not understand audio")
-        except sr.RequestError as e:
-            logging.warning(f"Google Speech Recognition error: {e}")
-        
-        # Fallback to Sphinx if Google fails
-        if not text:
-            try:
-                text = recognizer.recognize_sphinx(audio)
-            except sr.UnknownValueError:
-                logging.debug("Sphinx could not understand audio")
-            except Exception as e:
-                logging.error(f"Sphinx error: {e}")
+        text = get_recognizer_race().recognize(audio)
         
         if text:
             # Translate if needed
@@ -132,36 +85,40 @@ def SpeechRecognition():
         else:
             return ""
             
-    except sr.WaitTimeoutError:
-        logging.debug("No speech detected within timeout")
-        return ""
     except Exception as e:
         logging.error(f"Speech recognition error: {e}")
         return ""
 
+def SpeechRecognition():
+    """Enhanced speech recognition with better performance."""
+    audio = ListenForUtterance()
+    return TranscribeUtterance(audio) if audio is not None else ""
+
 def SpeechRecognitionWithFallback():
-    """Speech recognition with multiple fallback options."""
-    # Try the main recognition method
-    result = SpeechRecognition()
+    """Speech recognition with multiple fallback options.
+
+    Every recognizer already ran on the captured audio, so it is never
+    recorded again; only when nothing was heard does it listen once more,
+    with a more sensitive speech threshold.
+    """
+    audio = ListenForUtterance()
     
-    if result:
-        return result
+    if audio is None:
+        try:
+            # Temporarily adjust settings for better sensitivity
+            microphone = get_microphone_service()
+            original_ratio = microphone.speech_ratio
+            microphone.speech_ratio = FALLBACK_SPEECH_RATIO
+            try:
+                audio = ListenForUtterance()
+            finally:
+                # Restore original settings
+                microphone.speech_ratio = original_ratio
+        except Exception as e:
+            logging.error(f"Fallback recognition error: {e}")
+            return ""
     
-    # If no result, try with different settings
-    try:
-        # Temporarily adjust settings for better sensitivity
-        original_threshold = recognizer.energy_threshold
-        recognizer.energy_threshold = 200
-        
-        result = SpeechRecognition()
-        
-        # Restore original settings
-        recognizer.energy_threshold = original_threshold
-        
-        return result
-    except Exception as e:
-        logging.error(f"Fallback recognition error: {e}")
-        return ""
+    return TranscribeUtterance(audio) if audio is not None else ""
 
 if __name__ == "__main__":
     # Test the speech recognition
@@ -180,4 +137,7 @@ if __name__ == "__main__":
             break
         except Exception as e:
             print(f"Error: {e}")
+    
+    print(get_microphone_service().stats())
+    print(get_recognizer_race().stats())
             
\ No newline at end of file
@@ -0,0 +1,177 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+TTS_CACHE_DIR = os.path.join("Data", "TTSCache")
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+MEMORY_CACHE_BYTES = 8 * 1024 * 1024    # Recently used audio also kept in RAM
+TOUCH_INTERVAL = 60.0                   # Memory hits refresh a file's mtime at most this often
+
+
+def AudioKey(text, voice, pitch, rate) -> str:
+    """Content address of one synthesized utterance."""
+    return hashlib.sha256(f"{voice}\n{pitch}\n{rate}\n{text}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """On-disk MP3 cache keyed by hash(text, voice, pitch, rate), evicted least recently used by total size.
+
+    Recency is kept in the files' modification times, so it survives restarts.
+    The most recently used audio is also held in memory (up to
+    ``memory_bytes``), so repeated phrases are played without touching disk.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=MAX_CACHE_BYTES, memory_bytes=MEMORY_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._lock = threading.Lock()
+        self._files = {}    # key -> [size, last used]
+        self._touched = {}  # key -> when the file's mtime was last set
+        self._memory = OrderedDict()   # key -> audio bytes, least recently used first
+        self._memory_size = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _scan(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                try:
+                    os.remove(path)  # Left over from an interrupted write
+                except OSError:
+                    pass
+            elif name.endswith(".mp3"):
+                stat = os.stat(path)
+                self._files[name[:-4]] = [stat.st_size, stat.st_mtime]
+
+    def path(self, text, voice, pitch, rate):
+        """Path of the cached audio, or None. A hit marks the entry as recently used."""
+        key = AudioKey(text, voice, pitch, rate)
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None or not os.path.exists(self._path(key)):
+                self._files.pop(key, None)
+                self._touched.pop(key, None)
+                self._forget(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry[1] = self._touched[key] = time.time()
+        self._touch(key)
+        return self._path(key)
+
+    def _touch(self, key):
+        """Mark the file as recently used on disk, so recency survives restarts."""
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def get(self, text, voice, pitch, rate):
+        """Cached audio bytes, or None."""
+        key = AudioKey(text, voice, pitch, rate)
+        hit = touch = False
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None and key in self._files:
+                self._memory.move_to_end(key)
+                now = self._files[key][1] = time.time()
+                touch = now - self._touched.get(key, 0.0) >= TOUCH_INTERVAL
+                if touch:
+                    self._touched[key] = now
+                self.hits += 1
+                self.memory_hits += 1
+                hit = True
+        if hit:
+            if touch:
+                self._touch(key)
+            return audio
+        path = self.path(text, voice, pitch, rate)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self._remember(key, audio)
+        return audio
+
+    def _remember(self, key, audio):
+        if len(audio) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped)
+
+    def _forget(self, key):
+        audio = self._memory.pop(key, None)
+        if audio is not None:
+            self._memory_size -= len(audio)
+
+    def put(self, text, voice, pitch, rate, audio: bytes) -> str:
+        """Store synthesized audio atomically and return its path."""
+        key = AudioKey(text, voice, pitch, rate)
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._files[key] = [len(audio), time.time()]
+            self._touched[key] = self._files[key][1]
+            self._remember(key, bytes(audio))
+            self._evict()
+        return path
+
+    def _evict(self):
+        total = sum(size for size, _ in self._files.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._files.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError as e:
+                logging.warning(f"Could not evict TTS cache file {key}: {e}")
+            del self._files[key]
+            self._touched.pop(key, None)
+            self._forget(key)
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "files": len(self._files),
+                "bytes": sum(size for size, _ in self._files.values()),
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "memory_bytes": self._memory_size,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
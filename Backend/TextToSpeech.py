@@ -1,75 +1,297 @@
 import pygame
-import random
 import asyncio
 import edge_tts
 import os
 import hashlib
 import threading
-from concurrent.futures import ThreadPoolExecutor
 from dotenv import dotenv_values
 import logging
+import sys
+import io
+import time
 import tempfile
+from Backend.TTSCache import TTSCache
+from Backend import Sentences
+from Backend.Sentences import SplitSentences, LONG_TEXT_RESPONSES
+from Backend.AudioStream import PlayStream, PlayBytes, PlaySound, EnableDebugFiles, STOP_CHECK_SECONDS, MIXER_FREQUENCY
+from Backend.SpeechService import SpeechService, SpeechRequest, PRIORITY_HIGH, PRIORITY_NORMAL
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 AssistantVoice = env_vars.get("AssistantVoice", "en-US-JennyNeural")
+Assistantname = env_vars.get("Assistantname", "JARVIS")
+TTSCacheMB = float(env_vars.get("TTSCacheMB", 50))
+SpeakFullAnswer = env_vars.get("SpeakFullAnswer", "false").lower() == "true"
+TTSDebugFiles = env_vars.get("TTSDebugFiles", "false").lower() == "true"
+
+# Voice settings (part of the audio cache key)
+PITCH = '-5Hz'
+RATE = '+15%'
+
+PREFETCH_SENTENCES = 1      # Sentences synthesized ahead of the one playing
+
+# Synthesized audio, keyed by hash(text, voice, pitch, rate)
+audio_cache = TTSCache(max_bytes=int(TTSCacheMB * 1024 * 1024))
+
+# Fixed lines spoken by main.py (keep in sync), pre-synthesized by `python -m Backend.TextToSpeech prewarm`
+STATIC_PHRASES = LONG_TEXT_RESPONSES + [
+    "System initializing",
+    "Initialization failed. Please fix issues and restart.",
+    f"Good morning, boss! welcome back I'm {Assistantname}, your personal AI assistant. How can I help to improve your productivity?",
+    f"Good afternoon, boss! I'm {Assistantname}, your personal AI assistant. welcome back How can I help you today?",
+    f"Good evening, boss! I'm {Assistantname}, your personal AI assistant. welcome back Ready to assist you.",
+    "Goodbye! Please say bye to confirm shutdown or say cancel to abort.",
+    "System shutdown complete. See you next time!",
+    "Shutdown cancelled. I'm back and ready to help!",
+    "An error occurred during shutdown. Please try again or close the program manually.",
+    "Generating image",
+    "Image generated!",
+    "Image generation failed. Please retry.",
+    "Navigation completed!",
+    "Navigation completed with some issues.",
+    "Navigation failed. Please try again.",
+    "Command completed!",
+    "Command failed. Please try again.",
+    "Searching for your query",
+    "I am now sleeping. Say wake up or get up to continue.",
+    "I am now sleeping. Clap twice to wake me up.",
+    "I'm back and ready to help!",
+]
 
 # Initialize pygame mixer once
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+pygame.mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=512)
+
+# Audio is decoded from memory; TTSDebugFiles=true routes it through Data/TTSDebug/ for inspection
+if TTSDebugFiles:
+    EnableDebugFiles(os.path.join("Data", "TTSDebug"))
 
-# Thread pool for async operations
-executor = ThreadPoolExecutor(max_workers=2)
+async def Synthesize(text, voice=AssistantVoice) -> bytes:
+    """Synthesize text with edge_tts and return the MP3 bytes."""
+    communicate = edge_tts.Communicate(
+        text, 
+        voice, 
+        pitch=PITCH, 
+        rate=RATE
+    )
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
 
 async def TextToAudioFile(text, voice=AssistantVoice) -> str:
-    """Convert text to audio file without caching."""
-    # Generate a temporary file path that won't be saved
-    temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-    temp_path = temp_file.name
-    temp_file.close()
+    """Return the path of the audio for text, synthesizing it only on a cache miss."""
+    cached_path = audio_cache.path(text, voice, PITCH, RATE)
+    if cached_path:
+        return cached_path
     
     # Generate new audio file
     try:
-        communicate = edge_tts.Communicate(
-            text, 
-            voice, 
-            pitch='-5Hz', 
-            rate='+15%'
-        )
-        await communicate.save(temp_path)
-        return temp_path
+        audio = await Synthesize(text, voice)
+        if not audio:
+            logging.error("Error generating audio: no audio received")
+            return None
+        return audio_cache.put(text, voice, PITCH, RATE, audio)
     except Exception as e:
         logging.error(f"Error generating audio: {e}")
-        # Clean up temp file if generation failed
-        try:
-            os.remove(temp_path)
-        except:
-            pass
         return None
 
-def play_audio_file(file_path, stop_callback=None):
-    """Play audio file with better error handling."""
+async def SpeakStreaming(text, voice=AssistantVoice, stop_callback=None) -> bool:
+    """Speak text, starting playback with the first audio chunk edge_tts sends.
+
+    Audio is decoded and played from memory; cached phrases play straight
+    from the cache and complete syntheses are added to it.
+    """
+    cached = audio_cache.get(text, voice, PITCH, RATE)
+    if cached:
+        return await PlayBytes(cached, stop_callback)
+    
+    communicate = edge_tts.Communicate(text, voice, pitch=PITCH, rate=RATE)
+    
+    async def chunks():
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+    
+    audio, first_audio = await PlayStream(chunks(), stop_callback)
+    if first_audio is not None:
+        logging.info(f"Speech started after {first_audio:.2f}s")
+    if audio:
+        audio_cache.put(text, voice, PITCH, RATE, audio)
+    return audio is not None
+
+async def SynthesizeCached(text, voice=AssistantVoice):
+    """Audio bytes for text from the cache, or synthesized and cached. None on failure."""
+    audio = audio_cache.get(text, voice, PITCH, RATE)
+    if audio:
+        return audio
+    try:
+        audio = await Synthesize(text, voice)
+    except Exception as e:
+        logging.error(f"Error generating audio: {e}")
+        return None
+    if audio:
+        audio_cache.put(text, voice, PITCH, RATE, audio)
+    return audio or None
+
+async def SpeakSentences(sentences, voice=AssistantVoice, stop_callback=None, prefetch=PREFETCH_SENTENCES) -> bool:
+    """Speak sentences in order, synthesizing the next ones while the current one plays.
+
+    The first sentence is streamed so speech starts right away. A sentence
+    that fails to synthesize or play is skipped, whichever it is. Returns
+    False if stopped through ``stop_callback`` or if nothing could be spoken.
+    """
+    stop_callback = stop_callback or (lambda: False)
+    pending = {}
+
+    def schedule(index):
+        for i in range(index, min(index + prefetch, len(sentences))):
+            if i not in pending:
+                pending[i] = asyncio.ensure_future(SynthesizeCached(sentences[i], voice))
+
+    if not sentences:
+        return False
+    spoken = 0
+    try:
+        schedule(1)
+        try:
+            spoken += await SpeakStreaming(sentences[0], voice, stop_callback)
+        except Exception as e:
+            logging.error(f"Error speaking sentence: {e}")
+        for index in range(1, len(sentences)):
+            if stop_callback():
+                return False
+            schedule(index + 1)
+            audio = await pending.pop(index)
+            if audio is None:
+                continue  # Skip a sentence that failed to synthesize
+            try:
+                spoken += await PlayBytes(audio, stop_callback)
+            except Exception as e:
+                logging.error(f"Error speaking sentence: {e}")
+        return spoken > 0 and not stop_callback()
+    finally:
+        for task in pending.values():
+            task.cancel()
+        await asyncio.gather(*pending.values(), return_exceptions=True)
+
+def EnsureMixer():
+    # Initialize pygame mixer if not already done
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=512)
+        print("✅ Pygame mixer initialized")
+
+def PrepareSentences(text, full=None):
+    """Sentences to speak; long answers are cut unless ``full`` (default: SpeakFullAnswer)."""
+    return Sentences.PrepareSentences(text, SpeakFullAnswer if full is None else full)
+
+async def SpeakText(text, stop_callback=None, full=None) -> bool:
+    """Speech engine entry point used by the speech service."""
+    EnsureMixer()
+    return await SpeakSentences(PrepareSentences(text, full), stop_callback=stop_callback)
+
+# One queue and playback worker for all speech
+_speech_service = None
+_speech_service_lock = threading.Lock()
+
+def get_speech_service() -> SpeechService:
+    global _speech_service
+    with _speech_service_lock:
+        if _speech_service is None:
+            _speech_service = SpeechService(SpeakText)
+        return _speech_service
+
+def Speak(Text, priority=PRIORITY_NORMAL, interrupt=False, func=None, full=None) -> SpeechRequest:
+    """Queue text for speaking without blocking; ``.wait()`` on the result to block."""
+    return get_speech_service().say(str(Text).strip(), priority, interrupt, func, full)
+
+def InterruptSpeech():
+    """Barge-in: stop what is being said and drop queued chatter."""
+    get_speech_service().interrupt(PRIORITY_HIGH)
+
+def IsOwnSpeech(query) -> bool:
+    """Whether a recognized query is the assistant's own voice coming back through the microphone."""
+    return get_speech_service().is_echo(query)
+
+async def PrewarmCache(phrases=STATIC_PHRASES, voice=AssistantVoice, concurrency=4):
+    """Synthesize every sentence of the phrases that is not cached yet. Returns the number synthesized.
+
+    Phrases are split with SplitSentences, as PrepareSentences does before
+    playback, so the cached entries are the ones playback looks up.
+    """
+    sentences = dict.fromkeys(s for phrase in phrases for s in SplitSentences(phrase))
+    missing = [s for s in sentences if not audio_cache.path(s, voice, PITCH, RATE)]
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def warm(phrase):
+        async with semaphore:
+            return await SynthesizeCached(phrase, voice) is not None
+    
+    results = await asyncio.gather(*(warm(p) for p in missing))
+    return sum(results)
+
+def BenchmarkAudioPaths(audio: bytes, runs=50):
+    """Milliseconds per utterance to get MP3 bytes into a playable pygame Sound.
+
+    ``tempfile`` is the old path (write a temp file, load it, delete it),
+    ``bytesio`` decodes from memory, ``pcm`` hands the mixer already decoded
+    samples (what a decoded-audio cache would do).
+    """
+    EnsureMixer()
+
+    def tempfile_path():
+        temp = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+        try:
+            temp.write(audio)
+            temp.close()
+            return pygame.mixer.Sound(temp.name)
+        finally:
+            os.remove(temp.name)
+
+    pcm = pygame.mixer.Sound(file=io.BytesIO(audio)).get_raw()
+    paths = {
+        "tempfile": tempfile_path,
+        "bytesio": lambda: pygame.mixer.Sound(file=io.BytesIO(audio)),
+        "pcm": lambda: pygame.mixer.Sound(buffer=pcm),
+    }
+    results = {}
+    for name, load in paths.items():
+        load()  # Warm up
+        started = time.perf_counter()
+        for _ in range(runs):
+            load()
+        results[name] = (time.perf_counter() - started) / runs * 1000
+    return results
+
+def play_audio_file(file_path, stop_callback=None, wait=True):
+    """Play audio file with better error handling.
+
+    Blocks until it ends unless ``wait`` is False, in which case the
+    PlaybackHandle is returned (``wait()``, ``await``, ``add_done_callback``).
+    """
     try:
         if not os.path.exists(file_path):
             logging.error(f"Audio file not found: {file_path}")
             return False
         
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
+        EnsureMixer()
+        handle = PlaySound(pygame.mixer.Sound(file_path))
+        if not wait:
+            return handle
         
-        # Wait for audio to finish
-        while pygame.mixer.music.get_busy():
-            if stop_callback and stop_callback():
-                pygame.mixer.music.stop()
+        # Sleep until playback ends, waking only to consult the stop callback
+        while not handle.wait(STOP_CHECK_SECONDS if stop_callback else None):
+            if stop_callback():
+                handle.stop()
                 return False
-            pygame.time.Clock().tick(30)  # Higher FPS for smoother playback
         
         return True
     except Exception as e:
         logging.error(f"Error playing audio: {e}")
         return False
 
-def SimpleTextToSpeech(Text):
-    """Simple, reliable text-to-speech function without caching."""
+def SimpleTextToSpeech(Text, stop_callback=None):
+    """Speak text in full and block until done; repeated phrases play from the audio cache."""
     if not Text or not Text.strip():
         print("⚠️ No text provided for speech")
         return False
@@ -77,59 +299,29 @@ def SimpleTextToSpeech(Text):
     text = str(Text).strip()
     print(f"🗣️ Speaking: '{text[:50]}...'")
     
-    temp_file_path = None
-    
     try:
-        # Initialize pygame mixer if not already done
-        if not pygame.mixer.get_init():
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-            print("✅ Pygame mixer initialized")
-        
-        # Set volume to maximum
-        pygame.mixer.music.set_volume(1.0)
+        func = (lambda: not stop_callback()) if stop_callback else None
+        spoken = Speak(text, PRIORITY_HIGH, func=func, full=True).wait()
         
-        # Generate audio file
-        print("🎤 Generating audio...")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            temp_file_path = loop.run_until_complete(TextToAudioFile(text))
-        finally:
-            loop.close()
-        
-        if not temp_file_path:
-            print("❌ Failed to generate audio file")
+        if not spoken:
+            print("❌ Failed to generate audio")
             return False
         
-        print(f"📁 Temporary audio file created")
-        
-        # Play the audio
-        print("▶️ Playing audio...")
-        pygame.mixer.music.load(temp_file_path)
-        pygame.mixer.music.play()
-        
-        # Wait for audio to finish
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(30)
-        
         print("✅ Audio playback completed")
         return True
         
     except Exception as e:
         print(f"❌ Error in SimpleTextToSpeech: {e}")
         return False
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                print("🗑️ Temporary audio file cleaned up")
-            except Exception as e:
-                print(f"⚠️ Could not clean up temp file: {e}")
 
-def TextToSpeech(Text, func=lambda r=None: True):
-    """Optimized text-to-speech with smart truncation."""
+def TextToSpeech(Text, func=lambda r=None: True, full=None, priority=PRIORITY_HIGH):
+    """Speak text sentence by sentence and block until done.
+
+    Goes through the speech queue, so it never talks over other speech.
+    Long answers are cut to two sentences plus a pointer to the chat screen
+    unless ``full`` (default: SpeakFullAnswer in .env) is set. Speech stops
+    as soon as ``func()`` returns False.
+    """
     if not Text or not Text.strip():
         print("⚠️ No text provided for speech")
         return
@@ -139,31 +331,7 @@ def TextToSpeech(Text, func=lambda r=None: True):
     print(f"🗣️ Attempting to speak: '{text[:50]}...'")
     
     try:
-        # Responses for long text
-        responses = [
-            "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-            "The rest of the text is now on the chat screen, sir, please check it.",
-            "You can see the rest of the text on the chat screen, sir.",
-            "The remaining part of the text is now on the chat screen, sir.",
-            "Sir, you'll find more text on the chat screen for you to see.",
-            "The rest of the answer is now on the chat screen, sir.",
-            "Sir, please look at the chat screen, the rest of the answer is there.",
-            "You'll find the complete answer on the chat screen, sir.",
-            "The next part of the text is on the chat screen, sir.",
-            "Sir, please check the chat screen for more information."
-        ]
-        
-        # Smart text truncation for better UX
-        sentences = text.split(".")
-        if len(sentences) > 4 and len(text) >= 250:
-            # Speak first two sentences + response
-            spoken_text = ".".join(sentences[:2]) + ". " + random.choice(responses)
-            print(f"🗣️ Speaking truncated text: '{spoken_text[:50]}...'")
-            result = SimpleTextToSpeech(spoken_text)
-        else:
-            # Speak full text
-            print(f"🗣️ Speaking full text: '{text[:50]}...'")
-            result = SimpleTextToSpeech(text)
+        result = Speak(text, priority, func=func, full=full).wait()
         
         if result:
             print("✅ Text-to-speech completed successfully")
@@ -176,15 +344,24 @@ def TextToSpeech(Text, func=lambda r=None: True):
 
 def TextToSpeechAsync(Text, func=lambda r=None: True):
     """Async version of text-to-speech for non-blocking operation."""
-    def run_tts():
-        TextToSpeech(Text, func)
-    
-    # Run in background thread
-    thread = threading.Thread(target=run_tts, daemon=True)
-    thread.start()
-    return thread
+    return Speak(Text, func=func)
 
 if __name__ == "__main__":
+    # python -m Backend.TextToSpeech prewarm  synthesizes the fixed phrases once (run after install)
+    if len(sys.argv) > 1 and sys.argv[1] == "prewarm":
+        print(f"Synthesized {asyncio.run(PrewarmCache())} sentences")
+        print(audio_cache.stats())
+        sys.exit(0)
+    
+    # python -m Backend.TextToSpeech bench [file.mp3]  compares temp-file and in-memory decoding
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        with open(sys.argv[2] if len(sys.argv) > 2 else os.path.join("Data", "speech.mp3"), "rb") as f:
+            sample = f.read()
+        results = BenchmarkAudioPaths(sample)
+        for name, ms in results.items():
+            print(f"{name:9s} {ms:7.2f} ms/utterance  ({results['tempfile'] / ms:.1f}x vs tempfile)")
+        sys.exit(0)
+    
     print("Text-to-Speech Test Mode")
     print("Enter text to speak (or 'quit' to exit):")
     
@@ -200,6 +377,7 @@ if __name__ == "__main__":
             print(f"Error: {e}")
     
     # Cleanup
-    executor.shutdown(wait=True)
+    print(audio_cache.stats())
+    print(get_speech_service().stats())
     pygame.mixer.quit()
 
@@ -0,0 +1,300 @@
+import os
+import sys
+import glob
+import json
+import time
+import wave
+from collections import deque
+import numpy as np
+
+FRAME_MS = 16               # Analysis frame (256 samples at 16 kHz)
+SPEECH_RATIO = 3.0          # Voiced speech: energy this many times the noise floor
+UNVOICED_RATIO = 1.5        # Fricatives ("s", "f"): quieter, but with a high zero-crossing rate
+UNVOICED_ZCR = 0.3          # Zero crossings per sample above which a quiet frame counts as unvoiced speech
+MIN_ENERGY = 150            # Threshold never drops below this (int16 RMS)
+NOISE_ADAPT = 0.02          # Weight of each inactive frame in the running noise floor
+ACTIVE_ADAPT = 0.005        # Weight of each active frame pulling the floor up to the recent minimum energy
+MINIMUM_WINDOW_SECONDS = 1.0  # Speech has pauses within this; steady noise (a fan turning on) does not
+ONSET_FRAMES = 3            # Consecutive active frames that start speech (ignores clicks)
+HANGOVER_SECONDS = 0.5      # Speech is held this long after the last active frame; then the utterance ends
+MIN_SPEECH_SECONDS = 0.3    # Utterances with less active speech are discarded
+MAX_UTTERANCE_SECONDS = 10.0
+PRE_ROLL_SECONDS = 0.25     # Audio kept from before the onset
+FIXTURE_DIR = os.path.join("Data", "VADFixtures")
+
+
+def FrameFeatures(samples, frame_size):
+    """Per-frame RMS energy and zero-crossing rate of int16 samples (whole frames only)."""
+    count = len(samples) // frame_size
+    frames = np.asarray(samples[:count * frame_size], dtype=np.float32).reshape(count, frame_size)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_size
+    return energy, zcr
+
+
+class AudioRing:
+    """The most recent ``seconds`` of int16 audio, addressed by absolute sample position."""
+
+    def __init__(self, seconds, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self._buffer = np.zeros(int(seconds * sample_rate), dtype=np.int16)
+        self.position = 0           # Samples written so far
+
+    @property
+    def oldest(self):
+        """Position of the oldest sample still held."""
+        return max(0, self.position - len(self._buffer))
+
+    def write(self, samples):
+        capacity = len(self._buffer)
+        if len(samples) >= capacity:
+            self.position += len(samples) - capacity   # Skipped samples still count
+            samples = samples[-capacity:]
+        start = self.position % capacity
+        first = min(len(samples), capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[:len(samples) - first] = samples[first:]
+        self.position += len(samples)
+
+    def read(self, start, end):
+        """Samples [start, end) as a new array; positions no longer held are clipped."""
+        start, end = max(start, self.oldest), min(end, self.position)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        capacity = len(self._buffer)
+        begin = start % capacity
+        first = min(end - start, capacity - begin)
+        return np.concatenate([self._buffer[begin:begin + first], self._buffer[:end - start - first]])
+
+    def latest(self, count):
+        return self.read(self.position - count, self.position)
+
+
+class VoiceActivityDetector:
+    """Frame-level speech/non-speech decisions from energy and zero-crossing rate.
+
+    Features are computed for a whole block of frames at once; the noise
+    floor follows the frames classified as inactive. During active runs it
+    creeps up towards the lowest energy of the last MINIMUM_WINDOW_SECONDS,
+    so noise louder than the threshold stops counting as speech after a few
+    seconds instead of holding the detector active for good.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=FRAME_MS, ratio=SPEECH_RATIO):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.ratio = ratio
+        self.noise_floor = None
+        self._recent = np.zeros(0, dtype=np.float32)    # Energies of the last MINIMUM_WINDOW_SECONDS
+        self._window = max(1, round(MINIMUM_WINDOW_SECONDS * 1000 / frame_ms))
+
+    @property
+    def threshold(self):
+        return max(MIN_ENERGY, (self.noise_floor or 0.0) * self.ratio)
+
+    def calibrate(self, samples):
+        energy, _ = FrameFeatures(samples, self.frame_size)
+        if len(energy):
+            self.noise_floor = float(np.median(energy))
+
+    def classify(self, samples):
+        """Active flag for each whole frame in ``samples``."""
+        energy, zcr = FrameFeatures(samples, self.frame_size)
+        if not len(energy):
+            return np.zeros(0, dtype=bool)
+        if self.noise_floor is None:
+            self.noise_floor = float(np.percentile(energy, 10))
+        threshold = self.threshold
+        unvoiced = max(MIN_ENERGY, self.noise_floor * UNVOICED_RATIO)
+        active = (energy > threshold) | ((energy > unvoiced) & (zcr > UNVOICED_ZCR))
+        quiet = energy[~active]
+        if len(quiet):
+            # Same result as adapting frame by frame towards their mean
+            weight = 1.0 - (1.0 - NOISE_ADAPT) ** len(quiet)
+            self.noise_floor += weight * (float(quiet.mean()) - self.noise_floor)
+        self._recent = np.concatenate([self._recent, energy])[-self._window:]
+        loud = len(energy) - len(quiet)
+        if loud and len(self._recent) == self._window:
+            minimum = float(self._recent.min())
+            if minimum > self.noise_floor:
+                weight = 1.0 - (1.0 - ACTIVE_ADAPT) ** loud
+                self.noise_floor += weight * (minimum - self.noise_floor)
+        return active
+
+
+class UtteranceSegmenter:
+    """Cuts a continuous stream of int16 mono audio into utterances.
+
+    Speech starts after ONSET_FRAMES active frames and ends once the
+    hangover runs out; silence outside utterances is dropped (apart from a
+    short pre-roll). ``push`` returns the utterances finished by that block
+    as (audio bytes, start sample, end sample) tuples.
+    """
+
+    def __init__(self, sample_rate=16000, detector=None, hangover=HANGOVER_SECONDS,
+                 min_speech=MIN_SPEECH_SECONDS, max_seconds=MAX_UTTERANCE_SECONDS, pre_roll=PRE_ROLL_SECONDS):
+        self.sample_rate = sample_rate
+        self.detector = detector or VoiceActivityDetector(sample_rate)
+        frame_seconds = self.detector.frame_size / sample_rate
+        self.hangover_frames = max(1, round(hangover / frame_seconds))
+        self.min_speech_frames = max(1, round(min_speech / frame_seconds))
+        self.max_frames = max(1, round(max_seconds / frame_seconds))
+        self._pre_roll = deque(maxlen=max(ONSET_FRAMES, round(pre_roll / frame_seconds)))
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._frames = []           # Frames of the utterance in progress
+        self._start = 0
+        self._onset = 0
+        self._active = 0
+        self._silent = 0
+        self.position = 0           # Samples consumed so far
+
+    @property
+    def speaking(self):
+        return bool(self._frames)
+
+    def push(self, data):
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray)) else data
+        samples = np.concatenate([self._remainder, samples]) if len(self._remainder) else samples
+        size = self.detector.frame_size
+        count = len(samples) // size
+        self._remainder = samples[count * size:].copy()
+        active = self.detector.classify(samples[:count * size])
+
+        finished = []
+        for index in range(count):
+            frame = samples[index * size:(index + 1) * size]
+            self.position += size
+            if not self._frames:
+                self._pre_roll.append(frame)
+                self._onset = self._onset + 1 if active[index] else 0
+                if self._onset >= ONSET_FRAMES:
+                    self._frames = list(self._pre_roll)
+                    self._pre_roll.clear()
+                    self._start = self.position - len(self._frames) * size
+                    self._active, self._silent = self._onset, 0
+                continue
+
+            self._frames.append(frame)
+            if active[index]:
+                self._active += 1
+                self._silent = 0
+            else:
+                self._silent += 1
+            if self._silent >= self.hangover_frames or len(self._frames) >= self.max_frames:
+                if self._active >= self.min_speech_frames:
+                    finished.append((np.concatenate(self._frames).tobytes(), self._start, self.position))
+                self._frames = []
+                self._onset = 0
+        return finished
+
+
+# ---------- Offline benchmark over WAV fixtures ----------
+def ReadWav(path):
+    """Samples (int16 mono) and sample rate of a 16-bit WAV file."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        if f.getnchannels() > 1:
+            samples = samples.reshape(-1, f.getnchannels()).mean(axis=1).astype(np.int16)
+        return samples, f.getframerate()
+
+def LoadFixtures(directory=FIXTURE_DIR):
+    """(name, samples, rate, labelled speech segments in seconds) for every WAV with a JSON label file.
+
+    ``clip.wav`` is labelled by ``clip.json``: {"segments": [[start, end], ...]}.
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        label_path = path[:-4] + ".json"
+        if not os.path.exists(label_path):
+            continue
+        with open(label_path, "r", encoding="utf-8") as f:
+            segments = json.load(f)["segments"]
+        samples, rate = ReadWav(path)
+        fixtures.append((os.path.basename(path), samples, rate, segments))
+    return fixtures
+
+def BenchmarkSegmentation(fixtures, chunk=1024):
+    """Replay fixtures chunk by chunk and score the utterances cut from them.
+
+    Reports the detector's frame-level precision/recall against the labels,
+    the share of labelled speech inside the cut utterances, how many
+    labelled segments were cut (matched by overlap) and the latency from the
+    labelled end of speech to the cut.
+    """
+    totals = {"tp": 0, "fp": 0, "fn": 0, "speech": 0, "kept": 0, "cut": 0, "samples": 0,
+              "segments": 0, "found": 0, "extra": 0, "seconds": 0.0}
+    latencies, elapsed = [], 0.0
+    for name, samples, rate, segments in fixtures:
+        segmenter = UtteranceSegmenter(rate)
+        segmenter.detector.calibrate(samples[:rate // 2])
+        started = time.perf_counter()
+        cuts = []
+        for offset in range(0, len(samples), chunk):
+            cuts.extend(segmenter.push(samples[offset:offset + chunk]))
+        cuts.extend(segmenter.push(np.zeros(int(rate * HANGOVER_SECONDS) * 2, dtype=np.int16)))  # Flush
+        elapsed += time.perf_counter() - started
+        totals["seconds"] += len(samples) / rate
+        totals["samples"] += len(samples)
+
+        truth = np.zeros(len(samples), dtype=bool)
+        for start, end in segments:
+            truth[int(start * rate):int(end * rate)] = True
+
+        # Raw frame decisions of an identically calibrated detector
+        detector = VoiceActivityDetector(rate)
+        detector.calibrate(samples[:rate // 2])
+        block = max(detector.frame_size, chunk - chunk % detector.frame_size)
+        active = np.concatenate([detector.classify(samples[offset:offset + block])
+                                 for offset in range(0, len(samples), block)])
+        frame_truth = truth[:len(active) * detector.frame_size].reshape(len(active), -1).mean(axis=1) >= 0.5
+        totals["tp"] += int(np.count_nonzero(frame_truth & active))
+        totals["fp"] += int(np.count_nonzero(~frame_truth & active))
+        totals["fn"] += int(np.count_nonzero(frame_truth & ~active))
+
+        kept = np.zeros(len(samples), dtype=bool)
+        for _, start, end in cuts:
+            kept[start:end] = True
+        totals["speech"] += int(np.count_nonzero(truth))
+        totals["kept"] += int(np.count_nonzero(truth & kept))
+        totals["cut"] += int(np.count_nonzero(kept))
+
+        used = set()
+        for start, end in segments:
+            totals["segments"] += 1
+            for i, (_, cut_start, cut_end) in enumerate(cuts):
+                if i not in used and cut_start / rate < end and cut_end / rate > start:
+                    used.add(i)
+                    totals["found"] += 1
+                    latencies.append(cut_end / rate - end)
+                    break
+        totals["extra"] += len(cuts) - len(used)
+
+    precision = totals["tp"] / max(1, totals["tp"] + totals["fp"])
+    recall = totals["tp"] / max(1, totals["tp"] + totals["fn"])
+    return {
+        "files": len(fixtures),
+        "frame_precision": round(precision, 3),
+        "frame_recall": round(recall, 3),
+        "speech_kept": round(totals["kept"] / max(1, totals["speech"]), 3),
+        "audio_passed_on": round(totals["cut"] / max(1, totals["samples"]), 3),
+        "segments_found": f"{totals['found']}/{totals['segments']}",
+        "extra_segments": totals["extra"],
+        "avg_cut_latency_s": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "max_cut_latency_s": round(max(latencies), 3) if latencies else None,
+        "realtime_factor": round(totals["seconds"] / elapsed, 1) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    # python -m Backend.VoiceActivity bench [directory]  scores segmentation on labelled WAV fixtures
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        directory = sys.argv[2] if len(sys.argv) > 2 else FIXTURE_DIR
+        fixtures = LoadFixtures(directory)
+        if not fixtures:
+            print(f"No labelled fixtures in {directory} (clip.wav + clip.json with {{\"segments\": [[start, end], ...]}})")
+            sys.exit(1)
+        for key, value in BenchmarkSegmentation(fixtures).items():
+            print(f"{key:18s} {value}")
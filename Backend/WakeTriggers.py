@@ -0,0 +1,441 @@
+import os
+import sys
+import glob
+import json
+import time
+import queue
+import logging
+import threading
+import numpy as np
+from Backend.VoiceActivity import AudioRing, UtteranceSegmenter, ReadWav
+from Backend.KeywordSpotter import get_wake_matcher
+
+FIXTURE_DIR = os.path.join("Data", "WakeFixtures")
+FULL_SCALE = 32768.0        # Energies and peaks are measured as a fraction of int16 full scale
+
+# Clap: a sharp, loud attack that dies away within ~100 ms
+CLAP_WINDOW = 0.005
+CLAP_MIN_PEAK = 0.3         # Peak amplitude (fraction of full scale); float32 samples never exceed 1.0
+CLAP_ONSET_RATIO = 8.0      # Onset window energy over the background level
+CLAP_ATTACK_RATIO = 4.0     # ... and over the window right before it
+CLAP_DECAY = (0.05, 0.1)    # Seconds after the onset over which the energy must have dropped
+CLAP_DECAY_RATIO = 0.3      # ... to below this share of the onset energy
+CLAP_REFRACTORY = 0.15      # One clap is not detected twice
+DOUBLE_CLAP_GAP = 0.8       # Longest gap between the claps of a multi-clap trigger
+
+# Energy burst: a loud sound held for a while (shout, whistle, knock sequence)
+BURST_WINDOW = 0.05
+BURST_RATIO = 10.0
+BURST_MIN_LEVEL = 0.05      # RMS (fraction of full scale) a burst must exceed regardless of the background
+BURST_SECONDS = 0.3
+BURST_REFRACTORY = 1.0
+
+MAX_EVENTS = 16             # Unclaimed trigger events kept (nobody waits while awake); the oldest are dropped
+
+BACKGROUND_ADAPT = 0.01     # Weight of each quiet window in a trigger's background level
+KEYWORD_MAX_SECONDS = 2.5   # Longer utterances are commands, not wake words
+
+
+def WindowLevels(samples, window):
+    """RMS energy and peak amplitude of consecutive windows, as fractions of full scale."""
+    count = len(samples) // window
+    frames = np.abs(samples[:count * window].astype(np.float32).reshape(count, window)) / FULL_SCALE
+    return np.sqrt(np.mean(frames * frames, axis=1)), frames.max(axis=1)
+
+
+class Trigger:
+    """Base class for wake triggers that scan the shared ring buffer in fixed windows.
+
+    ``process(ring)`` analyses every window completed since the last call
+    (plus ``context`` windows before and ``lookahead`` seconds after, for
+    triggers that need them) and returns the sample positions it fired at.
+    Subclasses implement ``detect``.
+    """
+
+    name = "trigger"
+    context = 1
+
+    def __init__(self, window, lookahead=0.0, sample_rate=16000, enabled=True):
+        self.window = int(window * sample_rate)
+        self.lookahead = int(lookahead * sample_rate)
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.background = None
+        self.emit = None            # Set by WakeDetector, for triggers that fire asynchronously
+        self._next = None
+
+    def reset(self):
+        """Start again from the newest audio (after being disabled for a while)."""
+        self._next = None
+
+    def process(self, ring):
+        end = ring.position - self.lookahead
+        earliest = ring.oldest + self.context * self.window
+        if self._next is None or self._next < earliest:
+            self._next = max(earliest, min(end, ring.position))
+        count = (end - self._next) // self.window
+        if count <= 0:
+            return []
+        start = self._next - self.context * self.window
+        energy, peak = WindowLevels(ring.read(start, self._next + count * self.window + self.lookahead), self.window)
+        if self.background is None:
+            self.background = float(np.median(energy))
+        fired = self.detect(energy, peak, count)
+        positions = [self._next + index * self.window for index in fired]
+        self._next += count * self.window
+        return positions
+
+    def detect(self, energy, peak, count):
+        """Indices (0..count-1) of the new windows the trigger fires at."""
+        raise NotImplementedError
+
+    def _adapt(self, quiet):
+        if len(quiet):
+            weight = 1.0 - (1.0 - BACKGROUND_ADAPT) ** len(quiet)
+            self.background += weight * (float(quiet.mean()) - self.background)
+
+
+class ClapTrigger(Trigger):
+    """Hand claps: onset detection on 5 ms windows, checked for a fast decay.
+
+    ``claps=2`` fires only on a double clap.
+    """
+
+    name = "clap"
+
+    def __init__(self, claps=1, sample_rate=16000):
+        super().__init__(CLAP_WINDOW, CLAP_DECAY[1], sample_rate)
+        self.claps = claps
+        self._decay = (round(CLAP_DECAY[0] / CLAP_WINDOW), round(CLAP_DECAY[1] / CLAP_WINDOW))
+        self._refractory = round(CLAP_REFRACTORY / CLAP_WINDOW)
+        self._last = None           # Window number of the last clap
+        self._sequence = 0
+        self._windows = 0           # Windows analysed so far
+
+    def detect(self, energy, peak, count):
+        index = np.arange(self.context, self.context + count)
+        current = energy[index]
+        sums = np.concatenate([[0.0], np.cumsum(energy)])
+        decay = (sums[index + self._decay[1]] - sums[index + self._decay[0]]) / (self._decay[1] - self._decay[0])
+        level = max(self.background, 1e-4) * CLAP_ONSET_RATIO
+        candidates = np.flatnonzero(
+            (current > level)
+            & (current > energy[index - 1] * CLAP_ATTACK_RATIO)
+            & (decay < current * CLAP_DECAY_RATIO)
+            & (peak[index] > CLAP_MIN_PEAK)
+        )
+        self._adapt(current[current <= level])
+
+        fired = []
+        gap = round(DOUBLE_CLAP_GAP / CLAP_WINDOW)
+        for candidate in candidates:
+            number = self._windows + int(candidate)
+            if self._last is not None and number - self._last < self._refractory:
+                continue
+            self._sequence = self._sequence + 1 if self._last is not None and number - self._last <= gap else 1
+            self._last = number
+            if self._sequence >= self.claps:
+                fired.append(int(candidate))
+                self._sequence = 0
+        self._windows += count
+        return fired
+
+
+class EnergyBurstTrigger(Trigger):
+    """A sound well above the background, held for at least BURST_SECONDS."""
+
+    name = "energy"
+
+    def __init__(self, sample_rate=16000):
+        super().__init__(BURST_WINDOW, 0.0, sample_rate)
+        self._needed = round(BURST_SECONDS / BURST_WINDOW)
+        self._refractory = round(BURST_REFRACTORY / BURST_WINDOW)
+        self._run = 0
+        self._since = self._refractory
+
+    def detect(self, energy, peak, count):
+        current = energy[self.context:self.context + count]
+        level = max(BURST_MIN_LEVEL, self.background * BURST_RATIO)
+        loud = current > level
+        self._adapt(current[~loud])
+        fired = []
+        # Run lengths carry over between calls; only windows where a run reaches the minimum can fire
+        runs = np.zeros(count, dtype=np.int64)
+        run = self._run
+        for index in range(count):
+            run = run + 1 if loud[index] else 0
+            runs[index] = run
+        for index in np.flatnonzero(runs == self._needed):
+            if self._since + index >= self._refractory:
+                fired.append(int(index))
+                self._since = -int(index)
+        self._since += count
+        self._run = run
+        return fired
+
+
+class KeywordTrigger(Trigger):
+    """Spoken wake words, checked on short utterances cut from the shared stream.
+
+    ``match(samples, sample_rate)`` returns the keyword heard (or None); it
+    runs on a worker thread so capture never waits for it, and the trigger
+    fires through ``emit`` when it returns. Created disabled: sleep mode
+    turns it on.
+    """
+
+    name = "keyword"
+
+    def __init__(self, match, sample_rate=16000, enabled=False):
+        super().__init__(0.016, 0.0, sample_rate, enabled)
+        self.match = match
+        self.segmenter = UtteranceSegmenter(sample_rate, max_seconds=KEYWORD_MAX_SECONDS * 2)
+        self._pending = queue.Queue(maxsize=4)
+        threading.Thread(target=self._run, daemon=True, name="keyword-trigger").start()
+
+    def reset(self):
+        super().reset()
+        self.segmenter = UtteranceSegmenter(self.sample_rate, max_seconds=KEYWORD_MAX_SECONDS * 2)
+
+    def process(self, ring):
+        if self._next is None or self._next < ring.oldest:
+            self._next = ring.position
+        samples = ring.read(self._next, ring.position)
+        self._next = ring.position
+        for audio, start, end in self.segmenter.push(samples):
+            if (end - start) / self.sample_rate <= KEYWORD_MAX_SECONDS:
+                try:
+                    self._pending.put_nowait((np.frombuffer(audio, dtype=np.int16), end))
+                except queue.Full:
+                    pass    # Matching fell behind; drop rather than queue up stale audio
+        return []
+
+    def _run(self):
+        while True:
+            samples, end = self._pending.get()
+            if not self.enabled:
+                continue
+            try:
+                keyword = self.match(samples, self.sample_rate)
+            except Exception as e:
+                logging.error(f"Keyword matching failed: {e}")
+                continue
+            if keyword and self.emit is not None:
+                self.emit(self.name, end, keyword)
+
+
+class WakeDetector:
+    """Runs wake triggers on the microphone service's stream and reports what fired.
+
+    Analysis happens inside the capture thread on the chunk just read, on
+    NumPy window statistics, so it costs a few microseconds per chunk.
+    """
+
+    def __init__(self, triggers=None, microphone=None):
+        self.triggers = list(triggers) if triggers is not None else [ClapTrigger(claps=2), EnergyBurstTrigger()]
+        self.microphone = microphone
+        self.counts = {}
+        self.dropped = 0
+        self._events = queue.Queue()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._started = False
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        for trigger in self.triggers:
+            trigger.emit = self._emit
+
+    def add_trigger(self, trigger):
+        trigger.emit = self._emit
+        with self._lock:
+            self.triggers = self.triggers + [trigger]
+
+    def trigger(self, name):
+        return next((trigger for trigger in self.triggers if trigger.name == name), None)
+
+    def add_callback(self, callback):
+        """Call ``callback(name, detail)`` whenever a trigger fires."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def start(self) -> bool:
+        with self._lock:
+            if self._started:
+                return True
+            if self.microphone is None:
+                from Backend.MicrophoneService import get_microphone_service
+                self.microphone = get_microphone_service()
+            if not self.microphone.start():
+                return False
+            self.microphone.add_listener(self.feed)
+            self._started = True
+            return True
+
+    def feed(self, samples, ring):
+        """Microphone listener: run every trigger on the chunk just written to ``ring``."""
+        started = time.perf_counter()
+        for trigger in self.triggers:
+            if not trigger.enabled:
+                continue
+            for position in trigger.process(ring):
+                self._emit(trigger.name, position)
+        self.cpu_seconds += time.perf_counter() - started
+        self.audio_seconds += len(samples) / ring.sample_rate
+
+    def _emit(self, name, position, detail=None):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            callbacks = list(self._callbacks)
+            if self._events.qsize() >= MAX_EVENTS:
+                try:
+                    self._events.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+            self._events.put((name, detail))
+        logging.debug(f"Wake trigger {name} at sample {position} {detail or ''}")
+        for callback in callbacks:
+            try:
+                callback(name, detail)
+            except Exception as e:
+                logging.error(f"Wake callback failed: {e}")
+
+    def wait(self, names=None, timeout=None):
+        """Block until one of ``names`` (default: any trigger) fires; returns (name, detail) or None."""
+        if not self.start():
+            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                name, detail = self._events.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if names is None or name in names:
+                return name, detail
+
+    def clear(self):
+        """Forget triggers that fired before now."""
+        while True:
+            try:
+                self._events.get_nowait()
+            except queue.Empty:
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "triggers": [trigger.name for trigger in self.triggers],
+                "counts": dict(self.counts),
+                "dropped": self.dropped,
+                "audio_s": round(self.audio_seconds, 1),
+                "cpu_share": round(self.cpu_seconds / self.audio_seconds, 5) if self.audio_seconds else 0.0,
+            }
+
+
+_wake_detector = None
+_wake_detector_lock = threading.Lock()
+
+def get_wake_detector() -> WakeDetector:
+    global _wake_detector
+    with _wake_detector_lock:
+        if _wake_detector is None:
+            _wake_detector = WakeDetector()
+        return _wake_detector
+
+def WaitForWakeWord(timeout=None):
+    """Block until a wake word is spotted or a double clap heard.
+
+    Returns the keyword ("clap" for claps), or None on timeout or without a
+    microphone. Only the keyword trigger's voice-activity stage runs on the
+    stream; short utterances are matched against locally enrolled
+    templates, so sleeping costs no recognizer calls. Until templates are
+    enrolled only claps wake (see get_wake_matcher).
+    """
+    detector = get_wake_detector()
+    trigger = detector.trigger(KeywordTrigger.name)
+    if trigger is None:
+        match = get_wake_matcher()     # Looked up on every sleep until templates are enrolled
+        if match is not None:
+            trigger = KeywordTrigger(match)
+            detector.add_trigger(trigger)
+    detector.clear()
+    if trigger is not None:
+        trigger.reset()
+        trigger.enabled = True
+    try:
+        event = detector.wait({KeywordTrigger.name, ClapTrigger.name}, timeout)
+        if event is None:
+            return None
+        return event[1] or event[0]
+    finally:
+        if trigger is not None:
+            trigger.enabled = False
+
+
+# ---------- Test harness over recorded clips ----------
+def LoadClips(directory=FIXTURE_DIR):
+    """(name, samples, rate, expected fire counts) for every WAV with a JSON label file.
+
+    ``clip.wav`` is labelled by ``clip.json``: {"expect": {"clap": 2}}; triggers
+    not listed must not fire.
+    """
+    clips = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        label_path = path[:-4] + ".json"
+        if not os.path.exists(label_path):
+            continue
+        with open(label_path, "r", encoding="utf-8") as f:
+            expect = json.load(f).get("expect", {})
+        samples, rate = ReadWav(path)
+        clips.append((os.path.basename(path), samples, rate, expect))
+    return clips
+
+def RunClip(samples, rate, triggers, chunk=1024):
+    """Feed a clip through ``triggers`` chunk by chunk, as the microphone would. Returns (fire counts, CPU seconds)."""
+    ring = AudioRing(2.0, rate)
+    counts = {trigger.name: 0 for trigger in triggers}
+    detector = WakeDetector(triggers, microphone=None)
+    detector.add_callback(lambda name, detail: counts.__setitem__(name, counts[name] + 1))
+    padded = np.concatenate([samples, np.zeros(rate, dtype=np.int16)])   # Let lookahead windows complete
+    for offset in range(0, len(padded), chunk):
+        block = padded[offset:offset + chunk]
+        ring.write(block)
+        detector.feed(block, ring)
+    return counts, detector.cpu_seconds
+
+def TestTriggers(clips, make_triggers=None):
+    """Per-clip results and totals: expected fires found, misses, false triggers, CPU share."""
+    make_triggers = make_triggers or (lambda rate: [ClapTrigger(sample_rate=rate), EnergyBurstTrigger(sample_rate=rate)])
+    rows, totals = [], {"expected": 0, "hits": 0, "misses": 0, "false": 0, "audio_s": 0.0, "cpu_s": 0.0}
+    for name, samples, rate, expect in clips:
+        counts, cpu = RunClip(samples, rate, make_triggers(rate))
+        for trigger, fired in counts.items():
+            wanted = int(expect.get(trigger, 0))
+            totals["expected"] += wanted
+            totals["hits"] += min(fired, wanted)
+            totals["misses"] += max(0, wanted - fired)
+            totals["false"] += max(0, fired - wanted)
+        rows.append((name, counts, expect))
+        totals["audio_s"] += len(samples) / rate
+        totals["cpu_s"] += cpu
+    totals["cpu_share"] = round(totals["cpu_s"] / totals["audio_s"], 5) if totals["audio_s"] else 0.0
+    return rows, totals
+
+
+if __name__ == "__main__":
+    # python -m Backend.WakeTriggers test [directory]  replays labelled clips through the triggers
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        directory = sys.argv[2] if len(sys.argv) > 2 else FIXTURE_DIR
+        clips = LoadClips(directory)
+        if not clips:
+            print(f"No labelled clips in {directory} (clip.wav + clip.json with {{\"expect\": {{\"clap\": 1}}}})")
+            sys.exit(1)
+        rows, totals = TestTriggers(clips)
+        for name, counts, expect in rows:
+            ok = all(counts[t] == int(expect.get(t, 0)) for t in counts)
+            print(f"{'ok ' if ok else 'BAD'} {name:30s} fired {counts}  expected {expect}")
+        print(f"hits {totals['hits']}/{totals['expected']}  misses {totals['misses']}  "
+              f"false triggers {totals['false']}  CPU {totals['cpu_share'] * 100:.3f}% of real time")
+        sys.exit(0 if totals["misses"] == 0 and totals["false"] == 0 else 1)
@@ -4,11 +4,13 @@ from Backend.Chatbot import ChatBot
 from Backend.RealtimeSearchEngine import RealtimeSearchEngine
 import Backend.Automation as Automation
 from Backend.ImageGeneration import GenerateImages
-import asyncio
+from Backend.Retry import BeginTurn
+from Backend.EventLoop import run_all
 
 def process_input(user_input):
     output_lines = []
     image_paths = []
+    BeginTurn()
     dmm_result = FirstLayerDMM(user_input)
     output_lines.append(f"Decision Model Output: {dmm_result}")
     if not dmm_result or not isinstance(dmm_result, list):
@@ -21,6 +23,9 @@ def process_input(user_input):
     is_realtime = any(item.startswith("realtime") for item in dmm_result)
     if is_command:
         commands = [item for item in dmm_result if not item.startswith("general") and not item.startswith("realtime")]
+        automation = [cmd for cmd in commands if not cmd.startswith("generate image")]
+        # Every automation command of the turn runs concurrently on the shared event loop
+        automation_results = iter(run_all([Automation.Automation([cmd]) for cmd in automation]) if automation else [])
         for cmd in commands:
             if cmd.startswith("generate image"):
                 prompt = cmd[len("generate image"):].strip(" ()")
@@ -37,11 +42,11 @@ def process_input(user_input):
                     output_lines.append("Image generation failed.")
             else:
                 output_lines.append(f"[Automation] Executing command: {cmd}")
-                try:
-                    result = asyncio.run(Automation.Automation([cmd]))
+                result = next(automation_results)
+                if isinstance(result, Exception):
+                    output_lines.append(f"Command error: {result}")
+                else:
                     output_lines.append("Command executed." if result else "Command failed.")
-                except Exception as e:
-                    output_lines.append(f"Command error: {e}")
     elif is_realtime:
         try:
             realtime_query = next(item[9:].strip() for item in dmm_result if item.startswith("realtime"))
@@ -8,7 +8,7 @@ from Frontend.GUI import (
     QueryModifier,
     GetAssistantStatus
 )
-from Backend.Model import FirstLayerDMM
+from Backend.Model import StreamDecisions
 from Backend.RealtimeSearchEngine import RealtimeSearchEngine
 from Backend.Automation import Automation
 from Backend.Navigation import (
@@ -18,19 +18,22 @@ from Backend.Navigation import (
 import pyautogui
 from Backend.SpeechToText import SpeechRecognition
 from Backend.Chatbot import ChatBot
-from Backend.TextToSpeech import TextToSpeech, play_audio_file
+from Backend.TextToSpeech import TextToSpeech, Speak, InterruptSpeech, IsOwnSpeech, play_audio_file
+from Backend.SpeechService import PRIORITY_LOW, PRIORITY_HIGH
+from Backend.WakeTriggers import get_wake_detector, WaitForWakeWord
+from Backend.KeywordSpotter import EnrolledKeywords, WakeWordRecognizer
 from Backend.ImageGeneration import GenerateImages
+from Backend.ChatLogStore import get_chat_store
+from Backend.Retry import BeginTurn
 from dotenv import dotenv_values
-from asyncio import run
+from Backend.EventLoop import submit
 from time import sleep, time, localtime
+from concurrent.futures import Future, wait
 import subprocess
 import threading
-import json
 import os
 import logging
 import sys
-import pyaudio
-import numpy as np
 
 # ===================== Logging and Environment =====================
 # Remove or comment out logging.basicConfig if it writes to a file
@@ -44,56 +47,26 @@ FUNCTIONS = ["open", "close", "play", "system", "content", "google search", "you
              "scroll", "swipe", "pdf", "youtube", "web", "zoom", "page", "home", "end", "next", "previous", "up", "down", 
              "enter", "escape", "tab", "backspace", "delete", "select", "copy", "paste", "cut", "undo", "redo", "save", 
              "find", "replace", "refresh", "fullscreen"]
+NAVIGATION_FUNCTIONS = ["scroll", "swipe", "pdf", "youtube", "web", "zoom", "page", "home", "end", "next", "previous",
+                        "up", "down", "enter", "escape", "tab", "backspace", "delete", "select", "copy", "paste",
+                        "cut", "undo", "redo", "save", "find", "replace", "refresh", "fullscreen"]
+AUTOMATION_FUNCTIONS = ["open", "close", "play", "system", "content", "google search", "youtube search", "write", "create presentation"]
 os.makedirs("Data", exist_ok=True)
 os.makedirs(os.path.join("Frontend", "Files"), exist_ok=True)
 last_interaction_time = time()
 
 # ===================== Utility Functions =====================
-def detect_clap():
-    """Detect a clap sound using the microphone."""
-    CHUNK = 1024
-    RATE = 44100
-    THRESHOLD = 3000
-    try:
-        p = pyaudio.PyAudio()
-        stream = p.open(format=pyaudio.paFloat32, channels=1, rate=RATE, input=True, frames_per_buffer=CHUNK)
-        data = np.frombuffer(stream.read(CHUNK, exception_on_overflow=False), dtype=np.float32)
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-        amplitude = np.abs(np.max(data))
-        logging.debug(f"Clap detection: Amplitude = {amplitude}, Threshold = {THRESHOLD}")
-        return amplitude > THRESHOLD
-    except Exception as e:
-        logging.error(f"Error in clap detection: {e}")
-        return False
-
 def show_default_chat_if_no_chats():
     """Show default chat if no previous chats exist."""
-    chat_log_path = r"Data\ChatLog.json"
-    try:
-        with open(chat_log_path, "r", encoding='utf-8') as file:
-            if len(file.read()) < 5:
-                with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-                    file.write("")
-                with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-                    file.write(DEFAULT_MESSAGE)
-    except FileNotFoundError:
-        with open(chat_log_path, "w", encoding='utf-8') as file:
-            json.dump([], file)
+    if len(get_chat_store()) == 0:
         with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
             file.write("")
         with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
             file.write(DEFAULT_MESSAGE)
 
 def read_chat_log_json():
-    """Read chat log from JSON file."""
-    chat_log_path = r"Data\ChatLog.json"
-    try:
-        with open(chat_log_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    """Read chat log from the shared chat log store."""
+    return get_chat_store().messages()
 
 def chat_log_integration():
     """Integrate chat log for display."""
@@ -154,6 +127,9 @@ def initial_execution():
     chat_log_integration()
     show_chats_on_gui()
     greet_user_by_time()
+    # Wake triggers run on the microphone stream from now on, so sleep mode finds them listening
+    if not get_wake_detector().start():
+        logging.warning("Wake triggers unavailable: no microphone")
     SetAssistantStatus("Available... ✅")
     last_interaction_time = time()
 
@@ -426,6 +402,23 @@ def execute_navigation_commands(commands):
 
     return results
 
+def start_job(target, after=None):
+    """Run a task on a daemon thread and return a future for its result.
+
+    With ``after`` (a future), the task waits for that job to finish first,
+    so jobs chained this way run one after another in order.
+    """
+    future = Future()
+    def runner():
+        if after is not None:
+            wait([after])
+        try:
+            future.set_result(target())
+        except Exception as e:
+            future.set_exception(e)
+    threading.Thread(target=runner, daemon=True).start()
+    return future
+
 def main_execution():
     """Main user interaction and task execution loop."""
     global last_interaction_time
@@ -433,10 +426,35 @@ def main_execution():
     query = SpeechRecognition()
     if not query or not query.strip():
         return  # Do nothing if no user input
+    if IsOwnSpeech(query):
+        logging.info(f"Ignored the assistant's own speech picked up by the microphone: {query}")
+        return  # Not a barge-in: the answer keeps playing
     last_interaction_time = time()
+    InterruptSpeech()  # Barge-in: a new request stops the previous answer
+    BeginTurn()
     ShowTextTOScreen(f"{USERNAME}: {query} 😄")
     SetAssistantStatus("Thinking... 🤔")
-    decision = FirstLayerDMM(query)
+
+    # Start each navigation/automation task as soon as the decision model emits it.
+    # Tasks are chained so they still run one at a time, in the order they were asked for.
+    decision = []
+    navigation_jobs = []
+    automation_jobs = []
+    previous = None
+    for task in StreamDecisions(query):
+        decision.append(task)
+        if "generate image" in task:
+            continue
+        if any(task.startswith(nav) for nav in NAVIGATION_FUNCTIONS):
+            if not navigation_jobs:
+                SetAssistantStatus("Navigating... 🧭")
+            previous = start_job(lambda t=task: all(execute_navigation_commands([t])), after=previous)
+            navigation_jobs.append(previous)
+        elif any(task.startswith(func) for func in AUTOMATION_FUNCTIONS):
+            if not automation_jobs:
+                SetAssistantStatus("Executing... 🚀")
+            previous = start_job(lambda t=task: submit(Automation([t])).result(), after=previous)
+            automation_jobs.append(previous)
     logging.info(f"Decision: {decision}")
     image_execution = any("generate image" in q for q in decision)
     task_execution = any(any(q.startswith(func) for func in FUNCTIONS) for q in decision)
@@ -444,7 +462,7 @@ def main_execution():
     # Image generation
     if image_execution:
         ShowTextTOScreen(f"{ASSISTANT_NAME} 🤖: Generating image...")
-        threading.Thread(target=TextToSpeech, args=("Generating image",), daemon=True).start()
+        Speak("Generating image", PRIORITY_LOW)
         with open(r"Frontend\Files\ImageGeneration.data", 'w') as file:
             file.write(f"{query}, True")
         try:
@@ -459,64 +477,62 @@ def main_execution():
             sleep(1)
             SetAssistantStatus("Available... ✅")
             ShowTextTOScreen(f"{ASSISTANT_NAME}: Image generated! 🎉")
-            threading.Thread(target=TextToSpeech, args=("Image generated!",), daemon=True).start()
+            Speak("Image generated!")
         except Exception as e:
             logging.error(f"Error starting ImageGeneration.py: {e}")
             ShowTextTOScreen(f"{ASSISTANT_NAME}: Image generation failed. Retry? 😞")
-            threading.Thread(target=TextToSpeech, args=("Image generation failed. Please retry.",), daemon=True).start()
-        return True
-    # Navigation execution
-    navigation_commands = [q for q in decision if any(q.startswith(nav) for nav in [
-        "scroll", "swipe", "pdf", "youtube", "web", "zoom", "page", "home", "end", "next", "previous", 
-        "up", "down", "enter", "escape", "tab", "backspace", "delete", "select", "copy", "paste", 
-        "cut", "undo", "redo", "save", "find", "replace", "refresh", "fullscreen"
-    ])]
-    if navigation_commands:
-        SetAssistantStatus("Navigating... 🧭")
-        def run_navigation():
+            Speak("Image generation failed. Please retry.")
+        if not (navigation_jobs or automation_jobs):
+            return True
+    # Navigation and task execution (already running; report once every task finishes)
+    if navigation_jobs or automation_jobs:
+        def report_jobs():
+            if navigation_jobs:
+                report_navigation()
+            if automation_jobs:
+                report_automation()
+
+        def report_navigation():
             try:
-                success = execute_navigation_commands(navigation_commands)
+                success = [job.result() for job in navigation_jobs]
                 SetAssistantStatus("Available... ✅")
                 if success and all(success):
                     ShowTextTOScreen(f"{ASSISTANT_NAME}: Navigation completed! 🎉")
-                    threading.Thread(target=TextToSpeech, args=("Navigation completed!",), daemon=True).start()
+                    Speak("Navigation completed!")
                 else:
                     ShowTextTOScreen(f"{ASSISTANT_NAME}: Navigation completed with some issues. 😞")
-                    threading.Thread(target=TextToSpeech, args=("Navigation completed with some issues.",), daemon=True).start()
+                    Speak("Navigation completed with some issues.")
             except Exception as e:
                 logging.error(f"Navigation execution error: {e}")
                 SetAssistantStatus("Available... ✅")
                 ShowTextTOScreen(f"{ASSISTANT_NAME}: Navigation failed. Please try again. 😞")
-                threading.Thread(target=TextToSpeech, args=("Navigation failed. Please try again.",), daemon=True).start()
-        threading.Thread(target=run_navigation, daemon=True).start()
-        return True
-    
-    # Task execution (non-navigation)
-    automation_commands = [q for q in decision if any(q.startswith(func) for func in ["open", "close", "play", "system", "content", "google search", "youtube search", "write", "create presentation"])]
-    if automation_commands:
-        SetAssistantStatus("Executing... 🚀")
-        def run_automation():
-            from asyncio import run as asyncio_run
-            success = asyncio_run(Automation(automation_commands))
+                Speak("Navigation failed. Please try again.")
+
+        def report_automation():
+            try:
+                success = all(job.result() for job in automation_jobs)
+            except Exception as e:
+                logging.error(f"Automation execution error: {e}")
+                success = False
             SetAssistantStatus("Available... ✅")
             if success:
                 ShowTextTOScreen(f"{ASSISTANT_NAME}: Command completed! 🎉")
-                threading.Thread(target=TextToSpeech, args=("Command completed!",), daemon=True).start()
+                Speak("Command completed!")
             else:
                 ShowTextTOScreen(f"{ASSISTANT_NAME}: Command failed. Try again? 😞")
-                threading.Thread(target=TextToSpeech, args=("Command failed. Please try again.",), daemon=True).start()
-        threading.Thread(target=run_automation, daemon=True).start()
+                Speak("Command failed. Please try again.")
+        threading.Thread(target=report_jobs, daemon=True).start()
         return True
     # Realtime/general queries
     if any(q.startswith("realtime") for q in decision):
         SetAssistantStatus("Searching... 🔍")
         ShowTextTOScreen(f"{ASSISTANT_NAME} 🤖: Searching for your query... 🔍")
-        threading.Thread(target=TextToSpeech, args=("Searching for your query",), daemon=True).start()
+        Speak("Searching for your query", PRIORITY_LOW)
         def run_realtime():
             answer = RealtimeSearchEngine(QueryModifier(merged_query))
             ShowTextTOScreen(f"{ASSISTANT_NAME}: {answer} 🌐")
             SetAssistantStatus("Answering... 💬")
-            threading.Thread(target=TextToSpeech, args=(answer,), daemon=True).start()
+            Speak(answer, PRIORITY_HIGH)
         threading.Thread(target=run_realtime, daemon=True).start()
         return True
     for q in decision:
@@ -526,7 +542,7 @@ def main_execution():
                 answer = ChatBot(QueryModifier(q.replace("general ", "")))
                 ShowTextTOScreen(f"{ASSISTANT_NAME}: {answer} 🌟")
                 SetAssistantStatus("Answering... 💬")
-                threading.Thread(target=TextToSpeech, args=(answer,), daemon=True).start()
+                Speak(answer, PRIORITY_HIGH)
             threading.Thread(target=run_general, daemon=True).start()
             return True
         elif any(word in q.lower() for word in ["exit", "bye", "goodbye"]):
@@ -534,18 +550,29 @@ def main_execution():
             return True
 
 def sleep_assistant():
-    """Put the assistant into sleep state until user says 'wake up' or 'get up'."""
+    """Put the assistant into sleep state until user says 'wake up' or 'get up'.
+
+    The wake words (or a double clap) are spotted locally on the shared
+    microphone stream (Backend/KeywordSpotter.py, Backend/WakeTriggers.py);
+    full speech recognition resumes only after a hit.
+    """
     SetAssistantStatus("Sleeping... 😴")
-    ShowTextTOScreen(f"{ASSISTANT_NAME} 🤖: I am now sleeping. Say 'wake up' or 'get up' to continue.")
-    TextToSpeech("I am now sleeping. Say wake up or get up to continue.")
+    if EnrolledKeywords() or WakeWordRecognizer:
+        ShowTextTOScreen(f"{ASSISTANT_NAME} 🤖: I am now sleeping. Say 'wake up' or 'get up' (or clap twice) to continue.")
+        TextToSpeech("I am now sleeping. Say wake up or get up to continue.")
+    else:
+        ShowTextTOScreen(f"{ASSISTANT_NAME} 🤖: I am now sleeping. Clap twice to wake me up. "
+                         "To wake me by voice, record the wake words once: python -m Backend.KeywordSpotter enroll \"wake up\"")
+        TextToSpeech("I am now sleeping. Clap twice to wake me up.")
     while True:
-        query = SpeechRecognition()
-        if query and any(phrase in query.lower() for phrase in ["wake up", "get up"]):
+        keyword = WaitForWakeWord()
+        if keyword:
+            logging.info(f"Woken by '{keyword}'")
             SetAssistantStatus("Available... ✅")
             ShowTextTOScreen(f"{ASSISTANT_NAME} 🤖: I'm back and ready to help!")
             TextToSpeech("I'm back and ready to help!")
             break
-        sleep(0.5)
+        sleep(0.5)  # No microphone: try again shortly
 
 # ===================== Threaded Main Loop =====================
 def first_thread():
@@ -0,0 +1,58 @@
+import os
+import time
+from Backend.Cache import NormalizeQuery, PersistentLRUCache, ResponseCache, SearchCache
+
+
+def test_normalize_query():
+    assert NormalizeQuery("  What's the CAPITAL of France?? ") == "what is the capital of france"
+    assert NormalizeQuery("Jarvis please tell me a joke", drop_fillers=True) == "a joke"
+
+
+def test_lru_evicts_least_recently_used_and_persists(tmp_path):
+    path = os.path.join(tmp_path, "cache.json")
+    cache = PersistentLRUCache(path, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    cache.save()
+    assert PersistentLRUCache(path, max_entries=2).get("c") == 3
+
+
+def test_entries_expire_after_their_ttl(tmp_path):
+    cache = PersistentLRUCache(os.path.join(tmp_path, "cache.json"), ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=3600)
+    for _, entry in cache.entries():
+        entry["time"] -= 120
+    assert cache.get("a") is None and cache.get("b") == 2
+
+
+def test_similarity_vectors_follow_lru_evictions(tmp_path):
+    cache = ResponseCache(os.path.join(tmp_path, "responses.json"), max_entries=3, similarity_threshold=0.8)
+    for number in range(20):
+        cache.put(f"explain the history of country number {number}", f"answer {number}")
+        cache.get(f"explain history of country number {number}")
+    assert set(cache._vectors) == {key for key, _ in cache.store.entries()}
+    assert cache.get("explain history of country number 19") == "answer 19"
+    assert cache.similar_hits >= 1
+
+
+def test_news_is_not_served_stale_for_long(tmp_path):
+    cache = SearchCache(os.path.join(tmp_path, "search.json"))
+    calls = []
+    fetch = lambda query: calls.append(query) or [query]
+    cache.get("latest news headlines", fetch)
+    entry = cache.store.get_entry(NormalizeQuery("latest news headlines", drop_fillers=True))
+    entry["time"] -= cache.ttls["news"] + cache.stale_windows["news"] + 1
+    cache.get("latest news headlines", fetch)
+    assert cache.misses == 2 and len(calls) == 2
+
+
+def test_closest_answer_for_degraded_mode(tmp_path):
+    cache = ResponseCache(os.path.join(tmp_path, "responses.json"))
+    cache.put("what is the capital of france", "Paris.")
+    assert cache.get("capital of france") is None           # No fuzzy hits unless configured
+    assert cache.closest("what's the capital city of france") == "Paris."
+    assert cache.closest("how do volcanoes form") is None
@@ -0,0 +1,32 @@
+import os
+import pytest
+
+pytest.importorskip("groq")
+pytest.importorskip("dotenv")
+os.environ.setdefault("GROQ_API_KEY", "test")    # Used when .env has no GroqAPIKey
+
+from Backend import Chatbot
+from Backend.Retry import GetBreaker
+
+
+@pytest.fixture
+def open_groq_circuit():
+    breaker = GetBreaker("groq")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    yield
+    breaker.record_success()
+
+
+def test_open_circuit_answers_from_similar_cached_question(tmp_path, monkeypatch, open_groq_circuit):
+    cache = Chatbot.ResponseCache(str(tmp_path / "responses.json"))
+    cache.put("what is the capital of france", "Paris.")
+    monkeypatch.setattr(Chatbot, "response_cache", cache)
+    monkeypatch.setattr(Chatbot.client.chat.completions, "create",
+                        lambda **kwargs: pytest.fail("Groq was called with its circuit open"))
+    assert "Paris." in Chatbot.ChatBot("tell me the capital city of france")
+
+
+def test_open_circuit_without_cached_answer_gives_offline_reply(tmp_path, monkeypatch, open_groq_circuit):
+    monkeypatch.setattr(Chatbot, "response_cache", Chatbot.ResponseCache(str(tmp_path / "responses.json")))
+    assert Chatbot.ChatBot("how do volcanoes form") == Chatbot.OFFLINE_ANSWER
@@ -0,0 +1,31 @@
+from Backend.ContextWindow import CountTokens, CountMessageTokens, MESSAGE_OVERHEAD_TOKENS
+
+# Token counts from a 131k-vocabulary BPE tokenizer (Mistral's Tekken, the same
+# tiktoken-style family as Llama 3's)
+TOKENIZER_SAMPLES = [
+    ("Hello JARVIS, what's the weather like in New York today?", 16),
+    ("Open YouTube and search for relaxing piano music.", 10),
+    ("The Industrial Revolution began in Great Britain in the late 18th century and transformed "
+     "manufacturing, transportation and communication.", 23),
+    ("Photosynthesis converts light energy into chemical energy stored in glucose molecules.", 13),
+    ("Set a reminder for 7:30 pm tomorrow: call mom, buy groceries (milk, eggs, bread).", 27),
+    ("def fibonacci(n):\n    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)", 29),
+]
+
+
+def test_estimate_tracks_a_real_tokenizer():
+    estimated = sum(CountTokens(text) for text, _ in TOKENIZER_SAMPLES)
+    actual = sum(tokens for _, tokens in TOKENIZER_SAMPLES)
+    # Budgets are safer slightly high than low
+    assert actual <= estimated <= 1.3 * actual
+
+
+def test_long_words_count_as_several_pieces():
+    assert CountTokens("") == 0
+    assert CountTokens("word") == 1
+    assert CountTokens("abcdefghijklm") == 3     # 13 characters: 1 + 12 // 6
+
+
+def test_message_overhead():
+    messages = [{"role": "user", "content": "hello there"}, {"role": "assistant", "content": "hi"}]
+    assert CountMessageTokens(messages) == 3 + 2 * MESSAGE_OVERHEAD_TOKENS
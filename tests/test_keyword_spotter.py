@@ -0,0 +1,54 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Backend.KeywordSpotter import (Features, DTWDistance, BenchmarkSpotter, KeywordSpotter, SaveWav,
+                                    EnrolledKeywords, get_wake_matcher, FIXTURE_DIR, CEPSTRA)
+from Backend.VoiceActivity import ReadWav
+
+
+def Clip(*parts):
+    return ReadWav(os.path.join(FIXTURE_DIR, *parts))[0]
+
+
+def test_features_trim_the_silence_around_the_word():
+    samples = Clip("wake_up", "01.wav")
+    padded = np.concatenate([np.zeros(8000, dtype=np.int16), samples, np.zeros(8000, dtype=np.int16)])
+    features = Features(samples)
+    assert features.shape[1] == CEPSTRA
+    assert len(features) < len(samples) / 160 * 0.7     # 10 ms frames; the pauses around the word are cut
+    assert len(Features(padded)) == len(features)
+    assert np.allclose(features.mean(axis=0), 0.0, atol=1e-4)
+    assert Features(np.zeros(100, dtype=np.int16)).shape == (0, CEPSTRA)
+
+
+def test_dtw_distance():
+    a, b = Features(Clip("wake_up", "01.wav")), Features(Clip("wake_up", "02.wav"))
+    other = Features(Clip("get_up", "01.wav"))
+    assert DTWDistance(a, a) == 0.0
+    assert DTWDistance(a, b) < DTWDistance(a, other)
+    assert DTWDistance(a, a[: len(a) // 3]) == np.inf     # Beyond 2x speaking rate
+    assert DTWDistance(a, a[:0]) == np.inf
+
+
+def test_benchmark_on_the_fixtures():
+    report = BenchmarkSpotter()
+    assert report["keywords"] == {"get up": 3, "wake up": 3}
+    assert report["positives"] == 6 and report["negatives"] == 7
+    assert report["miss_rate"] == 0.0 and report["wrong_keyword"] == 0
+    assert report["false_wake_rate"] == 0.0
+
+
+def test_without_templates_sleep_mode_stays_offline(tmp_path):
+    assert EnrolledKeywords(str(tmp_path)) == []
+    assert get_wake_matcher(str(tmp_path), recognizer=False) is None
+    assert get_wake_matcher(str(tmp_path), recognizer=True) is not None     # Explicit opt-in only
+
+    for name in ["01.wav", "02.wav", "03.wav"]:
+        SaveWav(str(tmp_path / "wake_up" / name), Clip("wake_up", name))
+    assert EnrolledKeywords(str(tmp_path)) == ["wake up"]
+    match = get_wake_matcher(str(tmp_path), recognizer=False)
+    assert match(Clip("wake_up", "05.wav")) == "wake up"
+    assert match(Clip("none", "01_hello.wav")) is None
+    assert KeywordSpotter().load(str(tmp_path)).stats()["keywords"] == {"wake up": 3}
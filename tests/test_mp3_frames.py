@@ -0,0 +1,82 @@
+from Backend.MP3Frames import ParseFrameHeader, ParseSideInfo, MP3Segmenter, RingBuffer, DECODER_WARMUP_FRAMES
+
+# MPEG-2 Layer III, no CRC, 48 kbit/s, 24 kHz, mono: 144-byte frames of 576 samples
+HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+FRAME_BYTES = 144
+FRAME_SECONDS = 576 / 24000
+
+
+def Frame(index, main_data_begin=0):
+    """Synthetic frame: header, side info starting with main_data_begin, payload marked with ``index``."""
+    side_info = bytes([main_data_begin]) + bytes(8)
+    return HEADER + side_info + bytes([index]) * (FRAME_BYTES - len(HEADER) - len(side_info))
+
+
+def test_frame_header():
+    assert ParseFrameHeader(HEADER) == (FRAME_BYTES, FRAME_SECONDS)
+    padded = bytes([0xFF, 0xF3, 0x66, 0xC0])
+    assert ParseFrameHeader(padded) == (FRAME_BYTES + 1, FRAME_SECONDS)
+    mpeg1 = bytes([0xFF, 0xFB, 0x90, 0x64])      # 128 kbit/s, 44.1 kHz, stereo
+    assert ParseFrameHeader(mpeg1) == (417, 1152 / 44100)
+
+
+def test_invalid_headers_are_rejected():
+    assert ParseFrameHeader(b"ID3\x04") is None
+    assert ParseFrameHeader(bytes([0xFF, 0xF3, 0xF4, 0xC0])) is None    # Bitrate index 15
+    assert ParseFrameHeader(bytes([0xFF, 0xF5, 0x64, 0xC0])) is None    # Layer II
+    assert ParseFrameHeader(HEADER[:3]) is None
+
+
+def test_side_info():
+    assert ParseSideInfo(Frame(0, main_data_begin=40)) == (40, FRAME_BYTES - 4 - 9)
+
+
+def test_ring_buffer_wraps_and_grows():
+    ring = RingBuffer(capacity=8)
+    ring.write(b"abcdef")
+    assert ring.read(4) == b"abcd"
+    ring.write(b"ghijk")                    # Wraps around the end
+    assert ring.peek(3, offset=2) == b"ghi"
+    ring.write(b"lmnopqrstu")               # Grows past the capacity
+    assert ring.read(len(ring)) == b"efghijklmnopqrstu"
+    assert len(ring) == 0
+
+
+def test_segmenter_cuts_whole_frames_and_resyncs():
+    segmenter = MP3Segmenter()
+    stream = b"ID3junk" + Frame(1) + Frame(2) + Frame(3)
+    segmenter.write(stream[:-10])
+    assert segmenter.seconds_ready == 2 * FRAME_SECONDS
+    data, skip = segmenter.take()
+    assert (data, skip) == (Frame(1) + Frame(2), 0.0)
+    assert segmenter.seconds_ready == 0.0
+    segmenter.write(stream[-10:])
+    assert segmenter.take()[0].endswith(Frame(3))
+
+
+def test_segments_are_prefixed_with_the_frames_they_depend_on():
+    segmenter = MP3Segmenter()
+    segmenter.write(b"".join(Frame(i) for i in range(1, 5)))
+    segmenter.take()
+
+    # Self-contained warm-up frames: only DECODER_WARMUP_FRAMES are carried over
+    segmenter.write(Frame(5) + Frame(6))
+    data, skip = segmenter.take()
+    assert data == Frame(3) + Frame(4) + Frame(5) + Frame(6)
+    assert skip == DECODER_WARMUP_FRAMES * FRAME_SECONDS
+
+    # The earliest warm-up frame reaches back into the reservoir of the two frames before it
+    segmenter = MP3Segmenter()
+    frames = [Frame(1), Frame(2), Frame(3), Frame(4, main_data_begin=200), Frame(5)]
+    segmenter.write(b"".join(frames))
+    segmenter.take()
+    segmenter.write(Frame(6) + Frame(7))
+    data, skip = segmenter.take()
+    assert data == b"".join(frames[1:]) + Frame(6) + Frame(7)
+    assert abs(skip - 4 * FRAME_SECONDS) < 1e-9
+
+
+def test_corrupt_byte_mid_stream_is_dropped():
+    segmenter = MP3Segmenter()
+    segmenter.write(Frame(1) + b"\x00" + Frame(2))
+    assert segmenter.take()[0] == Frame(1) + Frame(2)
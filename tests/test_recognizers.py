@@ -0,0 +1,55 @@
+import time
+import pytest
+
+pytest.importorskip("speech_recognition")
+
+from Backend import Recognizers
+from Backend.Recognizers import RecognizerRace
+
+
+def Backend(calls, name, delay, result):
+    def recognize(audio, language):
+        calls.append(name)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return recognize
+
+
+def Race(monkeypatch, fast, slow, grace=0.3):
+    calls = []
+    monkeypatch.setitem(Recognizers.BACKENDS, "fast", Backend(calls, "fast", *fast))
+    monkeypatch.setitem(Recognizers.BACKENDS, "slow", Backend(calls, "slow", *slow))
+    return RecognizerRace(["fast", "slow"], deadline=2.0, grace=grace), calls
+
+
+def test_a_quick_confident_result_leaves_the_hedge_unstarted(monkeypatch):
+    race, calls = Race(monkeypatch, (0.05, ("open notepad", 0.9)), (0.0, ("open note pad", 0.4)))
+    assert race.recognize(None) == "open notepad"
+    time.sleep(0.4)
+    assert calls == ["fast"]
+    assert race.stats()["started"] == {"fast": 1, "slow": 0}
+
+
+def test_the_hedge_starts_after_the_grace_delay(monkeypatch):
+    race, calls = Race(monkeypatch, (1.5, ("open notepad", 0.9)), (0.0, ("open note pad", 0.4)))
+    started = time.perf_counter()
+    assert race.recognize(None) == "open notepad"
+    assert calls == ["fast", "slow"]
+    assert time.perf_counter() - started >= 1.5
+
+
+def test_the_hedge_starts_at_once_when_the_first_backend_fails(monkeypatch):
+    failure = Recognizers.sr.RequestError("offline")
+    race, calls = Race(monkeypatch, (0.0, failure), (0.0, ("open note pad", 0.4)), grace=10.0)
+    started = time.perf_counter()
+    assert race.recognize(None) == "open note pad"
+    assert time.perf_counter() - started < 1.0
+    assert race.stats()["wins"] == {"fast": 0, "slow": 1}
+
+
+def test_an_unsure_first_result_is_compared_with_the_hedge(monkeypatch):
+    race, calls = Race(monkeypatch, (0.0, ("open no tepad", 0.3)), (0.0, ("open note pad", 0.4)), grace=10.0)
+    assert race.recognize(None) == "open note pad"
+    assert calls == ["fast", "slow"]
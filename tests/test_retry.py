@@ -0,0 +1,56 @@
+import time
+import pytest
+from Backend.Retry import (CallWithRetry, CircuitBreaker, CircuitOpenError, GetBreaker, RetryPolicy,
+                           RetryableResult, RetryMetrics)
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay=0.0)
+
+
+def open_circuit(provider):
+    breaker = GetBreaker(provider)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_open_circuit_routes_to_fallback_without_calling_provider():
+    open_circuit("test-open")
+    calls = []
+    result = CallWithRetry("test-open", lambda: calls.append(1), policy=NO_WAIT, fallback=lambda: "offline")
+    assert result == "offline" and calls == []
+    metrics = RetryMetrics()["test-open"]
+    assert metrics["short_circuits"] == 1 and metrics["fallbacks"] == 1
+
+
+def test_open_circuit_without_fallback_raises():
+    open_circuit("test-raise")
+    with pytest.raises(CircuitOpenError):
+        CallWithRetry("test-raise", lambda: "answer", policy=NO_WAIT)
+
+
+def test_retries_then_succeeds():
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return "answer"
+    assert CallWithRetry("test-flaky", flaky, policy=NO_WAIT) == "answer"
+    assert GetBreaker("test-flaky").state == "closed"
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker("probe", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert [breaker.allow() for _ in range(3)] == [True, False, False]
+    breaker.record_success()
+    assert breaker.allow() and breaker.state == "closed"
+
+
+def test_unusable_answers_do_not_open_the_circuit():
+    def echo():
+        raise RetryableResult("echoed placeholder")
+    assert CallWithRetry("test-echo", echo, policy=NO_WAIT, fallback=lambda: "local") == "local"
+    assert GetBreaker("test-echo").state == "closed"
@@ -0,0 +1,30 @@
+from Backend import Sentences
+from Backend.Sentences import SplitSentences, PrepareSentences, LONG_TEXT_RESPONSES
+
+
+def test_short_pieces_are_joined_to_the_next_sentence():
+    text = "Dr. Smith arrived at noon. He brought the reports!\nAll of them were signed?"
+    assert SplitSentences(text) == [
+        "Dr. Smith arrived at noon.",
+        "He brought the reports!",
+        "All of them were signed?",
+    ]
+
+
+def test_a_short_tail_is_kept():
+    assert SplitSentences("This sentence is long enough. Ok.") == ["This sentence is long enough.", "Ok."]
+    assert SplitSentences("  \n ") == []
+
+
+def test_long_answers_are_cut_to_two_sentences_and_a_pointer(monkeypatch):
+    monkeypatch.setattr(Sentences.random, "choice", lambda options: options[0])
+    text = " ".join(f"Sentence number {i} is here to make this answer long." for i in range(6))
+    sentences = PrepareSentences(text)
+    assert sentences == SplitSentences(text)[:2] + [LONG_TEXT_RESPONSES[0]]
+    assert PrepareSentences(text, full=True) == SplitSentences(text)
+
+
+def test_short_answers_are_spoken_whole():
+    text = "The first sentence is here. The second one too. A third. And a fourth one. Fifth!"
+    assert len(text) < 250
+    assert PrepareSentences(text) == SplitSentences(text)
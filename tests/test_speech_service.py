@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+from Backend.SpeechService import SpeechService, PRIORITY_URGENT, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+
+def Recorder(gate=None, started=None):
+    spoken = []
+
+    async def speak(text, stop_callback, full):
+        if gate is not None and text == "first":
+            started.set()
+            await asyncio.get_running_loop().run_in_executor(None, gate.wait, 5)
+        spoken.append(text)
+        return not stop_callback()
+
+    return spoken, speak
+
+
+def test_queued_speech_is_spoken_by_priority():
+    gate, started = threading.Event(), threading.Event()
+    spoken, speak = Recorder(gate, started)
+    service = SpeechService(speak)
+    first = service.say("first")
+    assert started.wait(5)
+    requests = [
+        service.say("progress", PRIORITY_LOW),
+        service.say("done", PRIORITY_NORMAL),
+        service.say("answer", PRIORITY_HIGH),
+        service.say("also done", PRIORITY_NORMAL),
+    ]
+    gate.set()
+    assert first.wait(5)
+    assert all(request.wait(5) for request in requests)
+    assert spoken == ["first", "answer", "done", "also done", "progress"]
+    assert service.stats()["spoken"] == 5
+    service.shutdown()
+
+
+def test_repeats_within_the_window_are_dropped():
+    spoken, speak = Recorder()
+    service = SpeechService(speak, dedupe_window=60)
+    first = service.say("Command completed!")
+    assert service.say("  Command   completed! ") is first
+    assert first.wait(5)
+    assert service.say("Command completed!") is first
+    assert service.duplicates == 2
+    assert spoken == ["Command completed!"]
+
+    service.dedupe_window = 0
+    assert service.say("Command completed!").wait(5)
+    assert spoken == ["Command completed!"] * 2
+    service.shutdown()
+
+
+def test_barge_in_drops_less_urgent_speech():
+    gate, started = threading.Event(), threading.Event()
+    spoken, speak = Recorder(gate, started)
+    service = SpeechService(speak)
+    first = service.say("first")
+    assert started.wait(5)
+    chatter = service.say("progress", PRIORITY_LOW)
+    alert = service.say("alert", PRIORITY_URGENT, interrupt=True)
+    gate.set()
+    assert alert.wait(5)
+    assert first.wait(5) is False and chatter.wait(5) is False
+    assert spoken == ["first", "alert"]
+    service.shutdown()
+
+
+def test_own_speech_picked_up_by_the_microphone_is_an_echo():
+    gate, started = threading.Event(), threading.Event()
+    spoken, speak = Recorder(gate, started)
+    service = SpeechService(speak)
+    first = service.say("first")
+    assert started.wait(5)
+    service.say("Paris is the capital of France, sir.", PRIORITY_HIGH)
+    assert not service.is_echo("Paris is the capital")      # Queued, not played yet
+    assert service.is_echo("First.")
+
+    gate.set()
+    assert first.wait(5)
+    service.say("stop").wait(5)
+    assert service.is_echo("paris is the capital of")
+    assert not service.is_echo("stop talking")
+    assert not service.is_echo("what is the capital of Spain")
+    assert not service.is_echo("paris is the capital of", window=0)
+    assert service.stats()["echoes"] == 2
+    service.shutdown()
@@ -0,0 +1,67 @@
+import os
+import asyncio
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("edge_tts")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from Backend import TextToSpeech as tts
+from Backend.TTSCache import TTSCache, AudioKey
+
+
+def test_prewarmed_sentences_are_what_playback_looks_up(tmp_path, monkeypatch):
+    cache = TTSCache(directory=str(tmp_path))
+    warmed, looked_up = set(), set()
+
+    async def synthesize(text, voice=tts.AssistantVoice):
+        warmed.add(AudioKey(text, voice, tts.PITCH, tts.RATE))
+        return f"audio:{text}".encode()
+
+    def get(text, voice, pitch, rate):
+        looked_up.add(AudioKey(text, voice, pitch, rate))
+        return TTSCache.get(cache, text, voice, pitch, rate)
+
+    async def play(audio, stop_callback=None):
+        return True
+
+    def no_synthesis(*args, **kwargs):
+        raise AssertionError("prewarmed phrase was synthesized during playback")
+
+    monkeypatch.setattr(tts, "audio_cache", cache)
+    monkeypatch.setattr(tts, "Synthesize", synthesize)
+    monkeypatch.setattr(tts, "PlayBytes", play)
+    monkeypatch.setattr(cache, "get", get)
+    asyncio.run(tts.PrewarmCache())
+    looked_up.clear()
+    monkeypatch.setattr(tts, "Synthesize", no_synthesis)
+    monkeypatch.setattr(tts.edge_tts, "Communicate", no_synthesis)
+
+    for phrase in tts.STATIC_PHRASES:
+        assert asyncio.run(tts.SpeakSentences(tts.PrepareSentences(phrase)))
+    assert warmed and warmed <= looked_up
+
+
+def test_a_failing_sentence_is_skipped_wherever_it_is(monkeypatch):
+    played = []
+
+    async def stream(text, voice=None, stop_callback=None):
+        if text == "first":
+            raise ConnectionError("stream dropped")
+        played.append(text)
+        return True
+
+    async def synthesize(text, voice=None):
+        return text.encode()
+
+    async def play(audio, stop_callback=None):
+        if audio == b"second":
+            raise RuntimeError("cannot decode")
+        played.append(audio.decode())
+        return True
+
+    monkeypatch.setattr(tts, "SpeakStreaming", stream)
+    monkeypatch.setattr(tts, "SynthesizeCached", synthesize)
+    monkeypatch.setattr(tts, "PlayBytes", play)
+    assert asyncio.run(tts.SpeakSentences(["first", "second", "third"]))
+    assert played == ["third"]
@@ -0,0 +1,66 @@
+import os
+import time
+
+from Backend.TTSCache import TTSCache, AudioKey
+
+VOICE = ("en-US-JennyNeural", "-5Hz", "+15%")
+
+
+def test_least_recently_used_files_are_evicted_first(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), max_bytes=250, memory_bytes=0)
+    cache.put("one", *VOICE, b"1" * 100)
+    time.sleep(0.01)
+    cache.put("two", *VOICE, b"2" * 100)
+    time.sleep(0.01)
+    assert cache.get("one", *VOICE) == b"1" * 100     # "two" is now the least recently used
+    cache.put("three", *VOICE, b"3" * 100)
+
+    assert cache.get("two", *VOICE) is None
+    assert cache.get("one", *VOICE) and cache.get("three", *VOICE)
+    assert cache.evictions == 1
+    assert cache.stats()["bytes"] == 200
+
+
+def test_recency_survives_a_restart(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), max_bytes=250, memory_bytes=0)
+    cache.put("old", *VOICE, b"o" * 100)
+    cache.put("new", *VOICE, b"n" * 100)
+    os.utime(cache.path("old", *VOICE), (1, 1))
+
+    reopened = TTSCache(directory=str(tmp_path), max_bytes=250, memory_bytes=0)
+    reopened.put("newest", *VOICE, b"x" * 100)
+    assert reopened.get("old", *VOICE) is None
+    assert reopened.get("new", *VOICE) == b"n" * 100
+
+
+def test_memory_tier_serves_repeats_without_disk(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), memory_bytes=150)
+    cache.put("hello", *VOICE, b"h" * 100)
+    os.remove(os.path.join(str(tmp_path), f"{AudioKey('hello', *VOICE)}.mp3"))
+    # Still in memory: served without reading the (now missing) file
+    assert cache.get("hello", *VOICE) == b"h" * 100
+    assert cache.memory_hits == 1
+
+
+def test_memory_tier_is_bounded_and_least_recently_used(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), memory_bytes=150)
+    cache.put("a", *VOICE, b"a" * 60)
+    cache.put("b", *VOICE, b"b" * 60)
+    cache.get("a", *VOICE)
+    cache.put("c", *VOICE, b"c" * 60)       # Pushes out "b", the least recently used
+    assert cache.stats()["memory_bytes"] == 120
+
+    memory_hits = cache.memory_hits
+    cache.get("a", *VOICE)
+    cache.get("c", *VOICE)
+    assert cache.memory_hits == memory_hits + 2
+    assert cache.get("b", *VOICE) == b"b" * 60   # From disk
+    assert cache.memory_hits == memory_hits + 2
+
+
+def test_audio_larger_than_the_memory_tier_stays_on_disk(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), memory_bytes=10)
+    cache.put("big", *VOICE, b"x" * 100)
+    assert cache.stats()["memory_bytes"] == 0
+    assert cache.get("big", *VOICE) == b"x" * 100
+    assert cache.memory_hits == 0
@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Backend.VoiceActivity import VoiceActivityDetector, LoadFixtures, BenchmarkSegmentation, FIXTURE_DIR
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    fixtures = {name: (samples, rate, segments) for name, samples, rate, segments in LoadFixtures()}
+    assert {"quiet_room.wav", "fan_turns_on.wav", "mains_hum.wav"} <= set(fixtures), FIXTURE_DIR
+    return fixtures
+
+
+def Run(fixtures, name):
+    samples, rate, segments = fixtures[name]
+    return BenchmarkSegmentation([(name, samples, rate, segments)])
+
+
+def test_every_labelled_utterance_is_cut(fixtures):
+    report = BenchmarkSegmentation([(name, *fixture) for name, fixture in fixtures.items()])
+    found, total = map(int, report["segments_found"].split("/"))
+    assert found == total == 7
+    assert report["speech_kept"] >= 0.99
+    assert report["extra_segments"] <= 1              # The fan's onset, before the floor catches up
+    assert report["max_cut_latency_s"] < 0.6
+
+
+@pytest.mark.parametrize("name", ["quiet_room.wav", "mains_hum.wav"])
+def test_steady_noise_is_not_speech(fixtures, name):
+    report = Run(fixtures, name)
+    assert report["frame_precision"] >= 0.95
+    assert report["extra_segments"] == 0
+
+
+def test_noise_floor_catches_up_with_louder_noise(fixtures):
+    samples, rate, segments = fixtures["fan_turns_on.wav"]
+    detector = VoiceActivityDetector(rate)
+    detector.calibrate(samples[:rate // 2])
+    quiet_floor = detector.noise_floor
+    fan_start = 3 * rate
+
+    detector.classify(samples[:fan_start + 5 * rate])
+    assert detector.noise_floor > 5 * quiet_floor
+    # The fan alone no longer counts as speech; the later utterance still does
+    later = segments[-1][0]
+    assert detector.classify(samples[fan_start + 5 * rate:int(later * rate)]).mean() < 0.05
+    assert detector.classify(samples[int(later * rate):int(segments[-1][1] * rate)]).mean() > 0.5
+    assert Run(fixtures, "fan_turns_on.wav")["audio_passed_on"] < 0.5
+
+
+def test_speech_does_not_raise_the_noise_floor(fixtures):
+    samples, rate, _ = fixtures["quiet_room.wav"]
+    detector = VoiceActivityDetector(rate)
+    detector.calibrate(samples[:rate // 2])
+    floor = detector.noise_floor
+    for offset in range(0, len(samples), 1024):
+        detector.classify(samples[offset:offset + 1024])
+        assert detector.noise_floor < 2 * floor
@@ -0,0 +1,41 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Backend.WakeTriggers import (LoadClips, TestTriggers, RunClip, ClapTrigger, EnergyBurstTrigger,
+                                  WakeDetector, MAX_EVENTS, FIXTURE_DIR)
+
+
+@pytest.fixture(scope="module")
+def clips():
+    clips = LoadClips()
+    assert len(clips) >= 5, FIXTURE_DIR
+    return clips
+
+
+def test_labelled_clips_fire_exactly_the_expected_triggers(clips):
+    rows, totals = TestTriggers(clips)
+    for name, counts, expect in rows:
+        assert counts == {trigger: int(expect.get(trigger, 0)) for trigger in counts}, name
+    assert totals["misses"] == 0 and totals["false"] == 0
+    assert totals["cpu_share"] < 0.05
+
+
+def test_double_clap_needs_two_claps_close_together(clips):
+    clips = {name: (samples, rate) for name, samples, rate, _ in clips}
+    counts, _ = RunClip(*clips["three_claps.wav"], [ClapTrigger(claps=2, sample_rate=16000)])
+    assert counts == {"clap": 1}        # The third clap comes too late to pair up
+    counts, _ = RunClip(*clips["single_clap.wav"], [ClapTrigger(claps=2, sample_rate=16000)])
+    assert counts == {"clap": 0}
+
+
+def test_unclaimed_events_are_capped():
+    detector = WakeDetector([EnergyBurstTrigger()], microphone=object())
+    detector._started = True
+    for position in range(MAX_EVENTS + 5):
+        detector._emit("energy", position)
+    assert detector._events.qsize() == MAX_EVENTS
+    assert detector.stats()["dropped"] == 5
+    assert detector.counts["energy"] == MAX_EVENTS + 5
+    detector.clear()
+    assert detector.wait(timeout=0.01) is None